@@ -1,234 +1,3484 @@
 # --------- Import Libraries ---------
+# Only what every run needs is imported here, so a one-shot command starts fast. asyncio,
+# concurrent.futures, multiprocessing, csv, lzma, shutil and tempfile are imported by the
+# functions that use them (the network service, the worker pools, batch files, archives).
 import random
 import sqlite3 as sql
 import datetime
+import time
+import atexit
+import json
+import itertools
+import os
+import threading
+import urllib.parse
+import sys
+import argparse
+import heapq
+import array
+import bisect
+import base64
+import hashlib
+import hmac
+import weakref
+import secrets
+import functools
+import re
+import traceback
+from collections import OrderedDict, deque
+from decimal import Decimal, InvalidOperation
 
 # --------- Create All Dataset ---------
-# Single connection to persistent database     
-db = sql.connect("Bank System.db")
-cr = db.cursor()
+# Path of the persistent database. Nothing is opened at import time: every thread
+# gets its own connections from the pool the first time it touches the database.
+DB_PATH = "Bank System.db"
+
+
 # Create tables if they do not exist
-# Create tables
-cr.execute("CREATE TABLE IF NOT EXISTS 'Admin' (Username TEXT, Password TEXT)")
-
-cr.execute("""CREATE TABLE IF NOT EXISTS 'Client Account' (
-    Name TEXT,
-    Nationality TEXT,
-    Gender TEXT,
-    'Phone Number' TEXT,
-    'Document Submit' TEXT,
-    'Account Type' TEXT,
-    Balance INTEGER,
-    Password TEXT,
-    'Bank Account Number' INTEGER,
-    Time TEXT
-)""")
-
-cr.execute("""CREATE TABLE IF NOT EXISTS 'Account Transactions' (
-    Name TEXT,
-    'Bank Account Number' INTEGER,
-    'Transaction Type' TEXT,
-    Amount INTEGER,
-    Balance INTEGER,
-    History TEXT
+def create_schema(connection):
+    # Create tables
+    connection.execute("CREATE TABLE IF NOT EXISTS 'Admin' (Username TEXT, Password TEXT)")
+
+    connection.execute("""CREATE TABLE IF NOT EXISTS 'Client Account' (
+        Name TEXT,
+        Nationality TEXT,
+        Gender TEXT,
+        'Phone Number' TEXT,
+        'Document Submit' TEXT,
+        'Account Type' TEXT,
+        Balance INTEGER,
+        Password TEXT,
+        'Bank Account Number' INTEGER,
+        Time TEXT
     )""")
 
-db.commit()
+    connection.execute("""CREATE TABLE IF NOT EXISTS 'Account Transactions' (
+        Name TEXT,
+        'Bank Account Number' INTEGER,
+        'Transaction Type' TEXT,
+        Amount INTEGER,
+        Balance INTEGER,
+        History TEXT
+        )""")
 
+    connection.commit()
 
 
-# ------------------------------------------------
-# -------------- Transaction Class ---------------
-# ------------------------------------------------
+# ------------------------- Schema Migrations --------------------------------
+# Each entry is applied once, in order, and the number of applied steps is kept in
+# SQLite's "PRAGMA user_version" so a restart only runs the steps it has not seen yet.
+SCHEMA_MIGRATIONS = [
+    # 1-2: point lookups by account number (login, balance, UPDATEs) and the
+    #      per-account history query (ordered by History) use an index instead of a full scan
+    lambda connection: create_account_number_index(connection),
+    """CREATE INDEX IF NOT EXISTS 'idx_transactions_account_history'
+       ON 'Account Transactions' ('Bank Account Number', History)""",
+    # 3: progress of each month-end interest run, so a run is resumable and never paid twice
+    """CREATE TABLE IF NOT EXISTS 'Interest Runs' (
+        Period TEXT PRIMARY KEY,
+        Rate REAL,
+        'Last Rowid' INTEGER,
+        'Max Rowid' INTEGER,
+        Accounts INTEGER,
+        Status TEXT,
+        Started TEXT,
+        Finished TEXT
+    )""",
+    # 4: persistent sequence the account number allocator reserves blocks from
+    """CREATE TABLE IF NOT EXISTS 'Account Number Sequence' (
+        Name TEXT PRIMARY KEY,
+        'Next Value' INTEGER
+    )""",
+    # 5-6: money is stored as whole piastres (1/100 pound) from now on; convert the
+    #      float / pound amounts older versions wrote
+    """UPDATE 'Client Account' SET Balance = CAST(ROUND(Balance * 100) AS INTEGER)
+       WHERE Balance IS NOT NULL""",
+    """UPDATE 'Account Transactions' SET Amount = CAST(ROUND(Amount * 100) AS INTEGER),
+       Balance = CAST(ROUND(Balance * 100) AS INTEGER)""",
+    # 7: per-account balance checkpoints written by the ledger reconciliation
+    """CREATE TABLE IF NOT EXISTS 'Balance Checkpoints' (
+        'Bank Account Number' INTEGER PRIMARY KEY,
+        'Ledger Rowid' INTEGER,
+        Balance INTEGER,
+        Checked TEXT
+    )""",
+    # 8: closed months of the ledger moved out to read-only archive files
+    """CREATE TABLE IF NOT EXISTS 'Ledger Archives' (
+        Path TEXT PRIMARY KEY,
+        Period TEXT,
+        Rows INTEGER,
+        'First History' TEXT,
+        'Last History' TEXT,
+        Archived TEXT
+    )""",
+    # 9-13: the ledger becomes a hash chain: every row gets its place in the book-wide chain
+    #       (Seq) and the hash linking it to the row before (see append_ledger()). The head of
+    #       the chain is kept in its own one-row table, so it survives archiving; rows already
+    #       in the table are chained in the order they were written
+    """ALTER TABLE 'Account Transactions' ADD COLUMN Seq INTEGER""",
+    """ALTER TABLE 'Account Transactions' ADD COLUMN Hash BLOB""",
+    """CREATE TABLE IF NOT EXISTS 'Ledger Head' (
+        Id INTEGER PRIMARY KEY CHECK (Id = 1),
+        Seq INTEGER,
+        Hash BLOB
+    )""",
+    lambda connection: chain_existing_ledger(connection),
+    """CREATE UNIQUE INDEX IF NOT EXISTS 'idx_transactions_seq' ON 'Account Transactions' (Seq)""",
+    # 14-15: the chain range each archive file holds, so the verifier can follow the chain into it
+    """ALTER TABLE 'Ledger Archives' ADD COLUMN "First Seq" INTEGER""",
+    """ALTER TABLE 'Ledger Archives' ADD COLUMN "Last Seq" INTEGER""",
+    # 16: head of the chain as of each clean verification run, where the next run resumes
+    """CREATE TABLE IF NOT EXISTS 'Chain Checkpoints' (
+        Seq INTEGER PRIMARY KEY,
+        Hash BLOB,
+        Rows INTEGER,
+        Verified TEXT
+    )""",
+    # 17: deleting an account closes it: its row moves here and its ledger rows stay
+    """CREATE TABLE IF NOT EXISTS 'Closed Accounts' (
+        Name TEXT,
+        Nationality TEXT,
+        Gender TEXT,
+        'Phone Number' TEXT,
+        'Document Submit' TEXT,
+        'Account Type' TEXT,
+        Balance INTEGER,
+        Password TEXT,
+        'Bank Account Number' INTEGER PRIMARY KEY,
+        Time TEXT,
+        Closed TEXT
+    )""",
+    # 18-19: ledger rows are never changed, and only leave the table for an archive file
+    #        registered to hold their dates (see archive_ledger())
+    """CREATE TRIGGER IF NOT EXISTS 'ledger_no_update' BEFORE UPDATE ON 'Account Transactions'
+       BEGIN SELECT RAISE(ABORT, 'ledger rows are append-only'); END""",
+    """CREATE TRIGGER IF NOT EXISTS 'ledger_no_delete' BEFORE DELETE ON 'Account Transactions'
+       WHEN NOT EXISTS (SELECT 1 FROM 'Ledger Archives' WHERE OLD.History BETWEEN "First History" AND "Last History")
+       BEGIN SELECT RAISE(ABORT, 'ledger rows are append-only'); END""",
+    # 20-21: standing orders (recurring transfers), and the due-time index the scheduler
+    #        pulls them from, covering only the ones still running
+    """CREATE TABLE IF NOT EXISTS 'Standing Orders' (
+        Id INTEGER PRIMARY KEY,
+        'From Account' INTEGER NOT NULL,
+        'To Account' INTEGER NOT NULL,
+        Amount INTEGER NOT NULL CHECK (Amount > 0),
+        Frequency TEXT NOT NULL CHECK (Frequency IN ('daily', 'weekly', 'monthly')),
+        Start TEXT NOT NULL,
+        Installments INTEGER,
+        Occurrence INTEGER NOT NULL DEFAULT 0,
+        'Next Due' TEXT NOT NULL,
+        'Run At' TEXT NOT NULL,
+        Attempts INTEGER NOT NULL DEFAULT 0,
+        'Last Error' TEXT,
+        Status TEXT NOT NULL DEFAULT 'Active',
+        Created TEXT
+    )""",
+    """CREATE INDEX IF NOT EXISTS 'idx_standing_orders_due' ON 'Standing Orders' ("Run At", Id) WHERE Status = 'Active'""",
+    # 22-24: full-text index of the open accounts' name, phone number and nationality for the
+    #        admin search, keyed by account number (contentless: the words are indexed, the
+    #        text stays in 'Client Account'). It is filled once here; BankRepository adds and
+    #        removes accounts as they are opened and closed (a trigger firing once per row
+    #        would flush the index once per row), and a trigger follows the rare edit of
+    #        those three columns. Balance and password updates never touch it.
+    """CREATE VIRTUAL TABLE IF NOT EXISTS 'Account Search' USING fts5(
+        Name, Phone, Nationality, content='', tokenize='unicode61 remove_diacritics 2', prefix='2 3'
+    )""",
+    """INSERT INTO 'Account Search' (rowid, Name, Phone, Nationality)
+       SELECT "Bank Account Number", Name, "Phone Number", Nationality FROM "Client Account" GROUP BY "Bank Account Number" """,
+    """CREATE TRIGGER IF NOT EXISTS 'account_search_update' AFTER UPDATE OF Name, "Phone Number", Nationality ON 'Client Account' BEGIN
+           INSERT INTO 'Account Search' ('Account Search', rowid, Name, Phone, Nationality)
+           VALUES ('delete', OLD."Bank Account Number", OLD.Name, OLD."Phone Number", OLD.Nationality);
+           INSERT INTO 'Account Search' (rowid, Name, Phone, Nationality)
+           VALUES (NEW."Bank Account Number", NEW.Name, NEW."Phone Number", NEW.Nationality);
+       END""",
+    # 25-26: the last ledger rowid ever given out is kept with the head of the chain, and
+    #        append_ledger() numbers new rows after it. Without it SQLite starts again after
+    #        the largest rowid left in the table, and once archiving has emptied the hot table
+    #        that is 1: new rows would reuse archived rowids, and every rowid high-water mark
+    #        (reconciliation checkpoints, the column export, history cursors) would miss them
+    """ALTER TABLE 'Ledger Head' ADD COLUMN "Last Rowid" INTEGER""",
+    lambda connection: record_last_ledger_rowid(connection),
+    # 27: standing orders set up by clients through the service are paid within the
+    #     velocity limits, like the transfers they replace; orders set up by the bank are not
+    """ALTER TABLE 'Standing Orders' ADD COLUMN Limited INTEGER NOT NULL DEFAULT 0""",
+]
 
-class Transaction:
-    def __init__(self, name, bank_account_number, trans_type, amount, balance):
-        self.name = name
-        self.bank_account_number = bank_account_number
-        self.trans_type = trans_type
-        self.amount = amount
-        self.balance = balance
-        # Generate a timestamp for the transaction
-        # datetime.datetime.now() returns the current local date and time
-        self.history = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        self.save_to_db()
 
-    def save_to_db(self):             # This method save the transaction details to the DB
-        cr.execute("""
-            INSERT INTO 'Account Transactions' (Name, 'Bank Account Number', 'Transaction Type', Amount, Balance, History)
-            VALUES (?, ?, ?, ?, ?, ?)
-        """, (self.name, self.bank_account_number, self.trans_type, self.amount, self.balance, self.history))
-        db.commit()
-    
-    
-    @ staticmethod
-    def deposit(account, deposit_amount):
-        if deposit_amount < 0:
-            print("❌ Invalid operation")
-        else:
-            new_balance = deposit_amount + account.get_balance()
-            account.set_balance(new_balance)
-            # Here, the Transaction is recorded for the deposit or save the transaction details
-            Transaction(account.name, account.bank_account_number, "Deposit", deposit_amount, new_balance)
-            print(f"✅ Deposit successful. New balance: {new_balance}")
-            
-            return account.get_balance()    # Return the new balance after deposit
-    
-    
-    @ staticmethod
-    def withdraw(account, withdraw_amount):
-        # Determine the minimum allowed balance based on account type
-        # isinstance() function returns True if the specified object is of the specified type, otherwise False
-        if isinstance(account, CurrentAccount):
-            mini_amount = CurrentAccount.mini_amount
-        elif isinstance(account, SavingAccount):
-            mini_amount = SavingAccount.mini_amount
+def create_account_number_index(connection):
+    try:
+        connection.execute("""CREATE UNIQUE INDEX IF NOT EXISTS 'idx_client_account_number'
+            ON 'Client Account' ('Bank Account Number')""")
+    except sql.IntegrityError:
+        # Old databases can hold duplicated random account numbers, so the unique
+        # index cannot be built. Fall back to a plain index to keep lookups fast.
+        print("⚠️ Duplicate Bank Account Numbers found, creating a non-unique index instead.")
+        connection.execute("""CREATE INDEX IF NOT EXISTS 'idx_client_account_number'
+            ON 'Client Account' ('Bank Account Number')""")
+
+
+def migrate_schema(connection):
+    applied = connection.execute("PRAGMA user_version").fetchone()[0]
+    for version, statement in enumerate(SCHEMA_MIGRATIONS, start=1):
+        if version <= applied:
+            continue
+        if callable(statement):     # A step that needs Python, not just SQL
+            statement(connection)
         else:
-            mini_amount = 0  # Default or error case
+            connection.execute(statement)
+        connection.execute(f"PRAGMA user_version = {version}")
+    connection.commit()
 
-        if withdraw_amount <= 0: # Added check for non-positive withdraw amount
-            print("❌ Invalid operation: Withdraw amount must be positive.")
-        elif account.get_balance() - withdraw_amount < mini_amount: # Check if withdraw will go below min_amount
-            print("There is not enough balance in your account or it would fall below the minimum allowed.")
+
+# ------------------------- Metrics --------------------------------
+# A small in-process metrics registry: counters and latency histograms keyed by name and
+# labels, dumped as Prometheus text or JSON (the "metrics" admin operation of the network
+# service, or metrics.to_prometheus() / metrics.to_json()). Recorded by default, once per
+# banking operation:
+#   bank_operation_seconds{operation}     deposit, withdraw, transfer, interest, login,
+#   bank_operations_total{operation,outcome}   create / delete account
+# and, with SQL timing turned on (configure_metrics(sql_timing=True), serve --sql-metrics):
+#   bank_sql_seconds{statement}           every statement run on a pooled connection
+#   bank_commit_seconds                   every commit
+# A histogram observation is a bisect and two additions, about a microsecond, so timing
+# operations costs little. Timing statements means wrapping every execute() of every
+# connection in Python, which costs a quarter or more of a cached balance lookup
+# (benchmarks/bench_metrics.py), so it is only on when asked for.
+# configure_metrics(enabled=False) turns everything off; connections opened afterwards are
+# plain sqlite3 connections again.
+#
+# The slow query log is optional and also times statements: with a threshold set, every
+# connection also installs a sqlite3 trace callback, and statements slower than the
+# threshold are kept (with their bound values expanded by SQLite) in metrics.slow_queries
+# and counted.
+LATENCY_BUCKETS = (0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+# Lives in a recording thread's locals only, so it is freed when the thread ends
+class _ShardOwner:
+    __slots__ = ("__weakref__",)
+
+
+class MetricsRegistry:
+    def __init__(self, buckets=LATENCY_BUCKETS, slow_query_log_size=100):
+        self.enabled = True
+        self.sql_timing = False
+        self.buckets = buckets
+        self.slow_query_seconds = None
+        self.slow_queries = deque(maxlen=slow_query_log_size)
+        # Every thread records into its own counters and histograms, so recording takes no
+        # lock; snapshot() adds the threads' shards up. When a thread ends, its shard is
+        # added to the retired totals and dropped, so threads coming and going (worker
+        # pools, per-run executors) do not grow the registry
+        self._local = threading.local()
+        self._shards = {}           # shard number -> (counters, histograms) of every live thread that recorded
+        self._retired = ({}, {})    # What the threads that ended recorded, added up
+        self._shard_numbers = itertools.count()
+        self._lock = threading.RLock()
+
+    def _shard(self):
+        counters, histograms = {}, {}       # (name, labels) -> value / [bucket counts..., +Inf count, sum]
+        owner = _ShardOwner()
+        self._local.counters, self._local.histograms, self._local.owner = counters, histograms, owner
+        number = next(self._shard_numbers)
+        with self._lock:
+            self._shards[number] = (counters, histograms)
+        weakref.finalize(owner, self._retire, number)
+        return counters, histograms
+
+    def _retire(self, number):
+        with self._lock:
+            shard = self._shards.pop(number, None)
+            if shard is not None:
+                self._add(self._retired, shard)
+
+    @staticmethod
+    def _add(totals, shard):
+        counters, histograms = totals
+        for key, value in list(shard[0].items()):
+            counters[key] = counters.get(key, 0) + value
+        for key, values in list(shard[1].items()):
+            total = histograms.setdefault(key, [0] * len(values))
+            for index, value in enumerate(values):
+                total[index] += value
+
+    def count(self, name, labels=(), value=1):
+        key = (name, labels)
+        try:
+            counters = self._local.counters
+        except AttributeError:
+            counters = self._shard()[0]
+        counters[key] = counters.get(key, 0) + value
+
+    def observe(self, name, seconds, labels=()):
+        self.observe_key((name, labels), seconds)
+
+    # The hot-path form: callers that observe often keep their (name, labels) key around
+    def observe_key(self, key, seconds):
+        try:
+            histogram = self._local.histograms[key]
+        except AttributeError:
+            histogram = self._shard()[1][key] = [0] * (len(self.buckets) + 2)
+        except KeyError:
+            histogram = self._local.histograms[key] = [0] * (len(self.buckets) + 2)
+        histogram[bisect.bisect_left(self.buckets, seconds)] += 1
+        histogram[-1] += seconds
+
+    def slow_query(self, seconds, statement):
+        self.slow_queries.append((time.strftime("%Y-%m-%d %H:%M:%S"), round(seconds, 6), statement))
+        self.count("bank_slow_queries_total")
+
+    def reset(self):
+        with self._lock:
+            for counters, histograms in list(self._shards.values()) + [self._retired]:
+                counters.clear()
+                histograms.clear()
+        self.slow_queries.clear()
+
+    def snapshot(self):
+        totals = ({}, {})
+        with self._lock:
+            # A shard retired after this point is still in the list, and not yet in the copy
+            shards = list(self._shards.values())
+            self._add(totals, self._retired)
+        for shard in shards:
+            self._add(totals, shard)
+        return totals
+
+    @staticmethod
+    def _labels(labels, extra=()):
+        pairs = list(labels) + list(extra)
+        if not pairs:
+            return ""
+        return "{" + ",".join('%s="%s"' % (name, str(value).replace("\\", "\\\\").replace('"', '\\"')) for name, value in pairs) + "}"
+
+    def to_prometheus(self):
+        counters, histograms = self.snapshot()
+        lines = []
+        for metric in sorted({name for name, _ in counters}):
+            lines.append(f"# TYPE {metric} counter")
+            lines += [f"{metric}{self._labels(labels)} {value}" for (name, labels), value in sorted(counters.items()) if name == metric]
+        for metric in sorted({name for name, _ in histograms}):
+            lines.append(f"# TYPE {metric} histogram")
+            for (name, labels), values in sorted(histograms.items()):
+                if name != metric:
+                    continue
+                cumulative = 0
+                for bound, bucket_count in zip(self.buckets + ("+Inf",), values):
+                    cumulative += bucket_count
+                    lines.append(f"{metric}_bucket{self._labels(labels, [('le', bound)])} {cumulative}")
+                lines.append(f"{metric}_sum{self._labels(labels)} {values[-1]:.6f}")
+                lines.append(f"{metric}_count{self._labels(labels)} {cumulative}")
+        return "\n".join(lines) + "\n"
+
+    def to_json(self):
+        # {"counters": [...], "histograms": [... with count, sum, p50 and p99 estimated from the buckets], "slow_queries": [...]}
+        counters, histograms = self.snapshot()
+        summary = []
+        for (name, labels), values in sorted(histograms.items()):
+            total = sum(values[:-1])
+            summary.append({"name": name, "labels": dict(labels), "count": total, "sum": values[-1],
+                            "p50": self._quantile(values, total, 0.50), "p99": self._quantile(values, total, 0.99)})
+        return {"counters": [{"name": name, "labels": dict(labels), "value": value} for (name, labels), value in sorted(counters.items())],
+                "histograms": summary,
+                "slow_queries": [{"time": when, "seconds": seconds, "statement": statement} for when, seconds, statement in self.slow_queries]}
+
+    def _quantile(self, values, total, fraction):
+        # Upper bound of the bucket holding the quantile (None past the last bound)
+        seen = 0
+        for bound, bucket_count in zip(self.buckets + (None,), values):
+            seen += bucket_count
+            if total and seen >= fraction * total:
+                return bound
+        return None
+
+
+metrics = MetricsRegistry()
+
+
+# Changes what is recorded. Connections opened before the change keep their hooks until
+# the pool is reopened (use_database()).
+def configure_metrics(enabled=None, slow_query_seconds=False, sql_timing=None):
+    if enabled is not None:
+        metrics.enabled = enabled
+    if sql_timing is not None:
+        metrics.sql_timing = sql_timing
+    if slow_query_seconds is not False:      # None turns the slow query log off
+        metrics.slow_query_seconds = slow_query_seconds
+
+
+# Statement label for bank_sql_seconds: the verb and the table, so the set of labels stays
+# small ("UPDATE Client Account", "SELECT Account Transactions", "PRAGMA data_version", ...)
+STATEMENT_VERB_PATTERN = re.compile(r"\s*(\w+)(?:\s+(\w+))?")
+STATEMENT_TABLE_PATTERN = re.compile(r"""\b(?:FROM|INTO|UPDATE|TABLE|ON)\s+(?:IF\s+NOT\s+EXISTS\s+)?("[^"]+"|'[^']+'|`[^`]+`|\[[^\]]+\]|\w+)""",
+                                     re.IGNORECASE)
+_statement_labels = {}
+
+
+def statement_label(statement):
+    return statement_key(statement)[1][0][1]
+
+
+# The bank_sql_seconds histogram key of a statement, cached per statement text
+def statement_key(statement):
+    key = _statement_labels.get(statement)
+    if key is None:
+        verb = STATEMENT_VERB_PATTERN.match(statement)
+        table = STATEMENT_TABLE_PATTERN.search(statement)
+        if verb is None:
+            label = "SQL"
+        elif table is not None:
+            table_name = table.group(1).strip("\"'`[]")
+            label = f"{verb.group(1).upper()} {table_name}"
+        else:       # PRAGMA data_version, SAVEPOINT unit_of_work, BEGIN IMMEDIATE ...
+            label = " ".join(part for part in verb.groups() if part)
+        key = ("bank_sql_seconds", (("statement", label),))
+        if len(_statement_labels) < 10_000:        # Statements built on the fly (IN lists) must not grow it forever
+            _statement_labels[statement] = key
+    return key
+
+
+# Connections the pool hands out while SQL timing or the slow query log is on: every
+# execute / executemany / commit is timed into the registry
+class InstrumentedConnection(sql.Connection):
+    def execute(self, statement, *arguments):
+        started = perf_counter()
+        try:
+            return _connection_execute(self, statement, *arguments)
+        finally:
+            elapsed = perf_counter() - started
+            metrics.observe_key(_statement_labels.get(statement) or statement_key(statement), elapsed)
+            if metrics.slow_query_seconds is not None:
+                _check_slow(statement, elapsed)
+
+    def executemany(self, statement, *arguments):
+        started = perf_counter()
+        try:
+            return _connection_executemany(self, statement, *arguments)
+        finally:
+            elapsed = perf_counter() - started
+            metrics.observe_key(_statement_labels.get(statement) or statement_key(statement), elapsed)
+            if metrics.slow_query_seconds is not None:
+                _check_slow(statement, elapsed)
+
+    def commit(self):
+        started = perf_counter()
+        try:
+            return _connection_commit(self)
+        finally:
+            metrics.observe_key(COMMIT_METRIC, perf_counter() - started)
+
+
+perf_counter = time.perf_counter
+_connection_execute, _connection_executemany, _connection_commit = sql.Connection.execute, sql.Connection.executemany, sql.Connection.commit
+COMMIT_METRIC = ("bank_commit_seconds", ())
+
+
+def _check_slow(statement, elapsed):
+    if elapsed >= metrics.slow_query_seconds:
+        metrics.slow_query(elapsed, getattr(_traced, "statement", None) or statement)
+
+
+# Last statement SQLite reported to the trace callback on this thread (bound values expanded)
+_traced = threading.local()
+
+
+def _trace_statement(statement):
+    _traced.statement = statement
+
+
+# Times a banking operation and counts it by outcome ("ok", or the exception class name)
+def instrumented(operation):
+    labels = (("operation", operation),)
+    timing_key = ("bank_operation_seconds", labels)
+
+    def decorate(function):
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            if not metrics.enabled:
+                return function(*args, **kwargs)
+            started = perf_counter()
+            outcome = "ok"
+            try:
+                return function(*args, **kwargs)
+            except BaseException as error:
+                outcome = type(error).__name__
+                raise
+            finally:
+                metrics.observe_key(timing_key, perf_counter() - started)
+                metrics.count("bank_operations_total", labels + (("outcome", outcome),))
+        return wrapper
+    return decorate
+
+
+# ------------------------- Connection Pool --------------------------------
+# WAL lets readers keep going while a write commits, and synchronous=NORMAL only
+# fsyncs the WAL at checkpoints instead of on every commit (still crash safe).
+def configure_connection(connection):
+    connection.execute("PRAGMA journal_mode = WAL")
+    connection.execute("PRAGMA synchronous = NORMAL")
+
+
+# Hands every thread its own read-write connection and its own read-only connection
+# (plus one per archived ledger file it reads), created on first use, so threads never
+# share a cursor or a transaction. Each
+# connection keeps its own prepared-statement cache (cached_statements), and the SQL
+# text in this module is constant so repeated statements are never re-prepared.
+class ConnectionPool:
+    def __init__(self, path=DB_PATH, timeout=30.0, cached_statements=256):
+        self.path = path
+        self.timeout = timeout
+        self.cached_statements = cached_statements
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._connections = []
+        self._generation = 0
+        self._schema_ready = False
+
+    def _open(self, target, uri=False):
+        # check_same_thread is off only so close_all() can commit and close every
+        # connection at shutdown; each connection is still used by one thread
+        timed = metrics.enabled and (metrics.sql_timing or metrics.slow_query_seconds is not None)
+        connection = sql.connect(target, uri=uri, timeout=self.timeout, cached_statements=self.cached_statements,
+                                 check_same_thread=False, factory=InstrumentedConnection if timed else sql.Connection)
+        if metrics.enabled and metrics.slow_query_seconds is not None:
+            connection.set_trace_callback(_trace_statement)
+        with self._lock:
+            self._connections.append(connection)
+        return connection
+
+    def connection(self):
+        # The read-write connection of the current thread
+        if getattr(self._local, "generation", None) != self._generation:
+            self._local.__dict__.clear()
+            self._local.generation = self._generation
+        connection = getattr(self._local, "writer", None)
+        if connection is None:
+            connection = self._open(self.path)
+            configure_connection(connection)
+            with self._lock:
+                # Nothing to create or migrate once the database records the latest schema version
+                if not self._schema_ready:
+                    if connection.execute("PRAGMA user_version").fetchone()[0] < len(SCHEMA_MIGRATIONS):
+                        create_schema(connection)
+                        migrate_schema(connection)
+                    self._schema_ready = True
+            self._local.writer = connection
+        return connection
+
+    def reader(self):
+        # A read-only connection of the current thread, for queries
+        writer = self.connection()       # Makes sure the database and its schema exist
+        if self.path == ":memory:":
+            return writer
+        connection = getattr(self._local, "reader", None)
+        if connection is None:
+            connection = self._open(f"file:{urllib.parse.quote(os.path.abspath(self.path))}?mode=ro", uri=True)
+            self._local.reader = connection
+        return connection
+
+    def archive(self, path):
+        # A read-only connection of the current thread to an archived ledger file.
+        # Archive files never change, so SQLite can skip locking them (immutable=1)
+        self.connection()
+        archives = self._local.__dict__.setdefault("archives", {})
+        connection = archives.get(path)
+        if connection is None:
+            connection = self._open(f"file:{urllib.parse.quote(os.path.abspath(path))}?mode=ro&immutable=1", uri=True)
+            archives[path] = connection
+        return connection
+
+    def close_all(self):
+        # Commit whatever is still pending (group commit) and close every connection
+        with self._lock:
+            connections, self._connections = self._connections, []
+            self._generation += 1
+        for connection in connections:
+            try:
+                if connection.in_transaction:
+                    connection.commit()
+                connection.close()
+            except sql.ProgrammingError:
+                pass
+
+
+pool = ConnectionPool()
+
+
+# Point the whole application at another database file (benchmarks, tests, tools)
+def use_database(path):
+    global pool
+    pool.close_all()
+    pool = ConnectionPool(path)
+    account_cache.clear()       # Cached accounts belong to the previous database
+    velocity.clear()
+    account_numbers.reset()
+    return pool
+
+
+# Make sure a grouped batch is never left uncommitted when the program ends
+def _close_pool_at_exit():
+    pool.close_all()
+
+
+atexit.register(_close_pool_at_exit)
+
+
+# ------------------------- Unit of Work --------------------------------
+# Every banking operation (its ledger rows plus its balance updates) runs inside one
+# UnitOfWork and is committed once when the outermost block exits. Each block is a
+# SAVEPOINT, so a failed operation is undone without touching anything else pending.
+# A failed operation always ends the transaction too (rolled back, or the batch before it
+# committed), so a refused withdrawal never leaves the connection holding the write lock.
+#
+# Group commit: with UnitOfWork.group_window > 0 the commit itself is deferred, so many
+# operations share one commit. The batch is committed once the window has passed or
+# group_max_operations is reached, and whatever is left is committed by flush() / at exit.
+# A batch is a held write lock, so a background flusher also commits the batches of
+# threads that went idle once their window has passed (threads that are busy commit their
+# own). The nesting depth and the pending batch belong to the thread (and its connection);
+# the thread's lock is held while it works on them, so the flusher never commits in the
+# middle of an operation.
+_work = threading.local()
+_pending_batches = {}           # id(WorkState) -> (WorkState, connection) holding a batch
+_pending_lock = threading.Lock()
+
+
+class WorkState:
+    __slots__ = ("depth", "pending_operations", "first_pending_time", "lock")
+
+    def __init__(self):
+        self.depth = 0
+        self.pending_operations = 0
+        self.first_pending_time = None
+        self.lock = threading.RLock()
+
+
+class UnitOfWork:
+    group_window = 0.0          # seconds, 0 = commit after every operation
+    group_max_operations = 1000
+    _flusher = None
+
+    def __init__(self):
+        self.connection = pool.connection()
+
+    @staticmethod
+    def state():
+        state = getattr(_work, "state", None)
+        if state is None:
+            state = _work.state = WorkState()
+        return state
+
+    def __enter__(self):
+        state = UnitOfWork.state()
+        if state.depth == 0:
+            state.lock.acquire()
+            try:
+                if not self.connection.in_transaction:
+                    self.connection.execute("BEGIN IMMEDIATE")
+                self.connection.execute("SAVEPOINT unit_of_work")
+            except BaseException:
+                state.lock.release()
+                raise
+        state.depth += 1
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        state = UnitOfWork.state()
+        state.depth -= 1
+        if state.depth == 0:
+            try:
+                if exc_type is None:
+                    self.connection.execute("RELEASE unit_of_work")
+                    state.pending_operations += 1
+                    UnitOfWork.commit(self.connection)
+                elif state.pending_operations:
+                    # Undo this operation only, and commit the batch grouped before it
+                    self.connection.execute("ROLLBACK TO unit_of_work")
+                    self.connection.execute("RELEASE unit_of_work")
+                    UnitOfWork.flush(self.connection)
+                elif self.connection.in_transaction:
+                    self.connection.rollback()
+            finally:
+                state.lock.release()
+        return False       # Never swallow the exception
+
+    @staticmethod
+    def commit(connection):
+        state = UnitOfWork.state()
+        now = time.monotonic()
+        if state.first_pending_time is None:
+            state.first_pending_time = now
+        if (UnitOfWork.group_window <= 0
+                or now - state.first_pending_time >= UnitOfWork.group_window
+                or state.pending_operations >= UnitOfWork.group_max_operations):
+            UnitOfWork.flush(connection)
         else:
-            new_balance = account.get_balance() - withdraw_amount
-            account.set_balance(new_balance)
-            Transaction(account.name, account.bank_account_number, "Withdraw", withdraw_amount, new_balance)
-            print(f"✅ Withdraw successful. New balance: {new_balance}")
-            return account.get_balance()
-    
-    
-    @ staticmethod
-    def transfer(sender_account, receiver_account, transfer_amount):
-        if transfer_amount <= 0:
-            print("❌ Invalid transfer amount")
+            with _pending_lock:
+                _pending_batches[id(state)] = (state, connection)
+            UnitOfWork._start_flusher()
+
+    @staticmethod
+    def flush(connection=None):
+        UnitOfWork._flush_state(UnitOfWork.state(), connection or pool.connection())
+
+    @staticmethod
+    def _flush_state(state, connection):
+        with state.lock:
+            try:
+                if connection.in_transaction:
+                    connection.commit()
+            finally:
+                state.pending_operations = 0
+                state.first_pending_time = None
+                with _pending_lock:
+                    _pending_batches.pop(id(state), None)
+
+    @staticmethod
+    def _start_flusher():
+        with _pending_lock:
+            if UnitOfWork._flusher is None or not UnitOfWork._flusher.is_alive():
+                UnitOfWork._flusher = threading.Thread(target=UnitOfWork._flush_idle, name="group-commit-flusher", daemon=True)
+                UnitOfWork._flusher.start()
+
+    @staticmethod
+    def _flush_idle():
+        # Commits the batches whose window has passed; a thread in the middle of an operation
+        # (its lock taken) is left alone, it commits its own batch when that operation ends
+        while True:
+            time.sleep(max(UnitOfWork.group_window, 0.001))
+            with _pending_lock:
+                batches = list(_pending_batches.values())
+                if not batches:
+                    UnitOfWork._flusher = None
+                    return
+            now = time.monotonic()
+            for state, connection in batches:
+                if not state.lock.acquire(blocking=False):
+                    continue
+                try:
+                    started = state.first_pending_time
+                    if started is not None and now - started >= UnitOfWork.group_window:
+                        UnitOfWork._flush_state(state, connection)
+                except sql.Error:
+                    pass        # The connection was closed under the batch (close_all() commits it first)
+                finally:
+                    state.lock.release()
+
+
+def enable_group_commit(window_seconds=0.01, max_operations=1000):
+    UnitOfWork.group_window = window_seconds
+    UnitOfWork.group_max_operations = max_operations
+
+
+def disable_group_commit():
+    UnitOfWork.flush()
+    UnitOfWork.group_window = 0.0
+
+
+# ------------------------- Storage Backends --------------------------------
+# Everything the accounts, the menus, the sessions and the network service need from
+# storage: account CRUD, ledger append, balance updates and history queries. Two engines:
+#   BankRepository - SQLite, the default (and the only one the admin jobs below work on:
+#                    interest run, reconciliation, archive, reports, batch ingestion,
+#                    standing orders, account search)
+#   MemoryBackend  - dicts and an append-only ledger list, for tests, simulations and
+#                    what-if runs that should not touch a database file
+# use_backend() switches the module-level repository.
+#
+# Account rows are (Name, Nationality, Gender, Phone Number, Document Submit, Account Type,
+# Balance, Password, Bank Account Number); ledger rows are (Name, Bank Account Number,
+# Transaction Type, Amount, Balance, History). Balance updates raise BankError.
+class StorageBackend:
+    # Timestamps of new ledger rows come from clock() when set (a simulated clock for a replay)
+    clock = None
+
+    def now(self):
+        return self.clock() if self.clock else datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+
+    # Something that changes whenever another process may have changed the data
+    def data_version(self):
+        raise NotImplementedError
+
+    # ---- Accounts ----
+    def load_account(self, bank_account_number):
+        raise NotImplementedError
+
+    def iter_accounts(self, numbers=None, batch=10_000):
+        raise NotImplementedError
+
+    def account_balance(self, bank_account_number):
+        raise NotImplementedError
+
+    def account_summary(self, bank_account_number, name=None):
+        raise NotImplementedError
+
+    def insert_account(self, values):
+        self.insert_accounts([values])
+
+    def insert_accounts(self, rows):
+        raise NotImplementedError
+
+    def delete_account(self, name, bank_account_number):
+        # Closes the account (when name and number match); its ledger rows are kept
+        raise NotImplementedError
+
+    def set_password(self, bank_account_number, password_hash):
+        raise NotImplementedError
+
+    def reserve_account_numbers(self, count):
+        # The first of count consecutive account sequence values nobody else will get
+        raise NotImplementedError
+
+    # ---- Ledger and balances ----
+    def add_transaction(self, values):
+        self.add_transactions([values])
+
+    def add_transactions(self, rows):
+        raise NotImplementedError
+
+    def transactions_page(self, bank_account_number, after=None, limit=20, since=None, until=None, types=None):
+        raise NotImplementedError
+
+    def recent_ledger(self, since):
+        # Every account's ledger rows written at or after the History timestamp, oldest
+        # first (archived months are not read)
+        raise NotImplementedError
+
+    def deposit(self, bank_account_number, amount):
+        raise NotImplementedError
+
+    def withdraw(self, bank_account_number, amount):
+        raise NotImplementedError
+
+    def transfer(self, sender_number, receiver_number, amount, **options):
+        raise NotImplementedError
+
+    def credit_interest(self, bank_account_number, rate):
+        raise NotImplementedError
+
+    # ---- Admins ----
+    def admin_exists(self, username):
+        raise NotImplementedError
+
+    def insert_admin(self, username, password):
+        raise NotImplementedError
+
+    def check_admin(self, username, password):
+        raise NotImplementedError
+
+
+# ------------------------- Repository --------------------------------
+# The SQLite backend: all reads and writes of accounts, admins and the ledger, on the calling
+# thread's connections. Queries go to the read-only connection, unless this thread
+# still has writes waiting for a group commit (so it always reads its own writes).
+class BankRepository(StorageBackend):
+    def __init__(self):
+        self._sequence_connection = None
+        self._sequence_path = None
+
+    def _reader(self):
+        writer = pool.connection()
+        return writer if writer.in_transaction else pool.reader()
+
+    def load_account(self, bank_account_number):
+        return self._reader().execute("""SELECT Name, Nationality, Gender, "Phone Number", "Document Submit", "Account Type", Balance, Password, "Bank Account Number"
+            FROM "Client Account" WHERE "Bank Account Number" = ?""", (bank_account_number,)).fetchone()
+
+    # Account rows in the order of load_account(), a list of up to batch rows at a time.
+    # Given numbers are looked up in chunks that stay under SQLite's parameter limit.
+    def iter_accounts(self, numbers=None, batch=10_000):
+        columns = """SELECT Name, Nationality, Gender, "Phone Number", "Document Submit", "Account Type", Balance, Password, "Bank Account Number"
+            FROM "Client Account" """
+        if numbers is None:
+            cursor = self._reader().execute(columns + ' ORDER BY "Bank Account Number"')
+            while True:
+                rows = cursor.fetchmany(batch)
+                if not rows:
+                    return
+                yield rows
+        numbers = list(numbers)
+        for first in range(0, len(numbers), 500):
+            chunk = numbers[first:first + 500]
+            yield self._reader().execute(columns + ' WHERE "Bank Account Number" IN (%s)' % ",".join("?" * len(chunk)), chunk).fetchall()
+
+    def account_balance(self, bank_account_number):
+        return self._reader().execute("""SELECT "Account Type", Balance FROM 'Client Account' WHERE "Bank Account Number" = ?""", (bank_account_number,)).fetchone()
+
+    def account_summary(self, bank_account_number, name=None):
+        # Same columns as the summary printed by the admin portal
+        query = """SELECT Name, Gender, Nationality, "Phone Number", "Account Type", "Bank Account Number", Balance, Time
+            FROM 'Client Account' WHERE "Bank Account Number" = ?"""
+        if name is None:
+            return self._reader().execute(query, (bank_account_number,)).fetchone()
+        return self._reader().execute(query + " AND Name = ?", (bank_account_number, name)).fetchone()
+
+    def data_version(self):
+        reader = pool.reader()
+        return reader, reader.execute("PRAGMA data_version").fetchone()[0]
+
+    def insert_accounts(self, rows):
+        # rows: Name, Nationality, Gender, Phone Number, Document Submit, Account Type, Balance, Password, Bank Account Number, Time
+        rows = list(rows)
+        with UnitOfWork() as work:
+            work.connection.executemany("""INSERT INTO 'Client Account' (Name, Nationality, Gender, 'Phone Number', 'Document Submit', 'Account Type', Balance, Password, 'Bank Account Number', Time)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)""", rows)
+            work.connection.executemany(INDEX_ACCOUNT_SQL, ((row[8], row[0], row[3], row[1]) for row in rows))
+
+    @instrumented("delete_account")
+    def delete_account(self, name, bank_account_number):
+        # Closes the account in one commit: its row moves to 'Closed Accounts', its ledger rows
+        # stay, and an "Account Closed" row with the final balance ends its history
+        with UnitOfWork() as work:
+            account = work.connection.execute('SELECT Name, Balance FROM "Client Account" WHERE Name = ? AND "Bank Account Number" = ?',
+                                              (name, bank_account_number)).fetchone()
+            if account is None:
+                return False
+            closed = self.now()
+            work.connection.execute("""INSERT INTO 'Closed Accounts' (Name, Nationality, Gender, 'Phone Number', 'Document Submit', 'Account Type', Balance, Password, 'Bank Account Number', Time, Closed)
+                SELECT Name, Nationality, Gender, "Phone Number", "Document Submit", "Account Type", Balance, Password, "Bank Account Number", Time, ?
+                FROM "Client Account" WHERE "Bank Account Number" = ?""", (closed, bank_account_number))
+            work.connection.execute(UNINDEX_ACCOUNT_SQL, (bank_account_number,))
+            work.connection.execute('DELETE FROM "Client Account" WHERE "Bank Account Number" = ?', (bank_account_number,))
+            append_ledger(work.connection, [(account[0], bank_account_number, "Account Closed", 0, account[1], closed)])
+        return True
+
+    def add_transactions(self, rows):
+        # rows: Name, Bank Account Number, Transaction Type, Amount, Balance, History
+        with UnitOfWork() as work:
+            append_ledger(work.connection, rows)
+
+    def transactions_page(self, bank_account_number, after=None, limit=20, since=None, until=None, types=None):
+        # One page of an account's history in (History, rowid) order, starting after the
+        # cursor of the previous page (keyset pagination on the account/History index, so
+        # every page costs the same however deep it is). Returns (rows, next cursor), the
+        # cursor is None on the last page.
+        # Archived months whose dates cannot match (before since / the cursor, after until)
+        # are never opened; the others are queried oldest first, the same way, and merged
+        # in order. Once a full page is older than the next archive the rest is skipped.
+        conditions = ['"Bank Account Number" = ?']
+        parameters = [bank_account_number]
+        if after is not None:
+            conditions.append("(History, rowid) > (?, ?)")
+            parameters += list(after)
+        if since:
+            conditions.append("History >= ?")
+            parameters.append(_history_bound(since))
+        if until:
+            conditions.append("History <= ?")
+            parameters.append(_history_bound(until, end_of_day=True))
+        if types:
+            conditions.append(f'"Transaction Type" IN ({",".join("?" * len(types))})')
+            parameters += list(types)
+        query = f"""SELECT Name, "Bank Account Number", "Transaction Type", Amount, Balance, History, rowid
+            FROM "Account Transactions" WHERE {" AND ".join(conditions)} ORDER BY History, rowid LIMIT ?"""
+        lowest = max((bound for bound in (after and after[0], since and _history_bound(since)) if bound), default=None)
+        rows = self._reader().execute(query, parameters + [limit]).fetchall()
+        pages = [rows]
+        for first_history, path in self.archives_between(lowest, until and _history_bound(until, end_of_day=True)):
+            if len(rows) == limit and rows[-1][5] < first_history:
+                break
+            pages.append(open_archive(path).execute(query, parameters + [limit]).fetchall())
+            rows = list(itertools.islice(heapq.merge(*pages, key=lambda row: (row[5], row[6])), limit))
+        cursor = (rows[-1][5], rows[-1][6]) if len(rows) == limit else None
+        return [row[:6] for row in rows], cursor
+
+    def recent_ledger(self, since):
+        # Rowids follow History, so the first row is found by a binary search on rowid and
+        # the rest is one range scan
+        reader = self._reader()
+        first = _first_rowid_from(reader, _history_bound(since), 1)
+        return reader.execute("""SELECT Name, "Bank Account Number", "Transaction Type", Amount, Balance, History
+            FROM "Account Transactions" WHERE rowid >= ? ORDER BY rowid""", (first,))
+
+    def archives_between(self, since=None, until=None):
+        # (First History, path) of the archived ledger files holding rows between two History bounds
+        return self._reader().execute("""SELECT "First History", Path FROM 'Ledger Archives'
+            WHERE "Last History" >= COALESCE(?, "Last History") AND "First History" <= COALESCE(?, "First History")
+            ORDER BY "First History" """, (since, until)).fetchall()
+
+    def admin_exists(self, username):
+        return self._reader().execute("SELECT Username FROM 'Admin' WHERE Username = ?", (username,)).fetchone() is not None
+
+    def insert_admin(self, username, password):
+        with UnitOfWork() as work:
+            work.connection.execute("INSERT INTO 'Admin' (Username, Password) VALUES (?, ?)", (username, PasswordHasher.hash(password)))
+
+    def check_admin(self, username, password):
+        row = self._reader().execute("SELECT Password FROM 'Admin' WHERE Username = ?", (username,)).fetchone()
+        matches, needs_rehash = PasswordHasher.verify(password, row[0] if row else None)
+        if needs_rehash:
+            with UnitOfWork() as work:
+                work.connection.execute("UPDATE 'Admin' SET Password = ? WHERE Username = ?", (PasswordHasher.hash(password), username))
+        return matches
+
+    def set_password(self, bank_account_number, password_hash):
+        with UnitOfWork() as work:
+            work.connection.execute('UPDATE "Client Account" SET Password = ? WHERE "Bank Account Number" = ?', (password_hash, bank_account_number))
+
+    def reserve_account_numbers(self, count):
+        # Its own connection, so reserving never commits or joins a caller's transaction
+        if self._sequence_connection is None or self._sequence_path != pool.path:
+            self._sequence_path = pool.path
+            pool.connection()           # Make sure the schema exists
+            self._sequence_connection = sql.connect(self._sequence_path, timeout=pool.timeout, check_same_thread=False)
+        connection = self._sequence_connection
+        connection.execute("BEGIN IMMEDIATE")
+        try:
+            row = connection.execute("""SELECT "Next Value" FROM 'Account Number Sequence' WHERE Name = 'account'""").fetchone()
+            start = row[0] if row else FIRST_ACCOUNT_SEQUENCE
+            if start + count - 1 > LAST_ACCOUNT_SEQUENCE:
+                raise BankError("No bank account numbers left")
+            connection.execute("""INSERT INTO 'Account Number Sequence' (Name, "Next Value") VALUES ('account', ?)
+                ON CONFLICT (Name) DO UPDATE SET "Next Value" = excluded."Next Value"
+            """, (start + count,))
+            connection.commit()
+        except BaseException:
+            connection.rollback()
+            raise
+        return start
+
+    def close_sequence(self):
+        if self._sequence_connection is not None:
+            self._sequence_connection.close()
+        self._sequence_connection = None
+
+    # Deposits and withdrawals update the balance relative to the stored value inside a
+    # UnitOfWork, so any number of threads can post to the same account without losing updates.
+    def deposit(self, bank_account_number, amount):
+        with UnitOfWork() as work:
+            if work.connection.execute('UPDATE "Client Account" SET Balance = Balance + ? WHERE "Bank Account Number" = ?', (amount, bank_account_number)).rowcount == 0:
+                raise BankError("Account not found.")
+            name, balance = work.connection.execute('SELECT Name, Balance FROM "Client Account" WHERE "Bank Account Number" = ?', (bank_account_number,)).fetchone()
+            # Here, the Transaction is recorded for the deposit or save the transaction details
+            Transaction(name, bank_account_number, "Deposit", amount, balance, self.now()).save_to_db()
+        return balance
+
+    def withdraw(self, bank_account_number, amount):
+        with UnitOfWork() as work:
+            debit = work.connection.execute(f"""UPDATE "Client Account" SET Balance = Balance - ?
+                WHERE "Bank Account Number" = ? AND "Account Type" <> 'Saving' AND Balance - ? >= {MINIMUM_BALANCE_SQL}""",
+                (amount, bank_account_number, amount, SavingAccount.mini_amount, CurrentAccount.mini_amount))
+            if debit.rowcount == 0:
+                # Only a refusal pays for finding out which rule refused it
+                account = work.connection.execute('SELECT "Account Type" FROM "Client Account" WHERE "Bank Account Number" = ?',
+                                                  (bank_account_number,)).fetchone()
+                raise BankError((account and withdrawal_refusal(account[0]))
+                                or "There is not enough balance in your account or it would fall below the minimum allowed.")
+            name, balance = work.connection.execute('SELECT Name, Balance FROM "Client Account" WHERE "Bank Account Number" = ?', (bank_account_number,)).fetchone()
+            Transaction(name, bank_account_number, "Withdraw", amount, balance, self.now()).save_to_db()
+        return balance
+
+    # The unit of work holds the write lock, so the balance read here is still current when written
+    def credit_interest(self, bank_account_number, rate):
+        with UnitOfWork() as work:
+            account = work.connection.execute("""SELECT Name, Balance FROM "Client Account" WHERE "Bank Account Number" = ? AND "Account Type" = 'Saving'""", (bank_account_number,)).fetchone()
+            if account is None:
+                raise BankError("❌ Interest application is only available for Saving Accounts.")
+            name, balance = account
+            amount_with_interest = interest_minor(balance, rate)
+            new_balance = balance + amount_with_interest
+            # Here, the Transaction is recorded for the interest application
+            Transaction(name, bank_account_number, "Interest", amount_with_interest, new_balance, self.now()).save_to_db()
+            # Update balance in DB after interest application
+            work.connection.execute('UPDATE "Client Account" SET Balance = ? WHERE "Bank Account Number" = ?', (new_balance, bank_account_number))
+        return amount_with_interest, new_balance
+
+    # Moves money between two accounts in a single BEGIN IMMEDIATE transaction.
+    # The debit is a relative, guarded UPDATE (Balance = Balance - amount only if the result
+    # stays above the account minimum), so concurrent tellers and processes can never lose
+    # an update or overdraw an account. SQLITE_BUSY is retried with exponential backoff.
+    def transfer(self, sender_number, receiver_number, amount, connection=None, retries=10, backoff=0.002):
+        connection = connection or pool.connection()
+        for attempt in range(retries + 1):
+            try:
+                return self._transfer_once(connection, sender_number, receiver_number, amount)
+            except sql.OperationalError as error:
+                if "locked" not in str(error) and "busy" not in str(error):
+                    raise
+                if attempt == retries:
+                    raise BankError("The bank is busy right now, please try again") from error
+                # Exponential backoff with jitter so competing writers do not retry in lockstep
+                time.sleep(backoff * (2 ** attempt) * random.uniform(0.5, 1.5))
+
+    def _transfer_once(self, connection, sender_number, receiver_number, amount):
+        begin_immediate(connection)
+        try:
+            debit = connection.execute(f"""UPDATE "Client Account" SET Balance = Balance - ?
+                WHERE "Bank Account Number" = ? AND Balance - ? >= {MINIMUM_BALANCE_SQL}""",
+                (amount, sender_number, amount, SavingAccount.mini_amount, CurrentAccount.mini_amount))
+            if debit.rowcount == 0:
+                if connection.execute('SELECT 1 FROM "Client Account" WHERE "Bank Account Number" = ?', (sender_number,)).fetchone():
+                    raise BankError("Insufficient balance or transfer would fall below minimum allowed.")
+                raise BankError("The sender account not found.")
+
+            credit = connection.execute('UPDATE "Client Account" SET Balance = Balance + ? WHERE "Bank Account Number" = ?', (amount, receiver_number))
+            if credit.rowcount == 0:
+                raise BankError("The receiver account not found.")
+
+            sender_name, sender_balance = connection.execute('SELECT Name, Balance FROM "Client Account" WHERE "Bank Account Number" = ?', (sender_number,)).fetchone()
+            receiver_name, receiver_balance = connection.execute('SELECT Name, Balance FROM "Client Account" WHERE "Bank Account Number" = ?', (receiver_number,)).fetchone()
+
+            sent = Transaction(sender_name, sender_number, "Transfer Sent", amount, sender_balance, self.now())
+            received = Transaction(receiver_name, receiver_number, "Transfer Received", amount, receiver_balance, sent.history)
+            append_ledger(connection, [sent.as_row(), received.as_row()])
+            connection.commit()
+        except BaseException:
+            connection.rollback()
+            raise
+        return sender_balance, receiver_balance
+
+
+# ------------------------- In-Memory Backend --------------------------------
+# Accounts in a dict, the ledger in an append-only list (a row's position is its rowid)
+# with each account's positions alongside, admins in a dict. One lock covers every write,
+# so threads see the same all-or-nothing behaviour as with SQLite. Nothing outside the
+# process can reach the list, so its rows are not hash-chained. Nothing survives the
+# process: it is for tests, simulations and replays, e.g.
+#
+#   use_backend(MemoryBackend(clock=simulated_clock))
+class MemoryBackend(StorageBackend):
+    def __init__(self, clock=None):
+        self.clock = clock
+        self._accounts = {}         # number -> [Name, ..., Bank Account Number, Time], like a table row
+        self._closed = {}           # number -> the closed account's row, plus the time it was closed
+        self._ledger = []
+        self._positions = {}        # number -> ledger positions of the account, in append order
+        self._admins = {}
+        self._next_sequence = FIRST_ACCOUNT_SEQUENCE
+        self._lock = threading.RLock()
+
+    def data_version(self):
+        return 0        # Only this process can change it, and it keeps its objects current itself
+
+    # ---- Accounts ----
+    def load_account(self, bank_account_number):
+        account = self._accounts.get(bank_account_number)
+        return tuple(account[:9]) if account else None
+
+    def iter_accounts(self, numbers=None, batch=10_000):
+        numbers = sorted(self._accounts) if numbers is None else list(numbers)
+        for first in range(0, len(numbers), batch):
+            yield [self.load_account(number) for number in numbers[first:first + batch] if number in self._accounts]
+
+    def account_balance(self, bank_account_number):
+        account = self._accounts.get(bank_account_number)
+        return (account[5], account[6]) if account else None
+
+    def account_summary(self, bank_account_number, name=None):
+        account = self._accounts.get(bank_account_number)
+        if account is None or (name is not None and account[0] != name):
+            return None
+        name, nationality, gender, phone_number, _, account_type, balance, _, number, opened = account
+        return (name, gender, nationality, phone_number, account_type, number, balance, opened)
+
+    def insert_accounts(self, rows):
+        with self._lock:
+            rows = [list(row) for row in rows]
+            numbers = [row[8] for row in rows]
+            if len(set(numbers)) != len(numbers) or any(number in self._accounts for number in numbers):
+                raise sql.IntegrityError("UNIQUE constraint failed: Client Account.Bank Account Number")
+            for row in rows:
+                self._accounts[row[8]] = row
+
+    @instrumented("delete_account")
+    def delete_account(self, name, bank_account_number):
+        with self._lock:
+            account = self._accounts.get(bank_account_number)
+            if account is None or account[0] != name:
+                return False
+            closed = self.now()
+            self._closed[bank_account_number] = account + [closed]
+            del self._accounts[bank_account_number]
+            self.add_transaction((account[0], bank_account_number, "Account Closed", 0, account[6], closed))
+            return True
+
+    def set_password(self, bank_account_number, password_hash):
+        with self._lock:
+            if bank_account_number in self._accounts:
+                self._accounts[bank_account_number][7] = password_hash
+
+    def reserve_account_numbers(self, count):
+        with self._lock:
+            start = self._next_sequence
+            if start + count - 1 > LAST_ACCOUNT_SEQUENCE:
+                raise BankError("No bank account numbers left")
+            self._next_sequence += count
+            return start
+
+    # ---- Ledger and balances ----
+    def add_transactions(self, rows):
+        with self._lock:
+            for row in rows:
+                self._positions.setdefault(row[1], []).append(len(self._ledger))
+                self._ledger.append(tuple(row))
+
+    def transactions_page(self, bank_account_number, after=None, limit=20, since=None, until=None, types=None):
+        # Same filters, order and cursor as BankRepository.transactions_page()
+        since = since and _history_bound(since)
+        until = until and _history_bound(until, end_of_day=True)
+        ledger = self._ledger
+        matches = []
+        for position in self._positions.get(bank_account_number, ()):
+            row = ledger[position]
+            if ((after is None or (row[5], position) > tuple(after)) and (not since or row[5] >= since)
+                    and (not until or row[5] <= until) and (not types or row[2] in types)):
+                matches.append((row[5], position))
+        page = heapq.nsmallest(limit, matches)
+        cursor = page[-1] if len(page) == limit else None
+        return [ledger[position] for _, position in page], cursor
+
+    def recent_ledger(self, since):
+        since = _history_bound(since)
+        first = len(self._ledger)
+        while first and self._ledger[first - 1][5] >= since:
+            first -= 1
+        return self._ledger[first:]
+
+    def _balance_update(self, bank_account_number, new_balance, trans_type, amount):
+        account = self._accounts[bank_account_number]
+        account[6] = new_balance
+        self.add_transaction(Transaction(account[0], bank_account_number, trans_type, amount, new_balance, self.now()).as_row())
+        return new_balance
+
+    def _minimum(self, account):
+        account_class = ACCOUNT_CLASSES.get(account[5])
+        return account_class.mini_amount if account_class else 0
+
+    def deposit(self, bank_account_number, amount):
+        with self._lock:
+            account = self._accounts.get(bank_account_number)
+            if account is None:
+                raise BankError("Account not found.")
+            return self._balance_update(bank_account_number, account[6] + amount, "Deposit", amount)
+
+    def withdraw(self, bank_account_number, amount):
+        with self._lock:
+            account = self._accounts.get(bank_account_number)
+            refusal = account and withdrawal_refusal(account[5])
+            if refusal:
+                raise BankError(refusal)
+            if account is None or account[6] - amount < self._minimum(account):
+                raise BankError("There is not enough balance in your account or it would fall below the minimum allowed.")
+            return self._balance_update(bank_account_number, account[6] - amount, "Withdraw", amount)
+
+    def credit_interest(self, bank_account_number, rate):
+        with self._lock:
+            account = self._accounts.get(bank_account_number)
+            if account is None or account[5] != "Saving":
+                raise BankError("❌ Interest application is only available for Saving Accounts.")
+            amount_with_interest = interest_minor(account[6], rate)
+            return amount_with_interest, self._balance_update(bank_account_number, account[6] + amount_with_interest, "Interest", amount_with_interest)
+
+    def transfer(self, sender_number, receiver_number, amount, **options):
+        with self._lock:
+            sender = self._accounts.get(sender_number)
+            if sender is None:
+                raise BankError("The sender account not found.")
+            if sender[6] - amount < self._minimum(sender):
+                raise BankError("Insufficient balance or transfer would fall below minimum allowed.")
+            receiver = self._accounts.get(receiver_number)
+            if receiver is None:
+                raise BankError("The receiver account not found.")
+            sender[6] -= amount
+            receiver[6] += amount
+            sent = Transaction(sender[0], sender_number, "Transfer Sent", amount, sender[6], self.now())
+            received = Transaction(receiver[0], receiver_number, "Transfer Received", amount, receiver[6], sent.history)
+            self.add_transactions([sent.as_row(), received.as_row()])
+            return sender[6], receiver[6]
+
+    # ---- Admins ----
+    def admin_exists(self, username):
+        return username in self._admins
+
+    def insert_admin(self, username, password):
+        with self._lock:
+            self._admins[username] = PasswordHasher.hash(password)
+
+    def check_admin(self, username, password):
+        matches, needs_rehash = PasswordHasher.verify(password, self._admins.get(username))
+        if needs_rehash:
+            self.insert_admin(username, password)
+        return matches
+
+
+repository = BankRepository()
+
+
+# Point the module at another storage engine (a MemoryBackend for a simulation, or a
+# fresh BankRepository to go back to SQLite). Returns the backend.
+def use_backend(backend):
+    global repository
+    repository = backend
+    account_cache.clear()       # Cached accounts belong to the previous backend
+    velocity.clear()
+    account_numbers.reset()
+    return backend
+
+
+# A date alone ("2025-01-31") covers the whole day when used as the end of a range
+def _history_bound(value, end_of_day=False):
+    value = str(value)
+    if len(value) == 10:
+        return value + (" 23:59:59" if end_of_day else " 00:00:00")
+    return value
+
+
+# Streams an account's history one page at a time, with optional from/to timestamps and
+# transaction types. Only one page is ever held in memory and the first rows come back
+# in constant time, whatever the length of the history.
+def iter_history(bank_account_number, since=None, until=None, types=None, page_size=100):
+    cursor = None
+    while True:
+        rows, cursor = repository.transactions_page(bank_account_number, cursor, page_size, since, until, types)
+        yield from rows
+        if cursor is None:
             return
-        # Ensure sender account has enough balance, considering its minimum amount
-        if isinstance(sender_account, CurrentAccount):
-            sender_min_amount = CurrentAccount.mini_amount
-        elif isinstance(sender_account, SavingAccount):
-            sender_min_amount = SavingAccount.mini_amount
-        else:
-            sender_min_amount = 0
-        
-        if sender_account.get_balance() - transfer_amount < sender_min_amount:
-            print("❌ Insufficient balance or transfer would fall below minimum allowed.")
+
+
+# ------------------------- Account Cache --------------------------------
+# Bounded LRU cache of loaded account objects, keyed by bank account number, so hot
+# accounts (merchants, frequent transfer receivers) are not reloaded on every lookup.
+# It is write-through: every deposit, withdraw, transfer and interest posting updates
+# the cached balance after it is written, and closed accounts are dropped.
+# capacity = 0 turns the cache off.
+class AccountCache:
+    def __init__(self, capacity=10_000):
+        self.capacity = capacity
+        self._accounts = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, bank_account_number):
+        with self._lock:
+            account = self._accounts.get(bank_account_number)
+            if account is None:
+                self.misses += 1
+                return None
+            self._accounts.move_to_end(bank_account_number)
+            self.hits += 1
+            return account
+
+    def put(self, account):
+        if self.capacity <= 0:
             return
-        
-        sender_account.set_balance(sender_account.get_balance() - transfer_amount)
-        Transaction(sender_account.name, sender_account.bank_account_number, "Transfer Sent", transfer_amount, sender_account.get_balance())
-        
-        receiver_account.set_balance(receiver_account.get_balance() + transfer_amount)
-        Transaction(receiver_account.name, receiver_account.bank_account_number, "Transfer Received", transfer_amount, receiver_account.get_balance())
-        
-        print(f"✅ Transfer of {transfer_amount} successful. New balance: {sender_account.get_balance()}")
-        return sender_account.get_balance()
-    
-    
-# ---------------------------------------------------------------------------------------------------------------------------------------------------------
+        with self._lock:
+            self._accounts[account.bank_account_number] = account
+            self._accounts.move_to_end(account.bank_account_number)
+            while len(self._accounts) > self.capacity:
+                self._accounts.popitem(last=False)      # Least recently used
+                self.evictions += 1
+
+    def update_balance(self, bank_account_number, balance):
+        with self._lock:
+            account = self._accounts.get(bank_account_number)
+            if account is not None:
+                account.set_balance(balance)
+
+    def invalidate(self, bank_account_number):
+        with self._lock:
+            self._accounts.pop(bank_account_number, None)
+
+    def clear(self):
+        with self._lock:
+            self._accounts.clear()
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {"size": len(self._accounts), "capacity": self.capacity, "hits": self.hits, "misses": self.misses,
+                    "evictions": self.evictions, "hit_rate": self.hits / lookups if lookups else 0.0}
+
+
+account_cache = AccountCache()
+
+
+# ------------------------- Money --------------------------------
+# Every amount in the bank (balances, ledger rows, minimums, interest) is an int of minor
+# units: piastres, 1/100 of a pound. Adding and comparing ints is exact, so sums never
+# drift however many operations are posted. Pounds only appear at the edges: to_minor()
+# parses what a user or a file typed, format_money() prints it back.
+MINOR_UNITS = 100
+
+
+# "12.5" / 12.5 / Decimal("12.50") -> 1250. Raises ValueError for anything that is not
+# a finite amount with at most two decimals (never rounds what the user typed).
+def to_minor(amount):
+    if isinstance(amount, bool):
+        raise ValueError(f"invalid amount: {amount!r}")
+    try:
+        value = Decimal(str(amount).strip()) * MINOR_UNITS
+    except InvalidOperation:
+        raise ValueError(f"invalid amount: {amount!r}") from None
+    if not value.is_finite() or value != value.to_integral_value():
+        raise ValueError(f"invalid amount: {amount!r} (at most two decimals)")
+    return int(value)
+
+
+# 1250 -> "12.50"
+def format_money(minor_units):
+    sign = "-" if minor_units < 0 else ""
+    pounds, piastres = divmod(abs(minor_units), MINOR_UNITS)
+    return f"{sign}{pounds}.{piastres:02d}"
+
+
+# Interest is computed in basis points (0.12 -> 1200) and rounded half up to the nearest
+# piastre: (balance * basis points + 5000) // 10000. Balances are never negative, so the
+# same formula gives the same result in Python and in SQLite's integer division.
+BASIS_POINTS = 10_000
+INTEREST_SQL = "(Balance * ? + 5000) / 10000"
+
+
+def rate_basis_points(rate):
+    return int((Decimal(str(rate)) * BASIS_POINTS).to_integral_value())
+
+
+def interest_minor(balance, rate):
+    return (balance * rate_basis_points(rate) + BASIS_POINTS // 2) // BASIS_POINTS
+
+
+# Money columns of the summary / balance / history rows, printed as pounds
+MONEY_COLUMNS = ("Balance", "Amount", "Balance After")
+
+
+def display_value(column, value):
+    return format_money(value) if column in MONEY_COLUMNS and value is not None else value
+
+
+# ------------------------- Passwords --------------------------------
+# Client and admin passwords are stored as salted, memory-hard hashes in the same Password
+# columns: "scrypt$n$r$p$salt$hash" (or "pbkdf2_sha256$iterations$salt$hash" where OpenSSL
+# has no scrypt). Rows still holding a plaintext password, or a hash made with older cost
+# settings, are re-hashed the next time their owner logs in.
+#
+# Each verification deliberately costs tens of milliseconds, so:
+#   - PasswordHasher.workers > 0 runs the key derivation in a process pool (the network
+#     service uses it so logins do not queue behind each other),
+#   - a successful verification is remembered for cache_seconds, keyed by an HMAC with a
+#     per-process secret, so a client repeating a request is not hashed again,
+#   - a login opens a session (see SessionManager), so later actions need no password.
+class PasswordHasher:
+    scheme = "scrypt" if hasattr(hashlib, "scrypt") else "pbkdf2_sha256"
+    scrypt_n = 2 ** 14          # Cost: memory is 128 * n * r bytes (16 MB) per hash
+    scrypt_r = 8
+    scrypt_p = 1
+    pbkdf2_iterations = 600_000
+    workers = 0
+    cache_seconds = 300.0
+    cache_size = 10_000
+
+    _executor = None
+    _cache = OrderedDict()
+    _cache_key = secrets.token_bytes(32)
+    _lock = threading.Lock()
+
+    @staticmethod
+    def current_parameters():
+        if PasswordHasher.scheme == "scrypt":
+            return [PasswordHasher.scrypt_n, PasswordHasher.scrypt_r, PasswordHasher.scrypt_p]
+        return [PasswordHasher.pbkdf2_iterations]
+
+    @staticmethod
+    def _derive(scheme, parameters, password, salt):
+        if scheme == "scrypt":
+            n, r, p = parameters
+            function, arguments = hashlib.scrypt, {"password": password, "salt": salt, "n": n, "r": r, "p": p,
+                                                   "maxmem": 256 * n * r * p + 2 ** 20, "dklen": 32}
+        else:
+            function, arguments = hashlib.pbkdf2_hmac, {"hash_name": "sha256", "password": password, "salt": salt,
+                                                        "iterations": parameters[0]}
+        if PasswordHasher.workers <= 0:
+            return function(**arguments)
+        with PasswordHasher._lock:
+            if PasswordHasher._executor is None:
+                import multiprocessing
+                from concurrent.futures import ProcessPoolExecutor
+                # hashlib functions pickle by name, so the workers never import this module's state
+                PasswordHasher._executor = ProcessPoolExecutor(PasswordHasher.workers, mp_context=multiprocessing.get_context("spawn"))
+        return PasswordHasher._executor.submit(function, **arguments).result()
+
+    @staticmethod
+    def is_hash(value):
+        return isinstance(value, str) and value.startswith(("scrypt$", "pbkdf2_sha256$"))
+
+    @staticmethod
+    def hash(password):
+        salt = secrets.token_bytes(16)
+        parameters = PasswordHasher.current_parameters()
+        digest = PasswordHasher._derive(PasswordHasher.scheme, parameters, str(password).encode(), salt)
+        return "$".join([PasswordHasher.scheme, *map(str, parameters), base64.b64encode(salt).decode(), base64.b64encode(digest).decode()])
+
+    # Returns (matches, needs re-hash). Plaintext rows match by constant-time comparison.
+    @staticmethod
+    def verify(password, stored):
+        if password is None or stored is None:
+            return False, False
+        password = str(password).encode()
+        if not PasswordHasher.is_hash(stored):
+            matches = hmac.compare_digest(password, str(stored).encode())
+            return matches, matches
+
+        scheme, *fields = stored.split("$")
+        parameters, salt, digest = [int(field) for field in fields[:-2]], base64.b64decode(fields[-2]), base64.b64decode(fields[-1])
+        needs_rehash = scheme != PasswordHasher.scheme or parameters != PasswordHasher.current_parameters()
+        key = hmac.new(PasswordHasher._cache_key, stored.encode() + b"\0" + password, hashlib.sha256).digest()
+        with PasswordHasher._lock:
+            expires = PasswordHasher._cache.get(key)
+            if expires is not None and expires > time.monotonic():
+                PasswordHasher._cache.move_to_end(key)
+                return True, needs_rehash
+
+        matches = hmac.compare_digest(PasswordHasher._derive(scheme, parameters, password, salt), digest)
+        if matches and PasswordHasher.cache_seconds > 0:
+            with PasswordHasher._lock:
+                PasswordHasher._cache[key] = time.monotonic() + PasswordHasher.cache_seconds
+                if len(PasswordHasher._cache) > PasswordHasher.cache_size:
+                    PasswordHasher._cache.popitem(last=False)
+        return matches, needs_rehash
+
+    @staticmethod
+    def clear_cache():
+        with PasswordHasher._lock:
+            PasswordHasher._cache.clear()
+
+
+# Change the hashing cost or the verification pool. New settings apply to new hashes and
+# to existing ones as their owners log in.
+def configure_password_hashing(scheme=None, scrypt_n=None, scrypt_r=None, scrypt_p=None, pbkdf2_iterations=None, workers=None, cache_seconds=None):
+    settings = {"scheme": scheme, "scrypt_n": scrypt_n, "scrypt_r": scrypt_r, "scrypt_p": scrypt_p,
+                "pbkdf2_iterations": pbkdf2_iterations, "workers": workers, "cache_seconds": cache_seconds}
+    for name, value in settings.items():
+        if value is not None:
+            setattr(PasswordHasher, name, value)
+    if workers is not None:
+        with PasswordHasher._lock:
+            executor, PasswordHasher._executor = PasswordHasher._executor, None
+        if executor is not None:
+            executor.shutdown()
+    PasswordHasher.clear_cache()
+
+
+# ------------------------- Sessions --------------------------------
+# A client logs in once; its loaded account then lives in an in-memory session table
+# until the session's lifetime (ttl) runs out or it sits unused for idle_timeout seconds.
+# The menu and the network service look the account up by session token, so an action
+# costs no password check and no account query.
+#
+# Writes made by this process keep the account objects current themselves. To notice
+# writes from other processes too, the manager watches SQLite's PRAGMA data_version,
+# which changes whenever another connection commits, and re-reads a session's balance
+# only after the database has changed since that session last refreshed.
+class Session:
+    def __init__(self, token, account, expires_at, generation):
+        self.token = token
+        self.account = account
+        self.expires_at = expires_at
+        self.last_used = time.monotonic()
+        self.generation = generation
+
+
+class SessionManager:
+    ttl = 15 * 60
+    idle_timeout = 5 * 60
+    sweep_every = 1024      # Drop dead sessions once per this many new ones
+
+    def __init__(self):
+        self._sessions = {}
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._generation = 0
+        self._opened = 0
+        self.refreshes = 0
+
+    def _current_generation(self):
+        # Bumped whenever this thread's read connection sees a commit it has not seen yet
+        # (a new connection counts as a change, since it has no history to compare with)
+        version = repository.data_version()
+        if getattr(self._local, "seen", None) != version:
+            self._local.seen = version
+            with self._lock:
+                self._generation += 1
+        return self._generation
+
+    def _expired(self, session, now):
+        return now >= session.expires_at or now - session.last_used >= self.idle_timeout
+
+    def open(self, account):
+        token = secrets.token_urlsafe(24)
+        session = Session(token, account, time.monotonic() + self.ttl, self._current_generation())
+        with self._lock:
+            self._sessions[token] = session
+            self._opened += 1
+            sweep = self._opened % self.sweep_every == 0
+        if sweep:
+            self.sweep()
+        return session
+
+    def login(self, bank_account_number, password):
+        # A new session when the number and password match, otherwise None
+        account = ClientAccount.authenticate(bank_account_number, password)
+        return self.open(account) if account is not None else None
+
+    def get(self, token):
+        # The live session of a token (its account refreshed if the database changed), otherwise None
+        now = time.monotonic()
+        with self._lock:
+            session = self._sessions.get(token)
+            if session is None:
+                return None
+            if self._expired(session, now):
+                del self._sessions[token]
+                return None
+            session.last_used = now
+        generation = self._current_generation()
+        if session.generation != generation:
+            row = repository.account_balance(session.account.bank_account_number)
+            if row is None:     # The account was closed meanwhile
+                self.close(token)
+                return None
+            session.account.set_balance(row[1])
+            session.generation = generation
+            self.refreshes += 1
+        return session
+
+    def account(self, token):
+        session = self.get(token)
+        return session.account if session is not None else None
+
+    def close(self, token):
+        with self._lock:
+            self._sessions.pop(token, None)
+
+    def sweep(self):
+        now = time.monotonic()
+        with self._lock:
+            for token in [token for token, session in self._sessions.items() if self._expired(session, now)]:
+                del self._sessions[token]
+
+    def __len__(self):
+        return len(self._sessions)
+
+
+sessions = SessionManager()
+
+
+# The one INSERT used for every ledger row, whichever code path writes it (through append_ledger())
+INSERT_TRANSACTION_SQL = """
+    INSERT INTO 'Account Transactions' (Name, 'Bank Account Number', 'Transaction Type', Amount, Balance, History, Seq, Hash, rowid)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+"""
+
+
+# ------------------------- Ledger Hash Chain --------------------------------
+# The ledger is tamper-evident: rows are numbered in one book-wide sequence (Seq) and each
+# row's Hash is sha256(Hash of the row before + the row's values as JSON). Changing, removing
+# or slipping in a row anywhere breaks every link check from there on, which
+# verify_ledger() finds. The triggers of migrations 18-19 stop the application from
+# changing or deleting rows by mistake; the chain is what shows it if anyone does.
+LEDGER_GENESIS_HASH = bytes(32)         # "Hash" of the row before the first one
+LEDGER_HEAD_SQL = "SELECT Seq, Hash FROM 'Ledger Head' WHERE Id = 1"
+# With the last rowid given out; MAX(rowid) (one seek) also covers rows inserted without append_ledger()
+LEDGER_APPEND_HEAD_SQL = """SELECT Seq, Hash, MAX(COALESCE("Last Rowid", 0), (SELECT COALESCE(MAX(rowid), 0) FROM "Account Transactions"))
+    FROM 'Ledger Head' WHERE Id = 1"""
+_ledger_json = json.JSONEncoder(ensure_ascii=False, separators=(",", ":")).encode    # Built once: json.dumps() with options builds one per call
+
+
+# row: Name, Bank Account Number, Transaction Type, Amount, Balance, History
+def ledger_hash(previous_hash, seq, row):
+    return hashlib.sha256(previous_hash + _ledger_json([seq, *row]).encode()).digest()
+
+
+# Chains ledger rows onto the head and inserts them. Runs inside the caller's write transaction
+# (UnitOfWork and begin_immediate() both hold SQLite's write lock), so no other connection or
+# process can move the head in between. Returns the number of rows written.
+def append_ledger(connection, rows):
+    seq, previous_hash, rowid = connection.execute(LEDGER_APPEND_HEAD_SQL).fetchone()
+    chained = []
+    for name, number, trans_type, amount, balance, history in rows:
+        # Stored as SQLite gives them back, so the verifier hashes exactly the same values
+        row = (name, int(number), trans_type, int(amount), int(balance), history)
+        seq += 1
+        rowid += 1          # Never reused, even once archiving has emptied the table (migrations 25-26)
+        previous_hash = ledger_hash(previous_hash, seq, row)
+        chained.append(row + (seq, previous_hash, rowid))
+    if chained:
+        connection.executemany(INSERT_TRANSACTION_SQL, chained)
+        connection.execute("""UPDATE 'Ledger Head' SET Seq = ?, Hash = ?, "Last Rowid" = ? WHERE Id = 1""", (seq, previous_hash, rowid))
+    return len(chained)
+
+
+# Schema migration 12: chains the rows written before the ledger was chained, in rowid
+# (= writing) order. Rows already moved to archive files stay outside the chain.
+def chain_existing_ledger(connection, batch=50_000):
+    seq, previous_hash, last_rowid = 0, LEDGER_GENESIS_HASH, 0
+    while True:
+        rows = connection.execute("""SELECT rowid, Name, "Bank Account Number", "Transaction Type", Amount, Balance, History
+            FROM "Account Transactions" WHERE rowid > ? ORDER BY rowid LIMIT ?""", (last_rowid, batch)).fetchall()
+        if not rows:
+            break
+        updates = []
+        for rowid, *row in rows:
+            seq += 1
+            previous_hash = ledger_hash(previous_hash, seq, row)
+            updates.append((seq, previous_hash, rowid))
+        connection.executemany('UPDATE "Account Transactions" SET Seq = ?, Hash = ? WHERE rowid = ?', updates)
+        last_rowid = rows[-1][0]
+    connection.execute("INSERT OR REPLACE INTO 'Ledger Head' (Id, Seq, Hash) VALUES (1, ?, ?)", (seq, previous_hash))
+
+
+# Schema migration 26: the largest rowid given out so far, in the hot table or any archive
+# file (a book whose hot table archiving already emptied starts after its archives)
+def record_last_ledger_rowid(connection):
+    last_rowid = connection.execute('SELECT COALESCE(MAX(rowid), 0) FROM "Account Transactions"').fetchone()[0]
+    for (path,) in connection.execute("SELECT Path FROM 'Ledger Archives'").fetchall():
+        if os.path.exists(_archive_path(path)):
+            archive = sql.connect(f"file:{urllib.parse.quote(os.path.abspath(archive_file(path)))}?mode=ro&immutable=1", uri=True)
+            try:
+                last_rowid = max(last_rowid, archive.execute('SELECT COALESCE(MAX(rowid), 0) FROM "Account Transactions"').fetchone()[0])
+            finally:
+                archive.close()
+    connection.execute("""UPDATE 'Ledger Head' SET "Last Rowid" = ? WHERE Id = 1""", (last_rowid,))
+
+
+
+# ------------------------------------------------
+# -------------- Transaction Class ---------------
+# ------------------------------------------------
+
+# A ledger row. Slotted (no per-object __dict__) so batch jobs can hold many of them, and
+# building one no longer writes it: call save_to_db(), or Transaction.save_many() for a batch.
+class Transaction:
+    __slots__ = ("name", "bank_account_number", "trans_type", "amount", "balance", "history")
+
+    def __init__(self, name, bank_account_number, trans_type, amount, balance, history=None):
+        self.name = name
+        self.bank_account_number = bank_account_number
+        self.trans_type = trans_type
+        self.amount = amount
+        self.balance = balance
+        # Generate a timestamp for the transaction unless it comes from a ledger row
+        # datetime.datetime.now() returns the current local date and time
+        self.history = history or datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+
+    # The ledger row values append_ledger() takes (and a ledger SELECT of the same columns gives back)
+    def as_row(self):
+        return (self.name, self.bank_account_number, self.trans_type, self.amount, self.balance, self.history)
+
+    def save_to_db(self):             # This method save the transaction details to the DB
+        # Committed together with the rest of the operation by the surrounding UnitOfWork
+        repository.add_transaction(self.as_row())
+
+    @staticmethod
+    def save_many(transactions):
+        repository.add_transactions(transaction.as_row() for transaction in transactions)
+    
+    
+    @ staticmethod
+    def deposit(account, deposit_amount):
+        if deposit_amount < 0:
+            print("❌ Invalid operation")
+        else:
+            # The balance is updated relative to what is in the DB, so other tellers' updates are kept
+            try:
+                new_balance = deposit_funds(account.bank_account_number, deposit_amount)
+            except BankError as error:
+                print(f"❌ {error}")
+                return
+            account.set_balance(new_balance)
+            print(f"✅ Deposit successful. New balance: {format_money(new_balance)}")
+            
+            return account.get_balance()    # Return the new balance after deposit
+    
+    
+    @ staticmethod
+    def withdraw(account, withdraw_amount):
+        if withdraw_amount <= 0: # Added check for non-positive withdraw amount
+            print("❌ Invalid operation: Withdraw amount must be positive.")
+        else:
+            # The minimum allowed balance of the account type is checked inside the DB update
+            try:
+                new_balance = withdraw_funds(account.bank_account_number, withdraw_amount)
+            except BankError as error:
+                print(error)
+                return
+            account.set_balance(new_balance)
+            print(f"✅ Withdraw successful. New balance: {format_money(new_balance)}")
+            return account.get_balance()
+    
+    
+    @ staticmethod
+    def transfer(sender_account, receiver_account, transfer_amount):
+        # The balances are checked and moved inside the database by the transfer engine,
+        # so a stale in-memory balance can never overwrite another teller's update
+        try:
+            sender_balance, receiver_balance = transfer_funds(sender_account.bank_account_number, receiver_account.bank_account_number, transfer_amount)
+        except BankError as error:
+            print(f"❌ {error}")
+            return
+
+        sender_account.set_balance(sender_balance)
+        receiver_account.set_balance(receiver_balance)
+
+        print(f"✅ Transfer of {format_money(transfer_amount)} successful. New balance: {format_money(sender_account.get_balance())}")
+        return sender_account.get_balance()
+    
+    
+# ---------------------------------------------------------------------------------------------------------------------------------------------------------
+
+# ------------------------- ClientAccount --------------------------------
+# Accounts are slotted records: no per-object __dict__, so a batch job can keep a million
+# of them in memory. Subclasses declare their own (possibly empty) __slots__ to keep it so.
+class ClientAccount:
+    __slots__ = ("name", "nationality", "gender", "phone_number", "_document_submit", "account_type",
+                 "__balance", "__password", "bank_account_number")
+
+    def __init__(self, name, nationality, gender, phone_number, document_submit, account_type, balance, password, bank_account_number):
+        self.name = name
+        self.nationality = nationality
+        self.gender = gender 
+        self.phone_number = phone_number
+        self._document_submit = document_submit
+        self.account_type = account_type
+        self.__balance = balance
+        self.__password = password
+        self.bank_account_number = bank_account_number
+
+    def get_balance(self):
+        return self.__balance
+
+    def set_balance(self, new_balance):
+        self.__balance = new_balance
+
+    def get_password(self):
+        return self.__password
+
+    def set_clientPassword(self, new_password):
+        self.__password = new_password
+
+    # Added a static method to load a client account type from the database
+    @staticmethod
+    def load_account_from_db(bank_account_number):
+        account = account_cache.get(bank_account_number)
+        if account is not None:
+            return account
+
+        account_data = repository.load_account(bank_account_number)
+
+        if account_data:
+            account = ClientAccount.from_row(account_data)
+            account_cache.put(account)
+            return account
+
+    # Build the right account type from a row in the order of BankRepository.load_account()
+    @staticmethod
+    def from_row(account_data):
+        # Unpack the account data
+        # Ensure the order matches the SELECT statement above
+        name, nationality, gender, phone_number, document_submit, account_type, balance, password, bank_account_number_db = account_data
+
+        account_class = ACCOUNT_CLASSES.get(account_type)
+        if account_class is not None:
+            return account_class(name, nationality, gender, phone_number, document_submit, account_type, balance, password, bank_account_number_db)
+
+    # Bulk loader: accounts built straight from streamed cursor rows, bypassing the account
+    # cache, for batch jobs that walk many accounts. All accounts when numbers is None.
+    # The few distinct nationality / gender / document / type strings are shared between
+    # accounts instead of being a fresh copy per row.
+    @staticmethod
+    def load_many(numbers=None, batch=10_000):
+        classes = ACCOUNT_CLASSES
+        shared = {}
+        share = shared.setdefault
+        for rows in repository.iter_accounts(numbers, batch):
+            for name, nationality, gender, phone_number, document_submit, account_type, balance, password, number in rows:
+                account_class = classes.get(account_type)
+                if account_class is not None:
+                    yield account_class(name, share(nationality, nationality), share(gender, gender), phone_number,
+                                        share(document_submit, document_submit), share(account_type, account_type), balance, password, number)
+
+    # Login with one indexed point lookup instead of scanning every account's credentials.
+    # Returns the loaded account when the number and password match, otherwise None.
+    # A plaintext or outdated stored password is re-hashed on the way.
+    @staticmethod
+    @instrumented("login")
+    def authenticate(bank_account_number, password):
+        account = ClientAccount.load_account_from_db(bank_account_number)
+        if account is None:
+            return None
+        matches, needs_rehash = PasswordHasher.verify(password, account.get_password())
+        if not matches:
+            return None
+        if needs_rehash:
+            account.set_clientPassword(PasswordHasher.hash(password))
+            repository.set_password(bank_account_number, account.get_password())
+        return account
+
+
+# ------------------------- CurrentAccount --------------------------------
+class CurrentAccount(ClientAccount):
+    __slots__ = ()
+    mini_amount = 2500 * MINOR_UNITS
+    allows_withdrawals = True
+
+    def __init__(self, name, nationality, gender, phone_number, document_submit, account_type, balance, password, bank_account_number):
+        super().__init__(name, nationality, gender, phone_number, document_submit, account_type, balance, password, bank_account_number)
+
+    def deposit(self, deposit_amount):
+        # Ledger row and balance update are committed once, together
+        Transaction.deposit(self, deposit_amount)
+
+    def withdraw(self, withdraw_amount):
+        # Ledger row and balance update are committed once, together
+        Transaction.withdraw(self, withdraw_amount)
+
+    def transfer(self, receiver_account, transfer_amount):
+        # Both balances and both ledger rows are written in one transaction by the transfer engine
+        Transaction.transfer(self, receiver_account, transfer_amount)
+
+
+# ------------------------- SavingAccount --------------------------------
+class SavingAccount(ClientAccount):
+    __slots__ = ("interest",)
+    mini_amount = 3000 * MINOR_UNITS
+    interest_rate = 0.12
+    allows_withdrawals = False      # Saving accounts do not allow direct withdrawals
+
+    def __init__(self, name, nationality, gender, phone_number, document_submit, account_type, balance, password, bank_account_number, interest=None):
+        super().__init__(name, nationality, gender, phone_number, document_submit, account_type, balance, password, bank_account_number)
+        self.interest = SavingAccount.interest_rate if interest is None else interest
+
+    def deposit(self, deposit_amount):
+        # Ledger row and balance update are committed once, together
+        Transaction.deposit(self, deposit_amount)
+
+    def withdraw(self, withdraw_amount):
+        # Refused by the storage backend, like every other withdrawal from a Saving account
+        Transaction.withdraw(self, withdraw_amount)
+
+    def apply_interest(self):
+        amount_with_interest, new_balance = credit_interest(self.bank_account_number, self.interest)
+        self.set_balance(new_balance)
+        print(f"✅ Interest applied. New balance: {format_money(new_balance)}")
+
+
+# Account class of each "Account Type" value
+ACCOUNT_CLASSES = {"Current": CurrentAccount, "Saving": SavingAccount}
+
+
+# Why a withdrawal from an account of this type is refused whatever the amount, or None.
+# Both storage backends (and batch ingestion, which posts without them) apply it, so the
+# menu, the service and the commands all get the same rule.
+def withdrawal_refusal(account_type):
+    account_class = ACCOUNT_CLASSES.get(account_type)
+    if account_class is not None and not account_class.allows_withdrawals:
+        return f"You can not withdraw money directly from {account_type} Account."
+    return None
+
+
+# ------------------------- Transfer Engine --------------------------------
+class BankError(Exception):
+    pass
+
+
+# Minimum balance of the row being updated, picked by its account type inside SQL
+MINIMUM_BALANCE_SQL = """CASE "Account Type" WHEN 'Saving' THEN ? ELSE ? END"""
+
+
+# Deposits, withdrawals, interest and transfers are applied by the storage backend
+# (see BankRepository for how SQLite keeps them safe across threads and processes);
+# these keep the cached accounts in step. Each returns the new balance(s), or raises BankError.
+@instrumented("deposit")
+def deposit_funds(bank_account_number, amount):
+    balance = repository.deposit(bank_account_number, amount)
+    account_cache.update_balance(bank_account_number, balance)
+    return balance
+
+
+@instrumented("withdraw")
+def withdraw_funds(bank_account_number, amount):
+    debit = velocity.admit(bank_account_number, amount)
+    try:
+        balance = repository.withdraw(bank_account_number, amount)
+    except BaseException:
+        velocity.undo(bank_account_number, debit)
+        raise
+    account_cache.update_balance(bank_account_number, balance)
+    return balance
+
+
+# Interest for one Saving account, rounded like interest_minor().
+# Returns (interest amount, new balance).
+@instrumented("interest")
+def credit_interest(bank_account_number, rate=None):
+    rate = SavingAccount.interest_rate if rate is None else rate
+    amount_with_interest, new_balance = repository.credit_interest(bank_account_number, rate)
+    account_cache.update_balance(bank_account_number, new_balance)
+    return amount_with_interest, new_balance
+
+
+# Returns (sender balance, receiver balance) after the transfer, raises BankError otherwise.
+# connection / retries / backoff tune the SQLite engine (see BankRepository.transfer).
+@instrumented("transfer")
+def transfer_funds(sender_number, receiver_number, amount, connection=None, retries=10, backoff=0.002):
+    if amount <= 0:
+        raise BankError("Invalid transfer amount")
+    if sender_number == receiver_number:
+        raise BankError("You can not transfer money to the same account")
+    debit = velocity.admit(sender_number, amount)
+    try:
+        sender_balance, receiver_balance = repository.transfer(sender_number, receiver_number, amount,
+                                                               connection=connection, retries=retries, backoff=backoff)
+    except BaseException:
+        velocity.undo(sender_number, debit)
+        raise
+    account_cache.update_balance(sender_number, sender_balance)
+    account_cache.update_balance(receiver_number, receiver_balance)
+    return sender_balance, receiver_balance
+
+
+# Start a write transaction holding the write lock up front. Anything a group commit
+# is still holding is committed first, since this work needs its own transaction.
+def begin_immediate(connection):
+    if connection.in_transaction:
+        UnitOfWork.flush(connection)
+    connection.execute("BEGIN IMMEDIATE")
+
+
+
+# ------------------------- Velocity Limits --------------------------------
+# Anti-fraud velocity checks on the hot path: how many withdrawals and transfers an account
+# may make, and how much money they may take out, within the last minute, hour and day.
+# withdraw_funds() and transfer_funds() ask admit() before touching the database.
+#
+# Every window of an account is a deque of its debits (time, amount) still inside it, with
+# their running count and sum. A check drops the debits that slid out of each window from
+# the left end, compares the totals with the limits and appends the new debit on the right,
+# so each debit is added and removed once per window: constant work per operation, however
+# busy the account.
+#
+# An account's windows are rebuilt from its ledger rows of the last day when the account is
+# first seen (or every account's at once by rebuild(), which the service runs at startup)
+# and kept current by the debits this process makes from then on. Debits committed later by
+# another process are only counted after a rebuild. Batch ingestion is not limited; the
+# standing orders clients set up through the service are, see StandingOrderScheduler.
+#
+# Limits are {window seconds: (most debits, most money in piastres)}. The module starts with
+# none (no checks, nothing kept); the menu, the commands and the service turn on
+# DEFAULT_VELOCITY_LIMITS, see configure_velocity_limits().
+DEFAULT_VELOCITY_LIMITS = {
+    60: (10, 50_000 * MINOR_UNITS),
+    60 * 60: (60, 200_000 * MINOR_UNITS),
+    24 * 60 * 60: (200, 500_000 * MINOR_UNITS),
+}
+WINDOW_NAMES = {60: "minute", 60 * 60: "hour", 24 * 60 * 60: "day"}
+
+
+def _history_seconds(history):
+    return datetime.datetime.fromisoformat(history).timestamp()
+
+
+def _seconds_history(seconds):
+    return datetime.datetime.fromtimestamp(seconds).strftime("%Y-%m-%d %H:%M:%S")
+
+
+class AccountVelocity:
+    __slots__ = ("debits", "counts", "sums")
+
+    def __init__(self, windows):
+        self.debits = [deque() for _ in range(windows)]     # One per window, shortest first
+        self.counts = [0] * windows
+        self.sums = [0] * windows
+
+    def add(self, debit):
+        for window, debits in enumerate(self.debits):
+            debits.append(debit)
+            self.counts[window] += 1
+            self.sums[window] += debit[1]
+
+
+class VelocityTracker:
+    sweep_every = 4096      # Forget accounts without a debit in the last day once per this many debits
+
+    def __init__(self, limits=None):
+        self._lock = threading.Lock()
+        self.refused = 0
+        self.configure(limits)
+
+    def configure(self, limits):
+        with self._lock:
+            self.limits = sorted(limits.items()) if limits else []
+            self._accounts = {}
+            self._complete = False      # After rebuild(): an account not in _accounts has no recent debits
+            self._admitted = 0
+
+    def clear(self):
+        self.configure(dict(self.limits))
+
+    def _now(self):
+        # The backend's clock when it has one (a replay), so the windows follow its timestamps
+        return _history_seconds(repository.now()) if repository.clock else time.time()
+
+    def _load(self, bank_account_number, now):
+        state = AccountVelocity(len(self.limits))
+        if not self._complete:
+            for row in iter_history(bank_account_number, since=_seconds_history(now - self.limits[-1][0]), types=DEBIT_TYPES):
+                state.add((_history_seconds(row[5]), row[3]))
+        return state
+
+    def admit(self, bank_account_number, amount, at=None, enforce=True):
+        # Counts a debit about to be made, or raises BankError when it would go over a limit.
+        # Returns the debit to hand to undo() if the operation then fails. at is the debit's
+        # time in seconds (default now); enforce=False counts it without checking the limits,
+        # for bank-run payments that rebuild() will count all the same.
+        if not self.limits:
+            return None
+        now = self._now() if at is None else at
+        state = self._accounts.get(bank_account_number) or self._load(bank_account_number, now)
+        with self._lock:
+            state = self._accounts.setdefault(bank_account_number, state)
+            for window, (seconds, (most_debits, most_money)) in enumerate(self.limits):
+                debits, horizon = state.debits[window], now - seconds
+                while debits and debits[0][0] <= horizon:
+                    state.counts[window] -= 1
+                    state.sums[window] -= debits.popleft()[1]
+                if enforce and (state.counts[window] >= most_debits or state.sums[window] + amount > most_money):
+                    self.refused += 1
+                    period = WINDOW_NAMES.get(seconds, f"{seconds} seconds")
+                    metrics.count("bank_velocity_refusals_total", (("window", period),))
+                    if state.counts[window] >= most_debits:
+                        raise BankError(f"Limit reached: at most {most_debits} withdrawals and transfers per {period}, please try again later.")
+                    raise BankError(f"Limit reached: at most {format_money(most_money)} in withdrawals and transfers per {period}, "
+                                    f"{format_money(max(most_money - state.sums[window], 0))} left.")
+            debit = (now, amount)
+            state.add(debit)
+            self._admitted += 1
+            sweep = self._admitted % self.sweep_every == 0
+        if sweep:
+            self.sweep()
+        return debit
+
+    def undo(self, bank_account_number, debit):
+        # Takes back a debit admit() counted for an operation that did not happen
+        if debit is None:
+            return
+        with self._lock:
+            state = self._accounts.get(bank_account_number)
+            for window, debits in enumerate(state.debits if state else ()):
+                try:
+                    debits.remove(debit)
+                except ValueError:      # Already out of the window
+                    continue
+                state.counts[window] -= 1
+                state.sums[window] -= debit[1]
+
+    def sweep(self):
+        if not self.limits:
+            return
+        horizon = self._now() - self.limits[-1][0]
+        with self._lock:
+            for number in [number for number, state in self._accounts.items()
+                           if not state.debits[-1] or state.debits[-1][-1][0] <= horizon]:
+                del self._accounts[number]
+
+    def rebuild(self):
+        # Every account's windows from the ledger rows of the last day, in one pass over them.
+        # Returns the number of accounts with recent debits.
+        if not self.limits:
+            return 0
+        accounts = {}
+        for row in repository.recent_ledger(_seconds_history(self._now() - self.limits[-1][0])):
+            if row[2] in DEBIT_TYPES:
+                state = accounts.get(row[1])
+                if state is None:
+                    state = accounts[row[1]] = AccountVelocity(len(self.limits))
+                state.add((_history_seconds(row[5]), row[3]))
+        with self._lock:
+            self._accounts = accounts
+            self._complete = True
+        return len(accounts)
+
+    def __len__(self):
+        return len(self._accounts)
+
+
+velocity = VelocityTracker()
+
+
+# Set the limits ({window seconds: (most debits, most money in piastres)}, None for no
+# checks). What the tracker knows is dropped; accounts are rebuilt from the ledger again.
+def configure_velocity_limits(limits):
+    velocity.configure(limits)
+
+
+
+# ------------------------- Batch Ingestion --------------------------------
+# Posts end-of-day files (payroll, clearing) of deposit / withdraw / transfer lines.
+# The file is streamed in chunks: every chunk is validated with the same rules as the
+# menus (amount > 0, mini_amount floor per account type, no withdraw from Saving) and
+# applied with executemany in one transaction. Lines that fail go to a reject file with
+# the reason, so memory stays bounded by the chunk size whatever the file size.
+#
+# CSV files need the header: operation,account,amount,to_account
+# JSONL files hold one object per line with the same keys.
+BATCH_OPERATIONS = ("deposit", "withdraw", "transfer")
+REJECT_COLUMNS = ["line", "reason", "operation", "account", "amount", "to_account"]
+
+
+def _read_batch_file(path):
+    import csv
+    with open(path, newline="", encoding="utf-8") as batch_file:
+        if path.endswith((".jsonl", ".json")):
+            for line_number, line in enumerate(batch_file, start=1):
+                if not line.strip():
+                    continue
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    record = None
+                # Anything that is not a JSON object is rejected as an unknown operation
+                yield line_number, record if isinstance(record, dict) else {"operation": line.strip()[:50]}
+        else:
+            # Line 1 is the header
+            for line_number, record in enumerate(csv.DictReader(batch_file), start=2):
+                yield line_number, record
+
+
+def _parse_batch_record(record):
+    # Returns (operation, account, amount, to_account) or raises ValueError with the reason
+    operation = str(record.get("operation") or "").strip().lower()
+    if operation not in BATCH_OPERATIONS:
+        raise ValueError("unknown operation")
+    try:
+        account = int(record.get("account"))
+        amount = to_minor(record.get("amount"))
+        to_account = int(record["to_account"]) if operation == "transfer" else None
+    except (TypeError, ValueError, KeyError):
+        raise ValueError("invalid number") from None
+    if amount <= 0:
+        raise ValueError("amount must be positive")
+    if operation == "transfer" and to_account == account:
+        raise ValueError("transfer to the same account")
+    return operation, account, amount, to_account
+
+
+def _load_batch_accounts(connection, numbers):
+    # Current state of every account touched by the chunk: {number: [name, type, balance]}
+    accounts = {}
+    numbers = list(numbers)
+    for start in range(0, len(numbers), 500):       # Stay below SQLite's variable limit
+        part = numbers[start:start + 500]
+        rows = connection.execute(f"""SELECT "Bank Account Number", Name, "Account Type", Balance FROM "Client Account"
+            WHERE "Bank Account Number" IN ({",".join("?" * len(part))})""", part)
+        for number, name, account_type, balance in rows:
+            accounts[number] = [name, account_type, balance]
+    return accounts
+
+
+def _apply_batch_chunk(connection, chunk, reject):
+    parsed = []
+    for line_number, record in chunk:
+        try:
+            parsed.append((line_number, record, _parse_batch_record(record)))
+        except ValueError as error:
+            reject(line_number, str(error), record)
+    if not parsed:
+        return 0
+
+    begin_immediate(connection)     # Balances are read under the write lock they are written with
+    try:
+        numbers = {operation[1] for _, _, operation in parsed} | {operation[3] for _, _, operation in parsed if operation[3] is not None}
+        accounts = _load_batch_accounts(connection, numbers)
+        minimum = {"Current": CurrentAccount.mini_amount, "Saving": SavingAccount.mini_amount}
+        history = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        ledger_rows, touched, applied = [], set(), 0
+
+        for line_number, record, (operation, number, amount, to_number) in parsed:
+            account = accounts.get(number)
+            if account is None:
+                reject(line_number, "account not found", record)
+                continue
+            name, account_type, balance = account
+
+            if operation == "deposit":
+                account[2] = balance + amount
+                ledger_rows.append((name, number, "Deposit", amount, account[2], history))
+            elif operation == "withdraw" and withdrawal_refusal(account_type):
+                reject(line_number, withdrawal_refusal(account_type), record)
+                continue
+            elif balance - amount < minimum.get(account_type, 0):
+                reject(line_number, "insufficient balance", record)
+                continue
+            elif operation == "withdraw":
+                account[2] = balance - amount
+                ledger_rows.append((name, number, "Withdraw", amount, account[2], history))
+            else:
+                receiver = accounts.get(to_number)
+                if receiver is None:
+                    reject(line_number, "receiver account not found", record)
+                    continue
+                account[2] = balance - amount
+                receiver[2] += amount
+                ledger_rows.append((name, number, "Transfer Sent", amount, account[2], history))
+                ledger_rows.append((receiver[0], to_number, "Transfer Received", amount, receiver[2], history))
+                touched.add(to_number)
+            touched.add(number)
+            applied += 1
+
+        append_ledger(connection, ledger_rows)
+        connection.executemany('UPDATE "Client Account" SET Balance = ? WHERE "Bank Account Number" = ?',
+                               [(accounts[number][2], number) for number in touched])
+        connection.commit()
+    except BaseException:
+        connection.rollback()
+        raise
+    for number in touched:
+        account_cache.update_balance(number, accounts[number][2])
+    return applied
+
+
+def ingest_operations(path, reject_path=None, chunk_size=10_000, connection=None):
+    connection = connection or pool.connection()
+    reject_path = reject_path or path + ".rejects.csv"
+    import csv
+    applied = rejected = 0
+
+    with open(reject_path, "w", newline="", encoding="utf-8") as reject_file:
+        writer = csv.writer(reject_file)
+        writer.writerow(REJECT_COLUMNS)
+
+        def reject(line_number, reason, record):
+            nonlocal rejected
+            rejected += 1
+            writer.writerow([line_number, reason] + [record.get(key, "") for key in REJECT_COLUMNS[2:]])
+
+        lines = _read_batch_file(path)
+        while True:
+            chunk = list(itertools.islice(lines, chunk_size))
+            if not chunk:
+                break
+            applied += _apply_batch_chunk(connection, chunk, reject)
+
+    return {"applied": applied, "rejected": rejected, "reject_file": reject_path}
+
+
+
+# ------------------------- Interest Run --------------------------------
+# Month-end interest for every Saving account in one set-based pass inside SQLite.
+# Accounts are walked in rowid chunks; each chunk inserts its Interest ledger rows,
+# updates its balances and records its progress in 'Interest Runs' in the same
+# transaction. Re-running a period resumes after the last finished chunk, and a
+# finished period is never paid again.
+
+# A month given as YYYY-MM, in its one stored form ("2026-1" -> "2026-01"), so the same
+# month can never be recorded, and paid, twice under two spellings
+def parse_period(period):
+    try:
+        return datetime.datetime.strptime(period, "%Y-%m").strftime("%Y-%m")
+    except (TypeError, ValueError):
+        raise BankError(f"Invalid period {period!r}: expected a month as YYYY-MM") from None
+
+
+def run_interest(period=None, rate=None, chunk_size=50_000, connection=None):
+    connection = connection or pool.connection()
+    period = parse_period(period) if period else datetime.date.today().strftime("%Y-%m")
+    rate = SavingAccount.interest_rate if rate is None else rate
+
+    begin_immediate(connection)
+    run = connection.execute("""SELECT Rate, "Last Rowid", "Max Rowid", Accounts, Status FROM 'Interest Runs' WHERE Period = ?""", (period,)).fetchone()
+    if run is None:
+        # Accounts opened after the run started are left for the next period
+        max_rowid = connection.execute('SELECT COALESCE(MAX(rowid), 0) FROM "Client Account"').fetchone()[0]
+        run = (rate, 0, max_rowid, 0, "Running")
+        connection.execute("""INSERT INTO 'Interest Runs' (Period, Rate, "Last Rowid", "Max Rowid", Accounts, Status, Started)
+            VALUES (?, ?, ?, ?, ?, ?, ?)""", (period, *run, datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")))
+    connection.commit()
+
+    rate, last_rowid, max_rowid, accounts, status = run      # A resumed run keeps its original rate
+    basis_points = rate_basis_points(rate)
+    if status == "Done":
+        return {"period": period, "accounts": accounts, "status": "already applied"}
+
+    while last_rowid < max_rowid:
+        chunk_end = min(last_rowid + chunk_size, max_rowid)
+        history = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        begin_immediate(connection)
+        try:
+            # Ledger rows first, computed from the balances before the update. Integer
+            # arithmetic only, rounded exactly like interest_minor(). SQLite computes them, the
+            # rows are chained onto the ledger here
+            inserted = append_ledger(connection, connection.execute(f"""
+                SELECT Name, "Bank Account Number", 'Interest', {INTEREST_SQL}, Balance + {INTEREST_SQL}, ?
+                FROM "Client Account" WHERE rowid > ? AND rowid <= ? AND "Account Type" = 'Saving'""",
+                (basis_points, basis_points, history, last_rowid, chunk_end)).fetchall())
+            connection.execute(f"""UPDATE "Client Account" SET Balance = Balance + {INTEREST_SQL}
+                WHERE rowid > ? AND rowid <= ? AND "Account Type" = 'Saving'""", (basis_points, last_rowid, chunk_end))
+            accounts += inserted
+            last_rowid = chunk_end
+            connection.execute("""UPDATE 'Interest Runs' SET "Last Rowid" = ?, Accounts = ? WHERE Period = ?""", (last_rowid, accounts, period))
+            connection.commit()
+        except BaseException:
+            connection.rollback()
+            raise
+
+    connection.execute("""UPDATE 'Interest Runs' SET Status = 'Done', Finished = ? WHERE Period = ?""",
+                       (datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S"), period))
+    connection.commit()
+    account_cache.clear()       # Every Saving balance changed inside SQLite
+    return {"period": period, "accounts": accounts, "status": "applied"}
+
+
+
+# ------------------------- Standing Orders --------------------------------
+# Recurring transfers (rent, loan installments, sweeps from Current into Saving) paid by
+# the bank on their due dates. Each order lives in 'Standing Orders' with the time of its
+# next occurrence ("Next Due") and of its next attempt ("Run At", later than Next Due while
+# a failed payment waits for its retry); the partial index on ("Run At", Id) holds only the
+# active orders, so finding what is due never reads the finished or cancelled ones.
+#
+# The scheduler pulls due orders from that index in time order into a heap, pops them in
+# chunks and pays each chunk in one transaction with the rules of the transfer engine and
+# batch ingestion (both accounts open, the sender keeps its account type's mini_amount).
+# The ledger rows, the balances and each order's next occurrence are written together, and
+# an order is re-read under the write lock before it is paid: a payment is made once,
+# however often the scheduler is stopped, restarted or run twice at the same time.
+#
+# A payment that fails for lack of money is retried after each of retry_after (seconds);
+# after the last retry that occurrence is skipped and the order waits for its next one.
+# An order whose account was closed is cancelled. Missed occurrences (the scheduler was
+# down) are all paid, oldest first.
+#
+# Orders set up by clients through the service (Limited) are held to the velocity limits
+# like the transfers they replace: their first payment can not be in the past, and each
+# payment is admitted by the velocity tracker, a refusal being retried and skipped like a
+# lack of money. The payments of the bank's own orders are not limited, but are counted
+# too, so the tracker agrees with what rebuild() reads back from the ledger.
+STANDING_ORDER_FREQUENCIES = ("daily", "weekly", "monthly")
+STANDING_ORDER_COLUMNS = ["Id", "From Account", "To Account", "Amount", "Frequency", "Start", "Installments",
+                          "Occurrence", "Next Due", "Run At", "Attempts", "Last Error", "Status", "Created"]
+
+
+def _add_months(moment, months):
+    # Same day of the month, or the month's last day when it is shorter (Jan 31 -> Feb 28)
+    months += moment.month - 1
+    year, month = moment.year + months // 12, months % 12 + 1
+    next_month = datetime.date(year + month // 12, month % 12 + 1, 1)
+    return moment.replace(year=year, month=month, day=min(moment.day, (next_month - datetime.timedelta(days=1)).day))
+
+
+def occurrence_due(start, frequency, occurrence):
+    # Due time of an order's occurrence (0 is the first), counted from its start so that
+    # short months never shift the later ones
+    first = datetime.datetime.fromisoformat(start)
+    if frequency == "monthly":
+        due = _add_months(first, occurrence)
+    else:
+        due = first + datetime.timedelta(days=occurrence * (7 if frequency == "weekly" else 1))
+    return due.strftime("%Y-%m-%d %H:%M:%S")
+
+
+def create_standing_order(from_account, to_account, amount, frequency, start=None, installments=None, limited=False):
+    # amount in piastres, start a timestamp (default now), installments None to run until
+    # cancelled, limited for a client's order held to the velocity limits. Returns the
+    # order's Id, or raises BankError.
+    if amount <= 0:
+        raise BankError("Invalid transfer amount")
+    if from_account == to_account:
+        raise BankError("You can not transfer money to the same account")
+    if frequency not in STANDING_ORDER_FREQUENCIES:
+        raise BankError(f"Frequency must be one of: {', '.join(STANDING_ORDER_FREQUENCIES)}")
+    if installments is not None and installments <= 0:
+        raise BankError("The number of installments must be positive")
+    start = _history_bound(start) if start else datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    try:
+        datetime.datetime.fromisoformat(start)
+    except ValueError:
+        raise BankError(f"Invalid start date: {start}") from None
+    created = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    if limited and start < created:     # Missed occurrences would all be paid at once
+        raise BankError("The first payment can not be in the past.")
+    if repository.account_balance(from_account) is None:
+        raise BankError("The sender account not found.")
+    if repository.account_balance(to_account) is None:
+        raise BankError("The receiver account not found.")
+    with UnitOfWork() as work:
+        return work.connection.execute("""INSERT INTO 'Standing Orders' ("From Account", "To Account", Amount, Frequency, Start,
+                Installments, "Next Due", "Run At", Created, Limited) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)""",
+            (from_account, to_account, amount, frequency, start, installments, start, start, created, int(limited))).lastrowid
+
+
+def cancel_standing_order(order_id, from_account=None):
+    # False when there is no such active order (of from_account, when given)
+    with UnitOfWork() as work:
+        return work.connection.execute("""UPDATE 'Standing Orders' SET Status = 'Cancelled'
+            WHERE Id = ? AND Status = 'Active' AND "From Account" = COALESCE(?, "From Account")""",
+            (order_id, from_account)).rowcount == 1
+
+
+def standing_orders(bank_account_number):
+    # The orders paid from an account, as STANDING_ORDER_COLUMNS rows
+    return pool.reader().execute(f"""SELECT {", ".join(f'"{column}"' for column in STANDING_ORDER_COLUMNS)}
+        FROM 'Standing Orders' WHERE "From Account" = ? ORDER BY Id""", (bank_account_number,)).fetchall()
+
+
+class StandingOrderScheduler:
+    retry_after = (60 * 60, 6 * 60 * 60, 24 * 60 * 60)
+    batch_size = 10_000         # Orders paid per transaction
+    prefetch = 50_000           # Due orders read from the index at a time
+
+    def __init__(self, connection=None):
+        self.connection = connection or pool.connection()
+        self._heap = []             # (Run At, Id) of the due orders read and not yet paid
+        self._queued = set()
+        self.totals = {"paid": 0, "retrying": 0, "skipped": 0, "cancelled": 0, "finished": 0}
+
+    def _fill(self, now):
+        # The next due orders, oldest first, that are not already waiting in the heap
+        rows = pool.reader().execute("""SELECT "Run At", Id FROM 'Standing Orders'
+            WHERE Status = 'Active' AND "Run At" <= ? ORDER BY "Run At", Id LIMIT ?""",
+            (now, self.prefetch + len(self._queued))).fetchall()
+        for entry in rows:
+            if entry[1] not in self._queued:
+                self._queued.add(entry[1])
+                heapq.heappush(self._heap, entry)
+        return len(self._heap)
+
+    def run_due(self, now=None, max_batches=None):
+        # Pays every order due at now (a timestamp, default the current time), missed
+        # occurrences included. Returns the totals of this scheduler so far.
+        now = _history_bound(now) if now else datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        batches = 0
+        while (self._heap or self._fill(now)) and (max_batches is None or batches < max_batches):
+            chunk = []
+            while self._heap and self._heap[0][0] <= now and len(chunk) < self.batch_size:
+                chunk.append(heapq.heappop(self._heap)[1])
+            if not chunk:
+                break
+            self._queued.difference_update(chunk)
+            for entry in self._pay(chunk, now):         # Orders with another occurrence due already
+                self._queued.add(entry[1])
+                heapq.heappush(self._heap, entry)
+            batches += 1
+        return dict(self.totals)
+
+    def _pay(self, order_ids, now):
+        connection = self.connection
+        begin_immediate(connection)     # Orders and balances are read under the write lock they are written with
+        try:
+            orders = []
+            for first in range(0, len(order_ids), 500):     # Stay below SQLite's variable limit
+                part = order_ids[first:first + 500]
+                orders += connection.execute(f"""SELECT Id, "From Account", "To Account", Amount, Frequency, Start, Installments,
+                        Occurrence, Attempts, "Run At", Limited FROM 'Standing Orders'
+                    WHERE Id IN ({",".join("?" * len(part))}) AND Status = 'Active' AND "Run At" <= ?""", part + [now]).fetchall()
+            orders.sort(key=lambda order: (order[9], order[0]))
+            accounts = _load_batch_accounts(connection, {order[1] for order in orders} | {order[2] for order in orders})
+            minimum = {"Current": CurrentAccount.mini_amount, "Saving": SavingAccount.mini_amount}
+            outcomes = dict.fromkeys(self.totals, 0)
+            ledger_rows, touched, updates, due_again = [], set(), [], []
+            debits, paid_at = [], _history_seconds(now)     # Velocity debits, undone if the chunk rolls back
+
+            # updates: (Occurrence, Attempts, Last Error, Status, next Run At or None to keep it, Id)
+            for order_id, from_account, to_account, amount, frequency, start, installments, occurrence, attempts, _, limited in orders:
+                sender, receiver = accounts.get(from_account), accounts.get(to_account)
+                if sender is None or receiver is None:
+                    error = "sender account not found" if sender is None else "receiver account not found"
+                    updates.append((occurrence, attempts, error, "Cancelled", None, order_id))
+                    outcomes["cancelled"] += 1
+                    continue
+                error = "insufficient balance" if sender[2] - amount < minimum.get(sender[1], 0) else None
+                if error is None:
+                    try:
+                        debits.append((from_account, velocity.admit(from_account, amount, paid_at, enforce=bool(limited))))
+                    except BankError as refusal:
+                        error = str(refusal)
+                if error is not None:
+                    if attempts < len(self.retry_after):
+                        retry = datetime.datetime.fromisoformat(now) + datetime.timedelta(seconds=self.retry_after[attempts])
+                        updates.append((occurrence, attempts + 1, error, "Active", retry.strftime("%Y-%m-%d %H:%M:%S"), order_id))
+                        outcomes["retrying"] += 1
+                        continue
+                    outcomes["skipped"] += 1
+                else:
+                    sender[2] -= amount
+                    receiver[2] += amount
+                    ledger_rows.append((sender[0], from_account, "Transfer Sent", amount, sender[2], now))
+                    ledger_rows.append((receiver[0], to_account, "Transfer Received", amount, receiver[2], now))
+                    touched.update((from_account, to_account))
+                    outcomes["paid"] += 1
+                occurrence += 1
+                if installments is not None and occurrence >= installments:
+                    updates.append((occurrence, 0, error, "Finished", None, order_id))
+                    outcomes["finished"] += 1
+                    continue
+                next_due = occurrence_due(start, frequency, occurrence)
+                updates.append((occurrence, 0, error, "Active", next_due, order_id))
+                if next_due <= now:
+                    due_again.append((next_due, order_id))
+
+            # Balances and orders are updated in key order, so the B-tree pages are visited once each
+            append_ledger(connection, ledger_rows)
+            connection.executemany('UPDATE "Client Account" SET Balance = ? WHERE "Bank Account Number" = ?',
+                                   [(accounts[number][2], number) for number in sorted(touched)])
+            updates.sort(key=lambda update: update[5])
+            # A retry (Attempts > 0) only moves Run At; the occurrence it retries stays the Next Due
+            connection.executemany("""UPDATE 'Standing Orders' SET Occurrence = ?1, Attempts = ?2, "Last Error" = ?3, Status = ?4,
+                    "Next Due" = CASE WHEN ?2 > 0 OR ?5 IS NULL THEN "Next Due" ELSE ?5 END, "Run At" = COALESCE(?5, "Run At")
+                WHERE Id = ?6""", updates)
+            connection.commit()
+        except BaseException:
+            connection.rollback()
+            for number, debit in debits:
+                velocity.undo(number, debit)
+            raise
+        for number in touched:
+            account_cache.update_balance(number, accounts[number][2])
+        for outcome, count in outcomes.items():
+            self.totals[outcome] += count
+            if count:
+                metrics.count("bank_standing_orders_total", (("outcome", outcome),), count)
+        return due_again
+
+    def next_run(self):
+        # When the next active order is due, None when there is none
+        row = pool.reader().execute("""SELECT MIN("Run At") FROM 'Standing Orders' WHERE Status = 'Active'""").fetchone()
+        return row[0]
+
+    def watch(self, poll=60.0):
+        # Runs forever: pays what is due, then sleeps until the next order is due (at most poll
+        # seconds, so orders created meanwhile are picked up)
+        while True:
+            self.run_due()
+            due = self.next_run()
+            wait = poll if due is None else (datetime.datetime.fromisoformat(due) - datetime.datetime.now()).total_seconds()
+            time.sleep(min(max(wait, 0.5), poll))
+
+
+def run_standing_orders(now=None, connection=None):
+    return StandingOrderScheduler(connection).run_due(now)
+
+
+
+# ------------------------- Ledger Reconciliation --------------------------------
+# Checks that every account's Balance is what its ledger says, and that each ledger row's
+# running Balance follows from the row before it. A 'Balance Checkpoints' row keeps the
+# ledger balance of an account as of a ledger rowid, so a run only replays the rows written
+# since the last run: the cost follows recent activity, not the size of the history.
+#
+# The book is split into account-number shards reconciled on worker threads. Each shard
+# reads one snapshot (a read transaction on the thread's read-only connection), replays
+# its rows with a window function inside SQLite (which runs without the GIL), then moves
+# the checkpoints of the accounts that had new rows up to that snapshot. Every row of the
+# shard up to its newest checkpoint has been replayed already, so the next run starts its
+# rowid range scan there. An account without a checkpoint starts from its first ledger row
+# (the opening balance is not in the ledger). Checkpoints keep the ledger's balance, so an
+# account balance that disagrees with it is reported again on every run until it is fixed.
+DEBIT_TYPES = ("Withdraw", "Transfer Sent")
+
+
+def _reconcile_ledger_sql(ledger):
+    return f"""
+    WITH recent AS (
+        SELECT t.rowid AS id, t."Bank Account Number" AS number, t.Balance AS balance, c.Balance AS checkpoint,
+               CASE WHEN t."Transaction Type" IN ({", ".join("?" * len(DEBIT_TYPES))}) THEN -t.Amount ELSE t.Amount END AS delta
+        FROM {ledger} LEFT JOIN "Balance Checkpoints" c ON c."Bank Account Number" = t."Bank Account Number"
+        WHERE t.rowid > ? AND t.rowid <= ? AND t."Bank Account Number" >= ? AND t."Bank Account Number" < ?
+          AND t.rowid > COALESCE(c."Ledger Rowid", 0)
+    ), running AS (
+        SELECT id, number, balance,
+               COALESCE(checkpoint, FIRST_VALUE(balance - delta) OVER account_rows) + SUM(delta) OVER account_rows AS expected,
+               LEAD(id) OVER account_rows IS NULL AS last_row
+        FROM recent
+        WINDOW account_rows AS (PARTITION BY number ORDER BY id ROWS UNBOUNDED PRECEDING)
+    )
+    SELECT number, id, balance, expected, last_row FROM running WHERE last_row OR balance IS NOT expected
+"""
+
+
+# The first run of a shard walks the account index; later runs only scan the new rowids
+RECONCILE_FULL_SQL = _reconcile_ledger_sql('"Account Transactions" t')
+RECONCILE_RECENT_SQL = _reconcile_ledger_sql('"Account Transactions" t NOT INDEXED')
+
+
+def reconcile_shard(low, high):
+    # Accounts with low <= number < high. Returns (accounts, mismatches), where each mismatch
+    # is (account number, what, expected, found, ledger rowid or None)
+    UnitOfWork.flush()                  # The snapshot must include this thread's own pending work
+    reader = pool.reader()
+    reader.execute("BEGIN")             # One snapshot for the ledger and the balances
+    try:
+        snapshot = reader.execute('SELECT COALESCE(MAX(rowid), 0) FROM "Account Transactions"').fetchone()[0]
+        since = reader.execute("""SELECT COALESCE(MAX("Ledger Rowid"), 0) FROM "Balance Checkpoints"
+            WHERE "Bank Account Number" >= ? AND "Bank Account Number" < ?""", (low, high)).fetchone()[0]
+        mismatches, ledger_balances = [], {}
+        replay = RECONCILE_RECENT_SQL if since else RECONCILE_FULL_SQL
+        for number, rowid, balance, expected, last_row in reader.execute(replay, (*DEBIT_TYPES, since, snapshot, low, high)):
+            if balance != expected:
+                mismatches.append((number, "ledger running balance", expected, balance, rowid))
+            if last_row:
+                ledger_balances[number] = expected
+        accounts = reader.execute("""SELECT a."Bank Account Number", a.Balance, c.Balance FROM "Client Account" a
+            LEFT JOIN "Balance Checkpoints" c ON c."Bank Account Number" = a."Bank Account Number"
+            WHERE a."Bank Account Number" >= ? AND a."Bank Account Number" < ?""", (low, high)).fetchall()
+    finally:
+        reader.rollback()
+
+    checked = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    checkpoints = []
+    for number, balance, checkpoint in accounts:
+        ledger_balance = ledger_balances.get(number, balance if checkpoint is None else checkpoint)
+        if ledger_balance != balance:
+            mismatches.append((number, "account balance", ledger_balance, balance, None))
+        if number in ledger_balances or checkpoint is None:
+            checkpoints.append((number, snapshot, ledger_balance, checked))
+    with UnitOfWork() as work:
+        work.connection.executemany("""INSERT INTO 'Balance Checkpoints' ("Bank Account Number", "Ledger Rowid", Balance, Checked)
+            VALUES (?, ?, ?, ?) ON CONFLICT ("Bank Account Number") DO UPDATE
+            SET "Ledger Rowid" = excluded."Ledger Rowid", Balance = excluded.Balance, Checked = excluded.Checked""", checkpoints)
+    UnitOfWork.flush()
+    return len(accounts), mismatches
+
+
+def reconcile_ledger(shards=4, workers=None):
+    # Returns {"accounts": checked accounts, "mismatches": [...], "shards": shards}
+    UnitOfWork.flush()
+    low, high = pool.reader().execute('SELECT MIN("Bank Account Number"), MAX("Bank Account Number") FROM "Client Account"').fetchone()
+    if low is None:
+        return {"accounts": 0, "mismatches": [], "shards": 0}
+    step = -(-(high + 1 - low) // shards)       # Equal account-number ranges
+    from concurrent.futures import ThreadPoolExecutor
+    bounds = [(start, min(start + step, high + 1)) for start in range(low, high + 1, step)]
+    accounts, mismatches = 0, []
+    with ThreadPoolExecutor(max_workers=workers or len(bounds), thread_name_prefix="bank-reconcile") as executor:
+        for shard_accounts, shard_mismatches in executor.map(lambda bound: reconcile_shard(*bound), bounds):
+            accounts += shard_accounts
+            mismatches.extend(shard_mismatches)
+    return {"accounts": accounts, "mismatches": sorted(mismatches, key=lambda mismatch: (mismatch[0], mismatch[4] or 0)), "shards": len(bounds)}
+
+
+def print_reconciliation(result):
+    if not result["mismatches"]:
+        print(f"✅ {result['accounts']} accounts reconciled, the books agree with the ledger.")
+        return
+    print(f"❌ {len(result['mismatches'])} mismatches in {result['accounts']} accounts:")
+    for number, what, expected, found, rowid in result["mismatches"]:
+        where = f" (ledger row {rowid})" if rowid is not None else ""
+        print(f"  Account {number}: {what}{where} should be {format_money(expected)}, found {format_money(found)}")
+
+
+def run_reconciliation(arguments):
+    parser = argparse.ArgumentParser(prog="Bank-System-Management.py reconcile", description="Check every balance against the ledger")
+    parser.add_argument("--shards", type=int, default=4, help="account-number ranges checked in parallel")
+    parser.add_argument("--db", default=DB_PATH, help="database file")
+    options = parser.parse_args(arguments)
+
+    use_database(options.db)
+    result = reconcile_ledger(options.shards)
+    print_reconciliation(result)
+    sys.exit(1 if result["mismatches"] else 0)
+
+
+
+# ------------------------- Ledger Archive --------------------------------
+# Keeps 'Account Transactions' down to the open months. archive_ledger() moves every closed
+# month into its own read-only SQLite file (same table, same account/History index) and
+# lists it in 'Ledger Archives' with the History range it covers; history queries then
+# only open the files whose range overlaps the dates asked for. Inserts, deletes and
+# recent-history queries work on the small hot table whatever the age of the bank.
+#
+# Ledger rows are written in time order, so a month is one rowid range of the hot table,
+# found by binary search instead of a scan. A month is copied into its file first, then
+# registered and deleted from the hot table in one transaction: an interrupted run leaves
+# at most an unregistered file, which the next run overwrites.
+#
+# The sqlite3 module has no compressed storage, so compress=True stores the finished file
+# as .db.xz (usually 4-6x smaller); it is unpacked to a temporary file the first time a
+# history query needs it.
+def _period_start(period):
+    return f"{period}-01 00:00:00"
+
+
+def _next_period(period):
+    year, month = map(int, period.split("-"))
+    return f"{year + month // 12:04d}-{month % 12 + 1:02d}"
+
+
+def _first_rowid_from(connection, history, low):
+    # Smallest rowid >= low of the rows written at or after the History timestamp
+    high = connection.execute('SELECT COALESCE(MAX(rowid), 0) + 1 FROM "Account Transactions"').fetchone()[0]
+    while low < high:
+        middle = (low + high) // 2
+        row = connection.execute('SELECT rowid, History FROM "Account Transactions" WHERE rowid >= ? ORDER BY rowid LIMIT 1', (middle,)).fetchone()
+        if row is None or row[1] >= history:
+            high = middle
+        else:
+            low = row[0] + 1
+    return low
+
+
+def _archive_path(path):
+    # Archive paths are kept relative to the database file, so the two can move together
+    return os.path.join(os.path.dirname(os.path.abspath(pool.path)), path)
+
+
+def _archive_period(connection, period, low, high, directory, compress):
+    path = os.path.join(directory, f"{period}-{low}.db")
+    for leftover in (path, path + ".xz"):        # From an interrupted run, never registered
+        if os.path.exists(leftover):
+            os.chmod(leftover, 0o644)
+            os.remove(leftover)
+    table_sql = connection.execute("""SELECT sql FROM sqlite_master WHERE type = 'table' AND name = 'Account Transactions'""").fetchone()[0]
+    archive = sql.connect(path)
+    archive.execute(table_sql)
+    archive.close()
+
+    connection.execute("ATTACH DATABASE ? AS archive", (path,))
+    try:
+        rows = connection.execute("""INSERT INTO archive."Account Transactions" (rowid, Name, "Bank Account Number", "Transaction Type", Amount, Balance, History, Seq, Hash)
+            SELECT rowid, Name, "Bank Account Number", "Transaction Type", Amount, Balance, History, Seq, Hash FROM main."Account Transactions"
+            WHERE rowid >= ? AND rowid < ?""", (low, high)).rowcount
+        first_history, last_history, first_seq, last_seq = connection.execute(
+            'SELECT MIN(History), MAX(History), MIN(Seq), MAX(Seq) FROM archive."Account Transactions"').fetchone()
+        connection.execute("""CREATE INDEX archive.idx_transactions_account_history ON "Account Transactions" ("Bank Account Number", History)""")
+        connection.execute("""CREATE UNIQUE INDEX archive.idx_transactions_seq ON "Account Transactions" (Seq)""")
+        connection.commit()
+    finally:
+        connection.execute("DETACH DATABASE archive")
+
+    if compress:
+        import lzma
+        import shutil
+        with open(path, "rb") as source, lzma.open(path + ".xz", "wb") as target:
+            shutil.copyfileobj(source, target)
+        os.remove(path)
+        path += ".xz"
+    os.chmod(path, 0o444)
+
+    begin_immediate(connection)
+    try:
+        # Registered first: the ledger's delete trigger only lets rows go to a registered archive
+        connection.execute("""INSERT INTO 'Ledger Archives' (Path, Period, Rows, "First History", "Last History", Archived, "First Seq", "Last Seq")
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?)""", (os.path.relpath(path, os.path.dirname(os.path.abspath(pool.path))), period, rows, first_history,
+                                                last_history, datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S"), first_seq, last_seq))
+        connection.execute('DELETE FROM "Account Transactions" WHERE rowid >= ? AND rowid < ?', (low, high))
+        connection.commit()
+    except BaseException:
+        connection.rollback()
+        raise
+    return {"period": period, "rows": rows, "path": path}
+
+
+# Moves every month before `before` (YYYY-MM, default this month) out of the hot table.
+# Returns the archived files and the mismatches of the reconciliation run first.
+def archive_ledger(before=None, directory=None, compress=False, connection=None):
+    connection = connection or pool.connection()
+    this_month = datetime.date.today().strftime("%Y-%m")
+    before = parse_period(before) if before else this_month
+    if before > this_month:
+        raise BankError("Only closed months can be archived")
+    directory = directory or os.path.splitext(os.path.abspath(pool.path))[0] + " Archive"
+    os.makedirs(directory, exist_ok=True)
+
+    # Balance checkpoints must cover every row that leaves the hot table
+    reconciliation = reconcile_ledger()
+    UnitOfWork.flush(connection)
+
+    boundary = _period_start(before)
+    archived = []
+    first = connection.execute('SELECT rowid, History FROM "Account Transactions" ORDER BY rowid LIMIT 1').fetchone()
+    while first is not None and first[1] < boundary:
+        period = first[1][:7]
+        end = _first_rowid_from(connection, min(_period_start(_next_period(period)), boundary), first[0])
+        archived.append(_archive_period(connection, period, first[0], end, directory, compress))
+        first = connection.execute('SELECT rowid, History FROM "Account Transactions" WHERE rowid >= ? ORDER BY rowid LIMIT 1', (end,)).fetchone()
+    if archived:
+        # The deletes left a large WAL behind; fold it back so reads do not have to search it
+        connection.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+    return {"archived": archived, "mismatches": reconciliation["mismatches"]}
+
+
+_unpacked_archives = {}
+_unpack_lock = threading.Lock()
+
+
+# The SQLite file of an archive listed in 'Ledger Archives' (unpacked first if compressed)
+def archive_file(path):
+    path = _archive_path(path)
+    if path.endswith(".xz"):
+        with _unpack_lock:
+            if path not in _unpacked_archives:
+                import lzma
+                import shutil
+                import tempfile
+                unpacked = os.path.join(tempfile.mkdtemp(prefix="bank-archive-"), os.path.basename(path)[:-3])
+                with lzma.open(path, "rb") as source, open(unpacked, "wb") as target:
+                    shutil.copyfileobj(source, target)
+                _unpacked_archives[path] = unpacked
+            path = _unpacked_archives[path]
+    return path
+
+
+# The thread's connection to an archive listed in 'Ledger Archives'
+def open_archive(path):
+    return pool.archive(archive_file(path))
+
+
+def run_archive(arguments):
+    parser = argparse.ArgumentParser(prog="Bank-System-Management.py archive", description="Move closed months of the ledger to read-only files")
+    parser.add_argument("--before", help="first month to keep (YYYY-MM), default this month")
+    parser.add_argument("--dir", help="folder of the archive files")
+    parser.add_argument("--compress", action="store_true", help="store the files xz-compressed")
+    parser.add_argument("--db", default=DB_PATH, help="database file")
+    options = parser.parse_args(arguments)
+
+    use_database(options.db)
+    try:
+        result = archive_ledger(options.before, options.dir, options.compress)
+    except BankError as error:
+        print(f"❌ {error}")
+        sys.exit(1)
+    if result["mismatches"]:
+        print(f"⚠️ The reconciliation before archiving found {len(result['mismatches'])} mismatches (run 'reconcile' for details).")
+    for archive in result["archived"]:
+        print(f"✅ {archive['period']}: {archive['rows']} ledger rows moved to {archive['path']}")
+    if not result["archived"]:
+        print("Nothing to archive.")
+
+
+
+# ------------------------- Ledger Verification --------------------------------
+# Recomputes the ledger's hash chain (see append_ledger()). The Seq range to check is cut
+# into segments checked by a pool of worker processes (hashing is pure Python and holds
+# the GIL, so threads would not help). Each segment starts from the stored Hash of the row
+# before it, so segments need nothing from each other and the run scales with the workers.
+# Archived months are checked in their own files.
+#
+# A clean run records the head it reached in 'Chain Checkpoints'; the next run resumes
+# there, only hashing the rows added since. It re-checks the checkpointed row itself, whose
+# hash must still be the one verified: rewriting any older row together with the hashes
+# after it would change it. An older row changed with its hashes left alone is only found
+# by re-hashing it, so a full run (full=True) should still come round now and then.
+MAX_PROBLEMS_PER_SEGMENT = 1_000
+LEDGER_CHAIN_SQL = """SELECT Seq, Name, "Bank Account Number", "Transaction Type", Amount, Balance, History, Hash
+    FROM "Account Transactions" WHERE Seq BETWEEN ? AND ? ORDER BY Seq"""
+
+
+# Checks the rows first <= Seq <= last of one SQLite file (the database or an archive) on a
+# connection of its own, so it can run in a worker process. previous_hash is the stored Hash
+# of row first - 1 (None when that row is missing). Returns (rows, problems, last hash).
+def verify_chain_segment(path, first, last, previous_hash):
+    connection = sql.connect(f"file:{urllib.parse.quote(os.path.abspath(path))}?mode=ro", uri=True)
+    rows, problems, expected_seq = 0, [], first
+    try:
+        for seq, *row, stored_hash in connection.execute(LEDGER_CHAIN_SQL, (first, last)):
+            if len(problems) >= MAX_PROBLEMS_PER_SEGMENT:
+                break
+            if seq != expected_seq:
+                problems.append((expected_seq, f"rows {expected_seq}-{seq - 1} missing"))
+            elif previous_hash is not None and ledger_hash(previous_hash, seq, row) != stored_hash:
+                problems.append((seq, "hash does not match the row"))
+            previous_hash, expected_seq = stored_hash, seq + 1
+            rows += 1
+    finally:
+        connection.close()
+    if expected_seq <= last and len(problems) < MAX_PROBLEMS_PER_SEGMENT:
+        problems.append((expected_seq, f"rows {expected_seq}-{last} missing"))
+    return rows, problems, previous_hash
+
+
+def _chain_sources(reader):
+    # (first Seq, last Seq, file) of every place chained rows live, oldest first
+    sources = [(first, last, archive_file(path)) for path, first, last in reader.execute(
+        """SELECT Path, "First Seq", "Last Seq" FROM 'Ledger Archives' WHERE "First Seq" IS NOT NULL ORDER BY "First Seq" """)]
+    first, last = reader.execute('SELECT MIN(Seq), MAX(Seq) FROM "Account Transactions"').fetchone()
+    if first is not None:
+        sources.append((first, last, pool.path))
+    return sources
+
+
+def _stored_hash(sources, seq):
+    for first, last, path in sources:
+        if first <= seq <= last:
+            connection = pool.reader() if path == pool.path else pool.archive(path)
+            row = connection.execute('SELECT Hash FROM "Account Transactions" WHERE Seq = ?', (seq,)).fetchone()
+            return row[0] if row else None
+    return None
+
+
+def _process_context():
+    # Forked workers inherit this module however it was loaded; spawn is the fallback where
+    # fork does not exist (the workers then import the script as __main__)
+    import multiprocessing
+    return multiprocessing.get_context("fork" if "fork" in multiprocessing.get_all_start_methods() else "spawn")
+
+
+# Returns {"rows": rows hashed, "problems": [(Seq, what), ...], "head": Seq of the chain head,
+# "from": first Seq checked, "segments": segments}. full=True ignores the checkpoint.
+def verify_ledger(workers=None, segments=None, full=False):
+    UnitOfWork.flush()
+    workers = workers or os.cpu_count() or 1
+    reader = pool.reader()
+    reader.execute("BEGIN")             # One snapshot of the head, the checkpoint and the sources
+    try:
+        head_seq, head_hash = reader.execute(LEDGER_HEAD_SQL).fetchone()
+        checkpoint = None if full else reader.execute("SELECT Seq, Hash FROM 'Chain Checkpoints' ORDER BY Seq DESC LIMIT 1").fetchone()
+        unchained = reader.execute('SELECT COUNT(*) FROM "Account Transactions" WHERE Seq IS NULL').fetchone()[0]
+        sources = _chain_sources(reader)
+    finally:
+        reader.rollback()
+
+    start = checkpoint[0] if checkpoint else 1
+    problems = []
+    if unchained:
+        problems.append((None, f"{unchained} ledger rows outside the chain"))
+    if checkpoint and _stored_hash(sources, checkpoint[0]) != checkpoint[1]:
+        problems.append((checkpoint[0], "changed since it was verified"))
+    if head_seq and _stored_hash(sources, head_seq) != head_hash:
+        problems.append((head_seq, "does not match the ledger head"))
+
+    # Segments of about equal length, cut again where one file ends and the next begins
+    step = max(1, -(-(head_seq - start + 1) // (segments or workers * 4)))
+    tasks, expected = [], start
+    for first, last, path in sources:
+        low, last = max(first, start), min(last, head_seq)
+        if low > last:
+            continue
+        if low > expected:
+            problems.append((expected, f"rows {expected}-{low - 1} missing"))
+        while low <= last:
+            high = min(low + step - 1, last)
+            previous_hash = LEDGER_GENESIS_HASH if low == 1 else _stored_hash(sources, low - 1)
+            tasks.append((path, low, high, previous_hash))
+            low = high + 1
+        expected = last + 1
+    if expected <= head_seq:
+        problems.append((expected, f"rows {expected}-{head_seq} missing"))
+
+    if workers > 1 and len(tasks) > 1:
+        from concurrent.futures import ProcessPoolExecutor
+        with ProcessPoolExecutor(min(workers, len(tasks)), mp_context=_process_context()) as executor:
+            results = list(executor.map(verify_chain_segment, *zip(*tasks)))
+    else:
+        results = [verify_chain_segment(*task) for task in tasks]
+    rows = sum(result[0] for result in results)
+    for result in results:
+        problems.extend(result[1])
+
+    if not problems and results:
+        with UnitOfWork() as work:
+            work.connection.execute("INSERT OR REPLACE INTO 'Chain Checkpoints' (Seq, Hash, Rows, Verified) VALUES (?, ?, ?, ?)",
+                                    (head_seq, results[-1][2], rows, datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")))
+        UnitOfWork.flush()
+    return {"rows": rows, "problems": sorted(problems, key=lambda problem: problem[0] or 0), "head": head_seq,
+            "from": start, "segments": len(tasks)}
+
+
+def print_verification(result):
+    if not result["problems"] and not result["head"]:
+        print("✅ The ledger is empty, nothing to verify.")
+        return
+    if not result["problems"]:
+        print(f"✅ Ledger chain intact: {result['rows']} rows checked (Seq {result['from']} to {result['head']}).")
+        return
+    print(f"❌ {len(result['problems'])} problems in the ledger chain:")
+    for seq, what in result["problems"]:
+        print(f"  {'Ledger' if seq is None else f'Seq {seq}'}: {what}")
+
+
+def run_verification(arguments):
+    parser = argparse.ArgumentParser(prog="Bank-System-Management.py verify", description="Check the ledger's hash chain")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="worker processes")
+    parser.add_argument("--segments", type=int, help="pieces the chain is cut into (default 4 per worker)")
+    parser.add_argument("--full", action="store_true", help="check the whole chain, not just the rows since the last clean run")
+    parser.add_argument("--db", default=DB_PATH, help="database file")
+    options = parser.parse_args(arguments)
+
+    use_database(options.db)
+    result = verify_ledger(options.workers, options.segments, options.full)
+    print_verification(result)
+    sys.exit(1 if result["problems"] else 0)
+
+
+
+# ------------------------- Reporting --------------------------------
+# Book-wide admin reports (deposits by account type, balance distribution, daily volume,
+# top accounts by flow) computed over a columnar copy of the books instead of SQL run
+# row by row. ColumnStore.export() appends the ledger rows written since the last export
+# (archived months included) to one flat binary file per column, and rewrites the small
+# account columns; state.json keeps the last exported rowid and the dictionaries of the
+# text columns. The files are plain native-endian arrays: with numpy installed they are
+# memory-mapped and every report is a few vectorized passes, without it the stdlib array
+# module reads them and the same reports run in plain Python.
+#
+# Ledger rows of closed accounts stay in the export; the account columns only hold the
+# accounts open at the last export.
+LEDGER_COLUMNS = {"rowid": "q", "account": "q", "type": "b", "amount": "q", "balance": "q", "day": "i"}
+ACCOUNT_COLUMNS = {"number": "q", "type": "b", "balance": "q"}
+NUMPY_TYPES = {"q": "int64", "b": "int8", "i": "int32"}
+
+# Days since 1970-01-01 are computed inside SQLite
+LEDGER_EXPORT_SQL = """SELECT rowid, COALESCE("Bank Account Number", 0), "Transaction Type", COALESCE(Amount, 0), COALESCE(Balance, 0),
+    CAST(julianday(substr(History, 1, 10)) - 2440587.5 AS INTEGER) FROM "Account Transactions" WHERE rowid > ? ORDER BY rowid"""
+
+# Balance distribution buckets, in pounds
+BALANCE_BUCKETS = (0, 5_000, 10_000, 25_000, 50_000, 100_000, 1_000_000)
+
+
+def _numpy():
+    # numpy is optional and only imported when a report runs
+    try:
+        import numpy
+    except ImportError:
+        return None
+    return numpy
+
+
+class ColumnStore:
+    def __init__(self, directory=None):
+        self.directory = directory or os.path.splitext(os.path.abspath(pool.path))[0] + " Columns"
+        self.state = {"last_rowid": 0, "rows": 0, "accounts": 0, "types": [], "account_types": []}
+        if os.path.exists(self._path("state.json")):
+            with open(self._path("state.json"), encoding="utf-8") as state_file:
+                self.state.update(json.load(state_file))
+
+    def _path(self, name):
+        return os.path.join(self.directory, name)
+
+    def _codes(self, key, values):
+        # Dictionary-encode a text column; new values get the next code
+        names = self.state[key]
+        codes = {name: code for code, name in enumerate(names)}
+        result = []
+        for value in values:
+            code = codes.get(value)
+            if code is None:
+                code = codes[value] = len(names)
+                names.append(value)
+            result.append(code)
+        return result
+
+    def export(self, batch=100_000):
+        # Appends the ledger rows written since the last export. Returns how many were added
+        os.makedirs(self.directory, exist_ok=True)
+        rows_before = self.state["rows"]
+        for name, typecode in LEDGER_COLUMNS.items():
+            # Drop whatever an interrupted export wrote after the last saved state
+            path = self._path(f"ledger.{name}")
+            with open(path, "ab") as column_file:
+                column_file.truncate(rows_before * array.array(typecode).itemsize)
+
+        UnitOfWork.flush()
+        sources = [open_archive(path) for _, path in repository.archives_between()] + [pool.reader()]
+        files = {name: open(self._path(f"ledger.{name}"), "ab") for name in LEDGER_COLUMNS}
+        try:
+            for source in sources:
+                rows = source.execute(LEDGER_EXPORT_SQL, (self.state["last_rowid"],))
+                while True:
+                    chunk = rows.fetchmany(batch)
+                    if not chunk:
+                        break
+                    rowids, accounts, types, amounts, balances, days = zip(*chunk)
+                    columns = {"rowid": rowids, "account": accounts, "type": self._codes("types", types),
+                               "amount": amounts, "balance": balances, "day": days}
+                    for name, values in columns.items():
+                        array.array(LEDGER_COLUMNS[name], values).tofile(files[name])
+                    self.state["last_rowid"] = max(self.state["last_rowid"], rowids[-1])
+                    self.state["rows"] += len(chunk)
+        finally:
+            for column_file in files.values():
+                column_file.close()
+
+        # Accounts change in place, so their columns are rewritten whole, in number order
+        accounts = pool.reader().execute("""SELECT "Bank Account Number", "Account Type", COALESCE(Balance, 0) FROM "Client Account"
+            WHERE "Bank Account Number" IS NOT NULL ORDER BY "Bank Account Number" """).fetchall()
+        numbers, types, balances = zip(*accounts) if accounts else ((), (), ())
+        for name, values in (("number", numbers), ("type", self._codes("account_types", types)), ("balance", balances)):
+            with open(self._path(f"accounts.{name}.new"), "wb") as column_file:
+                array.array(ACCOUNT_COLUMNS[name], values).tofile(column_file)
+            os.replace(self._path(f"accounts.{name}.new"), self._path(f"accounts.{name}"))
+        self.state["accounts"] = len(accounts)
+        self.state["exported"] = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+
+        with open(self._path("state.json.new"), "w", encoding="utf-8") as state_file:
+            json.dump(self.state, state_file)
+        os.replace(self._path("state.json.new"), self._path("state.json"))
+        return self.state["rows"] - rows_before
+
+    def column(self, table, name):
+        # A column as a numpy array (memory-mapped) or, without numpy, an array.array
+        typecode = (LEDGER_COLUMNS if table == "ledger" else ACCOUNT_COLUMNS)[name]
+        length = self.state["rows" if table == "ledger" else "accounts"]
+        numpy = _numpy()
+        if numpy is not None:
+            if not length:
+                return numpy.zeros(0, dtype=NUMPY_TYPES[typecode])
+            return numpy.memmap(self._path(f"{table}.{name}"), dtype=NUMPY_TYPES[typecode], mode="r", shape=(length,))
+        values = array.array(typecode)
+        with open(self._path(f"{table}.{name}"), "rb") as column_file:
+            values.fromfile(column_file, length)
+        return values
+
+    def code(self, key, value):
+        return self.state[key].index(value) if value in self.state[key] else -1
+
+
+def _account_positions(store, accounts):
+    # Position of every ledger row's account in the (sorted) account columns, -1 if closed
+    numbers = store.column("accounts", "number")
+    numpy = _numpy()
+    if numpy is not None:
+        positions = numpy.searchsorted(numbers, accounts)
+        found = positions < len(numbers)
+        found[found] = numbers[positions[found]] == accounts[found]
+        return numpy.where(found, positions, -1)
+    index = {number: position for position, number in enumerate(numbers)}
+    return [index.get(account, -1) for account in accounts]
 
-# ------------------------- ClientAccount --------------------------------
-class ClientAccount:
-    def __init__(self, name, nationality, gender, phone_number, document_submit, account_type, balance, password, bank_account_number):
-        self.name = name
-        self.nationality = nationality
-        self.gender = gender 
-        self.phone_number = phone_number
-        self._document_submit = document_submit
-        self.account_type = account_type
-        self.__balance = balance
-        self.__password = password
-        self.bank_account_number = bank_account_number
 
-    def get_balance(self):
-        return self.__balance
+def _group(keys, weights, size):
+    # (counts, totals) per key 0 .. size - 1; rows with a negative key are skipped.
+    # numpy adds the weights as float64, exact for totals below 2**53 piastres.
+    numpy = _numpy()
+    if numpy is not None:
+        keep = keys >= 0
+        counts = numpy.bincount(keys[keep], minlength=size)
+        totals = numpy.bincount(keys[keep], weights=weights[keep], minlength=size)
+        return [int(count) for count in counts], [int(round(total)) for total in totals]
+    counts, totals = [0] * size, [0] * size
+    for key, weight in zip(keys, weights):
+        if key >= 0:
+            counts[key] += 1
+            totals[key] += weight
+    return counts, totals
 
-    def set_balance(self, new_balance):
-        self.__balance = new_balance
 
-    def get_password(self):
-        return self.__password
+# {account type: (deposits, total piastres)}
+def report_deposits_by_account_type(store):
+    numpy = _numpy()
+    if not store.state["accounts"]:
+        return {}
+    deposit = store.code("types", "Deposit")
+    types = store.column("ledger", "type")
+    accounts = store.column("ledger", "account")
+    amounts = store.column("ledger", "amount")
+    account_types = store.column("accounts", "type")
+    positions = _account_positions(store, accounts)
+    if numpy is not None:
+        keys = numpy.where((types == deposit) & (positions >= 0), account_types[numpy.maximum(positions, 0)], -1)
+    else:
+        keys = [account_types[position] if kind == deposit and position >= 0 else -1 for kind, position in zip(types, positions)]
+    counts, totals = _group(keys, amounts, len(store.state["account_types"]))
+    return {name: (counts[code], totals[code]) for code, name in enumerate(store.state["account_types"])}
 
-    def set_clientPassword(self, new_password):
-        self.__password = new_password
 
-    # Added a static method to load a client account type from the database
-    @staticmethod
-    def load_account_from_db(bank_account_number):
-        cr.execute("""SELECT Name, Nationality, Gender, "Phone Number", "Document Submit", "Account Type", Balance, Password, "Bank Account Number" FROM "Client Account" WHERE "Bank Account Number" = ?""", (bank_account_number,))
-        account_data = cr.fetchone()
+# [(from pounds, to pounds or None, accounts, total piastres)]
+def report_balance_distribution(store, buckets=BALANCE_BUCKETS):
+    numpy = _numpy()
+    balances = store.column("accounts", "balance")
+    edges = [bucket * MINOR_UNITS for bucket in buckets]
+    if numpy is not None:
+        keys = numpy.searchsorted(numpy.array(edges), balances, side="right") - 1
+    else:
+        keys = [bisect.bisect_right(edges, balance) - 1 for balance in balances]
+    counts, totals = _group(keys, balances, len(edges))
+    return [(low, high, counts[index], totals[index]) for index, (low, high) in enumerate(zip(buckets, buckets[1:] + (None,)))]
 
-        if account_data:
-            # Unpack the account data
-            # Ensure the order matches the SELECT statement above
-            name, nationality, gender, phone_number, document_submit, account_type, balance, password, bank_account_number_db = account_data
-            
-            if account_type == "Current":
-                return CurrentAccount(name, nationality, gender, phone_number, document_submit, account_type, balance, password, bank_account_number_db)
-            elif account_type == "Saving":
-                return SavingAccount(name, nationality, gender, phone_number, document_submit, account_type, balance, password, bank_account_number_db)
-        
 
-# ------------------------- CurrentAccount --------------------------------
-class CurrentAccount(ClientAccount):
-    mini_amount = 2500
+# {(YYYY-MM-DD, transaction type): (rows, total piastres)} for the last `days` days of the ledger
+def report_daily_volume(store, days=30):
+    numpy = _numpy()
+    if not store.state["rows"]:
+        return {}
+    day = store.column("ledger", "day")
+    types = store.column("ledger", "type")
+    amounts = store.column("ledger", "amount")
+    type_count = len(store.state["types"])
+    first_day = (int(day.max()) if numpy is not None else max(day)) - days + 1
+    if numpy is not None:
+        keys = numpy.where(day >= first_day, (day.astype("int64") - first_day) * type_count + types, -1)
+    else:
+        keys = [(row_day - first_day) * type_count + kind if row_day >= first_day else -1 for row_day, kind in zip(day, types)]
+    counts, totals = _group(keys, amounts, days * type_count)
+    epoch = datetime.date(1970, 1, 1)
+    return {((epoch + datetime.timedelta(days=first_day + key // type_count)).isoformat(), store.state["types"][key % type_count]): (counts[key], totals[key])
+            for key in range(days * type_count) if counts[key]}
 
-    def __init__(self, name, nationality, gender, phone_number, document_submit, account_type, balance, password, bank_account_number):
-        super().__init__(name, nationality, gender, phone_number, document_submit, account_type, balance, password, bank_account_number)
 
-    def deposit(self, deposit_amount):
-        Transaction.deposit(self, deposit_amount)
-        # Update balance in DB after transaction
-        cr.execute('UPDATE "Client Account" SET Balance = ? WHERE "Bank Account Number" = ?', (self.get_balance(), self.bank_account_number))
-        db.commit()
+# [(account number, rows, flow in piastres)]: money in and out of each open account, largest first
+def report_top_accounts(store, top=10):
+    accounts = store.column("ledger", "account")
+    amounts = store.column("ledger", "amount")
+    numbers = store.column("accounts", "number")
+    counts, totals = _group(_account_positions(store, accounts), amounts, len(numbers))
+    best = heapq.nlargest(top, range(len(numbers)), key=totals.__getitem__)
+    return [(int(numbers[position]), counts[position], totals[position]) for position in best]
 
-    def withdraw(self, withdraw_amount):
-        Transaction.withdraw(self, withdraw_amount)
-        # Update balance in DB after transaction
-        cr.execute('UPDATE "Client Account" SET Balance = ? WHERE "Bank Account Number" = ?', (self.get_balance(), self.bank_account_number))
-        db.commit()
 
-    def transfer(self, receiver_account, transfer_amount):
-        Transaction.transfer(self, receiver_account, transfer_amount)
-        # Update balances in DB after transfer
-        cr.execute('UPDATE "Client Account" SET Balance = ? WHERE "Bank Account Number" = ?', (self.get_balance(), self.bank_account_number))
-        cr.execute('UPDATE "Client Account" SET Balance = ? WHERE "Bank Account Number" = ?', (receiver_account.get_balance(), receiver_account.bank_account_number))
-        db.commit()
+def print_reports(store, days=14, top=10):
+    print(f"Engine: {'numpy' if _numpy() else 'array (install numpy for vectorized reports)'}, "
+          f"{store.state['rows']} ledger rows, {store.state['accounts']} accounts")
+    print("Deposits by account type".center(50, "-"))
+    for account_type, (count, total) in report_deposits_by_account_type(store).items():
+        print(f"{account_type}: {count} deposits, {format_money(total)}")
+    print("Balance distribution".center(50, "-"))
+    for low, high, count, total in report_balance_distribution(store):
+        print(f"{low:>9} - {high if high is not None else '':<9}: {count} accounts, {format_money(total)}")
+    print("Daily volume".center(50, "-"))
+    for (day, transaction_type), (count, total) in sorted(report_daily_volume(store, days).items()):
+        print(f"{day} {transaction_type:<18}: {count} rows, {format_money(total)}")
+    print("Top accounts by flow".center(50, "-"))
+    for number, count, total in report_top_accounts(store, top):
+        print(f"Account {number}: {count} rows, {format_money(total)}")
 
 
-# ------------------------- SavingAccount --------------------------------
-class SavingAccount(ClientAccount):
-    mini_amount = 3000
+def run_reports(arguments):
+    parser = argparse.ArgumentParser(prog="Bank-System-Management.py report", description="Export the books to columns and print the admin reports")
+    parser.add_argument("--days", type=int, default=14, help="days of daily volume")
+    parser.add_argument("--top", type=int, default=10, help="accounts in the top-flow report")
+    parser.add_argument("--dir", help="folder of the column files")
+    parser.add_argument("--db", default=DB_PATH, help="database file")
+    options = parser.parse_args(arguments)
 
-    def __init__(self, name, nationality, gender, phone_number, document_submit, account_type, balance, password, bank_account_number, interest=0.12):
-        super().__init__(name, nationality, gender, phone_number, document_submit, account_type, balance, password, bank_account_number)
-        self.interest = interest
+    use_database(options.db)
+    store = ColumnStore(options.dir)
+    print(f"✅ {store.export()} new ledger rows exported")
+    print_reports(store, options.days, options.top)
 
-    def deposit(self, deposit_amount):
-        Transaction.deposit(self, deposit_amount)
-        # Update balance in DB after transaction
-        cr.execute('UPDATE "Client Account" SET Balance = ? WHERE "Bank Account Number" = ?', (self.get_balance(), self.bank_account_number))
-        db.commit()
 
-    def withdraw(self, withdraw_amount):
-        # Saving accounts typically do not allow direct withdrawals.
-        print("You can not withdraw money directly from Saving Account.")
-    
-    
-    def apply_interest(self):
-        amount_with_interest = self.get_balance() * self.interest
-        new_balance = self.get_balance() + amount_with_interest
-        self.set_balance(new_balance)
-        # Here, the Transaction is recorded for the interest application
-        Transaction(self.name, self.bank_account_number, "Interest", amount_with_interest, new_balance)
-        print(f"✅ Interest applied. New balance: {new_balance}")
-        # Update balance in DB after interest application
-        cr.execute('UPDATE "Client Account" SET Balance = ? WHERE "Bank Account Number" = ?', (self.get_balance(), self.bank_account_number))
-        db.commit()
+
+# ------------------------- Account Search --------------------------------
+# Admins find accounts by the start of any word of the name, of the phone number or of the
+# nationality ("ana le", "010123", "egy"), not only by exact name and number. The FTS5 index
+# 'Account Search' (see SCHEMA_MIGRATIONS) holds those words for every open account, keyed by
+# account number, and is updated in the same transaction that opens, changes or closes an
+# account.
+#
+# A search is one statement on the thread's read-only connection, so it reads one snapshot
+# of the index and the accounts. Under WAL a reader never waits for the writer and never
+# holds it up, so searching never slows down posting. Matches come back in account number
+# order (the index's own order), a page at a time with the same kind of cursor as the
+# history: the first page costs the same however many accounts match.
+SEARCH_FIELDS = {"name": "Name", "phone": "Phone", "nationality": "Nationality"}
+INDEX_ACCOUNT_SQL = "INSERT INTO 'Account Search' (rowid, Name, Phone, Nationality) VALUES (?, ?, ?, ?)"
+# A contentless index forgets a row given the words it was indexed with
+UNINDEX_ACCOUNT_SQL = """INSERT INTO 'Account Search' ('Account Search', rowid, Name, Phone, Nationality)
+    SELECT 'delete', "Bank Account Number", Name, "Phone Number", Nationality FROM "Client Account" WHERE "Bank Account Number" = ?"""
+SEARCH_COLUMNS = ['Bank Account Number', 'Name', 'Phone Number', 'Nationality', 'Account Type']
+
+
+def search_query(text, field=None):
+    # "Ana  L." -> '"ana"* "l"*' (every word is a prefix, all must match), limited to one
+    # field when given; None when the text holds no word
+    words = re.findall(r"\w+", str(text).lower())
+    if not words:
+        return None
+    query = " ".join(f'"{word}"*' for word in words)
+    return f"{{{SEARCH_FIELDS[field]}}}: ({query})" if field else query
+
+
+# Returns (SEARCH_COLUMNS rows, cursor for the next page or None)
+def search_accounts(text, field=None, limit=20, after=None):
+    if field is not None and field not in SEARCH_FIELDS:
+        raise BankError(f"Search field must be one of: {', '.join(SEARCH_FIELDS)}")
+    query = search_query(text, field)
+    if query is None:
+        return [], None
+    rows = pool.reader().execute("""SELECT account."Bank Account Number", account.Name, account."Phone Number", account.Nationality,
+            account."Account Type" FROM "Account Search" JOIN "Client Account" AS account ON account."Bank Account Number" = "Account Search".rowid
+        WHERE "Account Search" MATCH ? AND "Account Search".rowid > ? ORDER BY "Account Search".rowid LIMIT ?""",
+        (query, after or 0, limit)).fetchall()
+    return rows, rows[-1][0] if len(rows) == limit else None
+
+
+def print_search_results(rows):
+    if not rows:
+        print("❌ No account matches.")
+        return
+    print(f"{'Account':>12}  {'Name':<28} {'Phone Number':<15} {'Nationality':<15} Type")
+    for number, name, phone_number, nationality, account_type in rows:
+        print(f"{number:>12}  {name:<28} {phone_number:<15} {nationality:<15} {account_type}")
 
 
 
 # ------------------------- Admin class --------------------------------
+# ----------- Rules shared by the admin menu and the network service -----------------
+KNOWN_PHONE_PROVIDERS = ("010", "011", "012", "015")
+
+
+# Returns why a phone number is not accepted, or None when it is valid
+def phone_number_problem(phone_number):
+    if not (len(phone_number) == 11 and phone_number.startswith("01") and phone_number.isdigit()):
+        return "Invalid Phone Number ❌"
+    if not phone_number.startswith(KNOWN_PHONE_PROVIDERS):
+        return "Invalid Phone Number ❌ (Unknown provider)"
+    return None
+
+
+# ------------ Bank account numbers ------------------
+# Numbers are 9 digits: an 8-digit sequence value followed by a Luhn check digit, so a
+# mistyped digit is caught before it reaches the database. The sequence lives in the
+# 'Account Number Sequence' table; each process reserves a block of values from it in one
+# short transaction and then hands them out from memory. Every number is unique across
+# processes and threads, and no existing account is ever scanned.
+FIRST_ACCOUNT_SEQUENCE = 10_000_000
+LAST_ACCOUNT_SEQUENCE = 99_999_999
+
+
+def luhn_check_digit(value):
+    total = 0
+    for position, digit in enumerate(reversed(str(value))):
+        digit = int(digit)
+        if position % 2 == 0:       # Doubled, counting from the right of the payload
+            digit = digit * 2 - 9 if digit > 4 else digit * 2
+        total += digit
+    return (10 - total % 10) % 10
+
+
+def is_valid_account_number(bank_account_number):
+    value, check_digit = divmod(int(bank_account_number), 10)
+    return FIRST_ACCOUNT_SEQUENCE <= value <= LAST_ACCOUNT_SEQUENCE and luhn_check_digit(value) == check_digit
+
+
+class AccountNumberAllocator:
+    def __init__(self, block_size=1000):
+        self.block_size = block_size
+        self._lock = threading.Lock()
+        self._next = 0
+        self._end = 0
+
+    def _reserve(self, count):
+        return repository.reserve_account_numbers(count)
+
+    def allocate(self):
+        with self._lock:
+            if self._next >= self._end:
+                self._next = self._reserve(self.block_size)
+                self._end = self._next + self.block_size
+            value = self._next
+            self._next += 1
+        return value * 10 + luhn_check_digit(value)
+
+    def allocate_many(self, count):
+        # A contiguous run of numbers for bulk account opening, reserved in one transaction
+        with self._lock:
+            start = self._reserve(count)
+        return [value * 10 + luhn_check_digit(value) for value in range(start, start + count)]
+
+    def reset(self):
+        # Forget the reserved block (its unused values are simply skipped) and the connection
+        with self._lock:
+            if isinstance(repository, BankRepository):
+                repository.close_sequence()
+            self._next = self._end = 0
+
+
+account_numbers = AccountNumberAllocator()
+
+
+def new_account_number():
+    return account_numbers.allocate()
+
+
 class BankAdmin() :
     
     def __init__(self, adminUsername='admin', adminPassword='123'):
@@ -237,10 +3487,8 @@ class BankAdmin() :
         # self.saveAdminDB()  # This should ideally be called once if the admin already exists, not every time an object is created.
         # For simplicity in this example, we'll keep it, but in a real app, check if admin exists first.
         # Check if admin credentials already exist before inserting
-        cr.execute("SELECT Username FROM 'Admin' WHERE Username = ?", (self.adminUsername,))
-        if not cr.fetchone():
-            cr.execute("INSERT INTO 'Admin' (Username, Password) VALUES (?, ?)", (self.adminUsername, self.adminPassword))
-            db.commit()
+        if not repository.admin_exists(self.adminUsername):
+            repository.insert_admin(self.adminUsername, self.adminPassword)
     
     # ------------------------- Create Client Account -------------------------------
     # This method creates a new client account after validating the inputs
@@ -252,18 +3500,13 @@ class BankAdmin() :
         
         # ----------- To Check if the phone number is valid -----------------
         
-        known_provider = ("010", "011", "012", "015")
-        
         # Check if the phone number is valid
         while True:
             phone_number = input("Phone Number: ")
             
-            if not (len(phone_number) == 11 and phone_number.startswith("01") and phone_number.isdigit()):
-                print("Invalid Phone Number ❌, try again")
-                continue
-            
-            if not phone_number.startswith(known_provider):
-                print("Invalid Phone Number ❌ (Unknown provider), try again")
+            problem = phone_number_problem(phone_number)
+            if problem:
+                print(f"{problem}, try again")
                 continue
             break
         
@@ -276,14 +3519,18 @@ class BankAdmin() :
         # ----------- Check initial balance ----------------        
         while True:
             
-            init_balance = float(input("Initial Balance: "))
+            try:
+                init_balance = to_minor(input("Initial Balance: "))
+            except ValueError:
+                print("❌ Invalid amount. Please enter a number with at most two decimals.")
+                continue
             if account_type.capitalize() == "Current" :
                 if init_balance >= CurrentAccount.mini_amount :
                     print("✅ Valid Balance")
                     break
                 
                 else:
-                    print("❌ Invalid amount: Initial balance for Current Account must be at least", CurrentAccount.mini_amount)
+                    print("❌ Invalid amount: Initial balance for Current Account must be at least", format_money(CurrentAccount.mini_amount))
                     continue
                 
                 
@@ -293,7 +3540,7 @@ class BankAdmin() :
                     break
                 
                 else:
-                    print("❌ Invalid amount: Initial balance for Saving Account must be at least", SavingAccount.mini_amount)
+                    print("❌ Invalid amount: Initial balance for Saving Account must be at least", format_money(SavingAccount.mini_amount))
                     continue
                 
             else:
@@ -314,9 +3561,7 @@ class BankAdmin() :
                 
         
         # ------------ Create the account number ----------------
-        # ------------ Generate a random 4-digit bank account number ------------------
-        
-        bank_account_number = random.randrange(1000, 9999)
+        bank_account_number = new_account_number()
         
         
         # ------------- Create Current Account ----------------
@@ -329,20 +3574,71 @@ class BankAdmin() :
             return new_account
         
         
+    # Non-interactive version of createClientAccount() (same checks), used by the network
+    # service. Saves the account and returns its number, raises BankError on invalid input.
+    @staticmethod
+    @instrumented("create_account")
+    def open_account(name, nationality, gender, phone_number, document_submit, account_type, balance, password):
+        values = BankAdmin._account_values(name, nationality, gender, phone_number, document_submit, account_type, balance, password)
+        bank_account_number = new_account_number()
+        repository.insert_account(values[:8] + (bank_account_number, values[8]))
+        return bank_account_number
+
+    # Checks a new account the way createClientAccount() does and returns its column values
+    # (without the account number), raises BankError when something is not accepted
+    @staticmethod
+    def _account_values(name, nationality, gender, phone_number, document_submit, account_type, balance, password):
+        problem = phone_number_problem(str(phone_number))
+        if problem:
+            raise BankError(problem)
+        account_type = str(account_type).capitalize()
+        account_class = ACCOUNT_CLASSES.get(account_type)
+        if account_class is None:
+            raise BankError("❌ Invalid account type. Please choose 'Current' or 'Saving'.")
+        if balance < account_class.mini_amount:
+            raise BankError(f"❌ Invalid amount: Initial balance for {account_type} Account must be at least {format_money(account_class.mini_amount)}")
+        if not PasswordHasher.is_hash(password):
+            password = PasswordHasher.hash(password)
+        return (str(name).title(), str(nationality).title(), str(gender).capitalize(), phone_number, str(document_submit).title(),
+                account_type, balance, password, datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S"))
+
+    # Opens many accounts at once (branch migrations, corporate payroll onboarding).
+    # rows: (name, nationality, gender, phone_number, document_submit, account_type, balance, password),
+    # balance in piastres like every amount the engine takes. Passwords are hashed one by one,
+    # so large imports should pass hashes made beforehand with PasswordHasher.hash()
+    # Every chunk takes one block of account numbers and one executemany INSERT.
+    # Returns the new account numbers in input order (None for rejected rows) and the rejects.
+    @staticmethod
+    @instrumented("bulk_open_accounts")
+    def bulk_open_accounts(rows, chunk_size=50_000):
+        numbers, rejected = [], []
+        rows = iter(rows)
+        while True:
+            chunk = list(itertools.islice(rows, chunk_size))
+            if not chunk:
+                break
+            chunk_numbers = [None] * len(chunk)
+            accepted = []
+            for index, row in enumerate(chunk):
+                try:
+                    accepted.append((index, BankAdmin._account_values(*row)))
+                except (BankError, TypeError, ValueError) as error:
+                    rejected.append((len(numbers) + index, str(error)))
+            if accepted:
+                inserts = []
+                for (index, values), number in zip(accepted, account_numbers.allocate_many(len(accepted))):
+                    chunk_numbers[index] = number
+                    inserts.append(values[:8] + (number, values[8]))
+                repository.insert_accounts(inserts)
+            numbers.extend(chunk_numbers)
+        return numbers, rejected
+
     def Delete_Client_Account(self, dele_clientName, dele_clientAccount) :
         
-        # Verify the account exists and matches the name before deleting
-        cr.execute("SELECT `Name` FROM `Client Account` WHERE Name = ? AND `Bank Account Number` = ?", (dele_clientName, dele_clientAccount))
-        account_to_delete = cr.fetchone()
-        
-        if account_to_delete:
-            cr.execute("DELETE FROM `Client Account` WHERE Name = ? AND `Bank Account Number` = ?", (dele_clientName, dele_clientAccount))
-            db.commit()
-            # Delete the transactions related to this account
-            # Corrected table name from 'Transactions Account' to 'Account Transactions'
-            cr.execute("DELETE FROM `Account Transactions` WHERE `Bank Account Number` = ?", (dele_clientAccount,))
-            db.commit()
-            print("✅ The Account Has Been Deleted")
+        # The account is only closed if the name and number match; its transactions are kept
+        if repository.delete_account(dele_clientName, dele_clientAccount):
+            account_cache.invalidate(dele_clientAccount)
+            print("✅ The Account Has Been Closed")
         else :
             print("❌ Enter The Client Name and Bank number Correctly. Account not found.")
         # return
@@ -351,15 +3647,12 @@ class BankAdmin() :
     def checkAccountSummary(self, client_name_summary, bank_number_summary):
     
         # --- TO get name and bank account number from DB ----
-        cr.execute("""SELECT Name, Gender, Nationality, "Phone Number", "Account Type", "Bank Account Number", Balance, Time
-        FROM 'Client Account' WHERE Name = ? AND "Bank Account Number" = ?""", (client_name_summary, bank_number_summary))
-        # make a Fetch for all data from DB
-        summary_data = cr.fetchone()
+        summary_data = repository.account_summary(bank_number_summary, client_name_summary)
         
         print("Client Information Summary".center(50, "-"))
         
         if summary_data:
-            # This list of labels has been REORDERED to EXACTLY MATCH the SELECT statement above.
+            # This list of labels has been REORDERED to EXACTLY MATCH the SELECT in BankRepository.account_summary().
             
             columns = [
                 'Name',
@@ -373,42 +3666,275 @@ class BankAdmin() :
                 ]
             # The zip function will now pair the correct label with the correct value.
             for col_name, value in zip(columns, summary_data):
-                print(f"{col_name}: {value}")
+                print(f"{col_name}: {display_value(col_name, value)}")
             
         else: 
             print("❌ Enter client name and Bank Account Number correctly")
 
 
 
+# ------------------------- Network Service --------------------------------
+# The admin and client menu operations over a JSON-lines TCP protocol: one request object
+# per line in, one response object per line out. Client operations carry the account
+# number and password, admin operations the admin username and password:
+#
+#   {"id": 1, "op": "deposit", "account": 1234, "password": "...", "amount": "500.00"}
+#   {"id": 1, "ok": true, "result": {"balance": "7500.00"}}
+#
+# Amounts are sent and returned in pounds as decimal strings (numbers are accepted too),
+# so no money value ever passes through a JSON float.
+#   {"id": 2, "ok": false, "error": "..."}
+#
+# A request that found the database locked by another writer (after the busy timeout) gets
+# "code": "busy" and "retryable": true, and can be sent again as it is. Any other failure
+# is answered with "ok": false too; the connection is only closed by the client.
+#
+# Checking a password costs a slow key derivation, so a client can log in once and send
+# the returned session token instead of its password until the session ends:
+#   {"id": 3, "op": "login", "account": 1234, "password": "..."}
+#   {"id": 3, "ok": true, "result": {"token": "..."}}
+#   {"id": 4, "op": "balance", "account": 1234, "token": "..."}
+#
+# Every request runs on a worker thread (each with its own pooled connections), so the
+# event loop never blocks on the database and many tellers and clients are served at once.
+SUMMARY_COLUMNS = ['Name', 'Gender', 'Nationality', 'Phone Number', 'Account Type', 'Bank Account Number', 'Balance', 'Time']
+TRANSACTION_COLUMNS = ['Name', 'Bank Account Number', 'Transaction Type', 'Amount', 'Balance After', 'Timestamp']
+
+
+class BankService:
+    ADMIN_OPERATIONS = ("create_account", "delete_account", "summary", "search", "metrics")
+    CLIENT_OPERATIONS = ("login", "balance", "deposit", "withdraw", "transfer", "interest", "history",
+                         "standing_order", "standing_orders", "cancel_standing_order")
+
+    def handle(self, request):
+        operation = request.get("op")
+        if operation in self.ADMIN_OPERATIONS:
+            if not repository.check_admin(request.get("username"), request.get("password")):
+                raise BankError("Wrong username or password")
+            return getattr(self, operation)(request)
+        if operation in self.CLIENT_OPERATIONS:
+            number = int(request["account"])
+            if "token" in request and operation != "login":
+                account = sessions.account(request["token"])
+                if account is not None and account.bank_account_number != number:
+                    account = None
+            else:
+                account = ClientAccount.authenticate(number, request.get("password"))
+            if account is None:
+                raise BankError("Wrong Account Number or Password")
+            return getattr(self, operation)(request, account)
+        raise BankError(f"Unknown operation: {operation}")
+
+    # ------------- Session -------------
+    def login(self, request, account):
+        return {"token": sessions.open(account).token, "expires_in": sessions.ttl}
+
+    # ------------- Admin operations -------------
+    def create_account(self, request):
+        number = BankAdmin.open_account(request["name"], request["nationality"], request["gender"], request["phone_number"],
+                                        request["document_submit"], request["account_type"], to_minor(request["balance"]), request["new_password"])
+        return {"account": number}
+
+    def delete_account(self, request):
+        if not repository.delete_account(str(request["name"]).title(), int(request["client_account"])):
+            raise BankError("Account not found")
+        account_cache.invalidate(int(request["client_account"]))
+        return {"deleted": True}
+
+    def summary(self, request):
+        summary_data = repository.account_summary(int(request["client_account"]), str(request["name"]).title())
+        if summary_data is None:
+            raise BankError("Account not found")
+        return {column: display_value(column, value) for column, value in zip(SUMMARY_COLUMNS, summary_data)}
+
+    def search(self, request):
+        # {"text": "ana le", "field": "name" / "phone" / "nationality" (optional)}; pass the
+        # returned "next" back as "after" for the next page
+        rows, cursor = search_accounts(request["text"], request.get("field"), min(int(request.get("limit", 20)), 500), request.get("after"))
+        return {"accounts": [dict(zip(SEARCH_COLUMNS, row)) for row in rows], "next": cursor}
+
+    def metrics(self, request):
+        # {"format": "prometheus"} returns the text exposition format, anything else the JSON view
+        if request.get("format") == "prometheus":
+            return {"text": metrics.to_prometheus()}
+        return metrics.to_json()
+
+    # ------------- Client operations -------------
+    def balance(self, request, account):
+        account_type, balance = repository.account_balance(account.bank_account_number)
+        return {"account_type": account_type, "balance": format_money(balance)}
+
+    def deposit(self, request, account):
+        amount = to_minor(request["amount"])
+        if amount < 0:
+            raise BankError("Invalid operation")
+        return {"balance": format_money(deposit_funds(account.bank_account_number, amount))}
+
+    def withdraw(self, request, account):
+        amount = to_minor(request["amount"])
+        if amount <= 0:
+            raise BankError("Invalid operation: Withdraw amount must be positive.")
+        return {"balance": format_money(withdraw_funds(account.bank_account_number, amount))}
+
+    def transfer(self, request, account):
+        sender_balance, _ = transfer_funds(account.bank_account_number, int(request["to_account"]), to_minor(request["amount"]))
+        return {"balance": format_money(sender_balance)}
+
+    def interest(self, request, account):
+        amount_with_interest, new_balance = credit_interest(account.bank_account_number)
+        return {"interest": format_money(amount_with_interest), "balance": format_money(new_balance)}
+
+    def history(self, request, account):
+        # One page per request; pass the returned "next" cursor back as "after" for the next page
+        after = request.get("after")
+        if after is not None and not (isinstance(after, list) and len(after) == 2 and isinstance(after[0], str) and isinstance(after[1], int)):
+            raise ValueError("after must be the \"next\" cursor of the previous page")
+        types = request.get("types")
+        if types is not None and (not isinstance(types, list) or not all(isinstance(name, str) for name in types)):
+            raise ValueError("types must be a list of transaction type names")
+        rows, cursor = repository.transactions_page(account.bank_account_number, tuple(after) if after else None,
+                                                    min(int(request.get("limit", 50)), 500), request.get("since"),
+                                                    request.get("until"), request.get("types"))
+        return {"transactions": [{column: display_value(column, value) for column, value in zip(TRANSACTION_COLUMNS, row)} for row in rows],
+                "next": cursor}
+
+    def standing_order(self, request, account):
+        order = create_standing_order(account.bank_account_number, int(request["to_account"]), to_minor(request["amount"]),
+                                      request["frequency"], request.get("start"),
+                                      int(request["installments"]) if request.get("installments") is not None else None,
+                                      limited=True)
+        return {"order": order}
+
+    def standing_orders(self, request, account):
+        return {"orders": [{column: display_value(column, value) for column, value in zip(STANDING_ORDER_COLUMNS, row)}
+                           for row in standing_orders(account.bank_account_number)]}
+
+    def cancel_standing_order(self, request, account):
+        if not cancel_standing_order(int(request["order"]), account.bank_account_number):
+            raise BankError("No active standing order with that Id.")
+        return {"cancelled": True}
+
+
+async def serve(host="127.0.0.1", port=8765, workers=16):
+    import asyncio
+    from concurrent.futures import ThreadPoolExecutor
+    loop = asyncio.get_running_loop()
+    executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="bank-db")
+    service = BankService()
+
+    async def respond(line):
+        request = None
+        try:
+            request = json.loads(line)
+            if not isinstance(request, dict):
+                raise ValueError("a request must be a JSON object")
+            response = {"ok": True, "result": await loop.run_in_executor(executor, service.handle, request)}
+        except BankError as error:
+            response = {"ok": False, "error": str(error)}
+        except KeyError as error:
+            response = {"ok": False, "error": f"Bad request: missing {error}"}
+        except (ValueError, TypeError, sql.InterfaceError) as error:
+            # InterfaceError: a request value SQLite cannot bind (a list or object where a value belongs)
+            response = {"ok": False, "error": f"Bad request: {error}"}
+        except sql.Error as error:
+            if "locked" not in str(error) and "busy" not in str(error):
+                response = {"ok": False, "error": f"Database error: {error}"}
+            else:
+                response = {"ok": False, "error": "The bank is busy right now, please try again", "code": "busy", "retryable": True}
+        except Exception as error:
+            # Anything else is a bug: answer it and keep serving, with the traceback on stderr
+            print(f"❌ {request.get('op') if isinstance(request, dict) else None!r} failed:", file=sys.stderr)
+            traceback.print_exc()
+            response = {"ok": False, "error": f"Internal error: {type(error).__name__}"}
+        if isinstance(request, dict) and "id" in request:
+            response["id"] = request["id"]
+        return response
+
+    async def handle_connection(reader, writer):
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                writer.write(json.dumps(await respond(line), default=str).encode() + b"\n")
+                await writer.drain()
+        except ConnectionError:
+            pass
+        except Exception:
+            # Never drop a client without saying why (a line longer than the stream limit, ...)
+            print("⚠️ Closing a client connection after an error:", file=sys.stderr)
+            traceback.print_exc()
+        finally:
+            writer.close()
+
+    server = await asyncio.start_server(handle_connection, host, port)
+    print(f"✅ Bank service listening on {host}:{port}")
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        executor.shutdown(wait=True)
+        pool.close_all()
+
+
+def run_server(arguments):
+    parser = argparse.ArgumentParser(prog="Bank-System-Management.py serve", description="Serve the bank over JSON-lines TCP")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--workers", type=int, default=16, help="threads doing database work")
+    parser.add_argument("--db", default=DB_PATH, help="database file")
+    parser.add_argument("--hash-workers", type=int, default=os.cpu_count() or 1, help="processes verifying passwords (0 = inline)")
+    parser.add_argument("--scrypt-n", type=int, default=PasswordHasher.scrypt_n, help="scrypt cost of new password hashes")
+    parser.add_argument("--slow-query-ms", type=float, default=None, help="log statements slower than this")
+    parser.add_argument("--no-metrics", action="store_true", help="do not time operations")
+    parser.add_argument("--sql-metrics", action="store_true", help="also time every SQL statement and commit")
+    parser.add_argument("--no-velocity-limits", action="store_true", help="do not limit withdrawals and transfers per minute / hour / day")
+    options = parser.parse_args(arguments)
+
+    configure_metrics(enabled=not options.no_metrics, sql_timing=options.sql_metrics,
+                      slow_query_seconds=options.slow_query_ms / 1000 if options.slow_query_ms is not None else None)
+    configure_velocity_limits(None if options.no_velocity_limits else DEFAULT_VELOCITY_LIMITS)
+    use_database(options.db)
+    configure_password_hashing(scrypt_n=options.scrypt_n, workers=options.hash_workers)
+    BankAdmin()     # Make sure the default admin exists
+    velocity.rebuild()
+    import asyncio
+    try:
+        asyncio.run(serve(options.host, options.port, options.workers))
+    except KeyboardInterrupt:
+        print("Bank service stopped.")
+
+
+
 # ---------------------------------------------------------------------------------------------------------------------------------------------------------
 # ------------------------------------------------------------ Main Application ---------------------------------------------------------------------------
 # ---------------------------------------------------------------------------------------------------------------------------------------------------------
 # ----------------------------------------------- Interface ------------------------------------------------
+@instrumented("create_account")
 def Insert_Client_Account(new_account):
     if not new_account: # Handle cases where account creation failed
         print("Error: Account object is None, cannot insert into DB.")
         return
 
-    cr.execute("""INSERT INTO 'Client Account' (Name, Nationality, Gender, 'Phone Number', 'Document Submit', 'Account Type', Balance, Password, 'Bank Account Number', Time)
-                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                    """, (
-                        new_account.name,
-                        new_account.nationality,
-                        new_account.gender,
-                        new_account.phone_number,
-                        new_account._document_submit,
-                        new_account.account_type,
-                        new_account.get_balance(),
-                        new_account.get_password(),
-                        new_account.bank_account_number,
-                        datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S") # Format time correctly
-                    ))
-    db.commit()
+    if not PasswordHasher.is_hash(new_account.get_password()):
+        new_account.set_clientPassword(PasswordHasher.hash(new_account.get_password()))
+
+    repository.insert_account((
+        new_account.name,
+        new_account.nationality,
+        new_account.gender,
+        new_account.phone_number,
+        new_account._document_submit,
+        new_account.account_type,
+        new_account.get_balance(),
+        new_account.get_password(),
+        new_account.bank_account_number,
+        datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S") # Format time correctly
+    ))
     
     # Fetching the account that was just created...
     # We can fetch directly using the bank_account_number which is known
-    cr.execute("""SELECT Name, Gender, Nationality, "Phone Number", "Account Type", "Bank Account Number", Balance, Time FROM 'Client Account' WHERE "Bank Account Number" = ?""", (new_account.bank_account_number,))
-    last_account_created = cr.fetchone()
+    last_account_created = repository.account_summary(new_account.bank_account_number)
     
     print("Client Information Summary".center(50, "-"))
     
@@ -425,211 +3951,486 @@ def Insert_Client_Account(new_account):
         ]
         # Iterate and print all details, do not return inside the loop
         for col_name, value in zip(columns, last_account_created):
-            print(f"{col_name}: {value}")
+            print(f"{col_name}: {display_value(col_name, value)}")
     else:
         print("Error: Could not retrieve the created account from the database.")
 
 
-def Check_Account_Balance(login_clientAccountNum):
-    
-    
-    cr.execute("""SELECT "Account Type", Balance FROM 'Client Account' WHERE "Bank Account Number" = ?""", (login_clientAccountNum,))
-    balance_data = cr.fetchone()
+def Check_Account_Balance(account):
+    # The session keeps the account's balance current, so no query is needed here
+    balance_data = (account.account_type, account.get_balance()) if account else None
     
     print("Client Information Balance".center(50, "-"))
     
     if balance_data:
         column = ['Account Type', 'Balance']
         for col_name, value in zip(column, balance_data):
-            print(f"{col_name}: {value}")
+            print(f"{col_name}: {display_value(col_name, value)}")
     else: 
         print("❌ Account Number not found.")
 # ------------------------------------------------------------------------------------
 
-# Create a single BankAdmin instance when the script starts
-bank_admin = BankAdmin('admin', '123') 
+def main():
+    while True :
 
-while True :
-    
-    # Displaying the welcome message and options
-    print(" Welcome to Bank System ".center(50,'='))
-    print("""Choose your portal : 
-            1. Bank Admin
-            2. Client Account
-            3. Close Application
-            """)
-    portal = int(input("Enter your portal choice (1, 2 or 3): "))
-    
-    if portal == 1 : # Admin portal
-        cr.execute('SELECT "Username", "Password" FROM "Admin"')
-        admin_fetch = cr.fetchall()
-        
-        # admin_authenticated = False
-        # for _ in range(3): # Give admin 3 tries to login
-        print("Admin Login".center(50, "-"))
-        while True:
-            adminUsername = input('Username : ')
-            adminPassword = input('Password : ')
-            
-            
-            for admin_row in admin_fetch:
-                if admin_row[0] == adminUsername and admin_row[1] == adminPassword:
-                    # admin_authenticated = True
+        # Displaying the welcome message and options
+        print(" Welcome to Bank System ".center(50,'='))
+        print("""Choose your portal : 
+                1. Bank Admin
+                2. Client Account
+                3. Close Application
+                """)
+        portal = int(input("Enter your portal choice (1, 2 or 3): "))
+
+        if portal == 1 : # Admin portal
+            # The database is first opened here (or by the client portal), not at start-up
+            bank_admin = BankAdmin('admin', '123')
+            # admin_authenticated = False
+            # for _ in range(3): # Give admin 3 tries to login
+            print("Admin Login".center(50, "-"))
+            while True:
+                adminUsername = input('Username : ')
+                adminPassword = input('Password : ')
+
+
+                # Checked against the stored password hash of that one admin
+                if repository.check_admin(adminUsername, adminPassword):
                     print("✅ Username and Password are correct")
                     break      # If input match, break the loop
-                
-            
-                
-            else:      # If no match found, print error message
-                print("❌ Wrong username or password, please try again")
-                continue # Go back to the admin login prompt
-            break   # Exit the while loop after one attempt
-        
-        print("Welcome to Admin Portal".center(50, "-"))
-        
-        while True:
-            print("""\nAdmin Menu:
-                        1. Create Bank Account
-                        2. Delete Bank Account
-                        3. Check Account summary
-                        4. Exit (Logout)""")
-            admin_action = int(input("Select your option : "))
-            
-            if admin_action == 1:
-                # Create the client account using the bank_admin instance
-                new_client_account = bank_admin.createClientAccount()
-                if new_client_account:
-                    Insert_Client_Account(new_client_account) 
-                else:
-                    print("❌ Account creation failed. Please check input details.")
-            
-            elif admin_action == 2:
-                print("Delete Client Account".center(50,'='))
-                dele_clientName = input("Client Name: ").title()
-                dele_clientAccount = int(input("Account Number: "))
-                bank_admin.Delete_Client_Account(dele_clientName, dele_clientAccount)
-            
-            elif admin_action == 3:
-                print("Check Account Summary".center(50,'='))
-                client_name_summary = input("The client name: ").title()
-                bank_number_summary = int(input("Enter Bank Account Number: "))
-                bank_admin.checkAccountSummary(client_name_summary, bank_number_summary)
-            
-            elif admin_action == 4:
-                print("Logging out from Admin Portal.")
-                break # Exit admin menu loop
-            else:     # Invalid option
-                print("Invalid option. Please try again.")
-    # -----------------------------------------------
-    # ---------------- Client portal ----------------
-    elif portal == 2 : 
-        print("Client Login".center(50, "-"))
-        cr.execute("SELECT `Bank Account Number`, Password FROM `Client Account`")
-        dataLogin_fetch = cr.fetchall()
-        # print(dataLogin_fetch)  # Debugging line to see fetched login data
-        
-        
-        login_clientAccountNum = int(input("Account Number : "))
-        login_clientPass = input("Password : ")
-        logged_in_client_account = ClientAccount.load_account_from_db(login_clientAccountNum)   # Load the account object from the database and client account type
-        print(logged_in_client_account)
-            
-            # Load the account object if credentials match
-        for dataLog_row in dataLogin_fetch:
-            if dataLog_row[0] == login_clientAccountNum and dataLog_row[1] == login_clientPass:
-                
-                # If the account is found, break the loop
-                if logged_in_client_account:
-                    print(f"Welcome {logged_in_client_account.name}".center(50, "*"))
-                    break # Exit the inner for loop
-            
-            
-        else:
-            print("❌ Wrong Account Number or Password, please try again")
-        
-        
-        while True:
-            print("Client Menu".center(50, "-"))
-            print("""
-                    1. Check Balance
-                    2. Deposit Money
-                    3. Withdraw Money
-                    4. Transfer Money
-                    5. Interest Application (Saving Account Only)
-                    6. Transaction History
-                    7. Exit (Logout)
-                    """)
-            
-            try:
-                client_action = int(input("Select your option : "))
-            except ValueError:      # Handle non-integer input
-                print("Invalid input. Please enter a number between 1 and 7.")   # This will catch any non-integer input
-                continue
-            if client_action == 1:
-                Check_Account_Balance(login_clientAccountNum)
-            
-            elif client_action == 2:
-                try:
-                    amount = float(input("Enter amount to deposit: "))
-                    logged_in_client_account.deposit(amount)
-                except ValueError:  # ValueError: if the input is not a valid float
-                    print("Invalid amount. Please enter a number.")
-            
-            elif client_action == 3:
-                try:
-                    amount = float(input("Enter amount to withdraw: "))
-                    logged_in_client_account.withdraw(amount)
-                except ValueError:
-                    print("Invalid amount. Please enter a number.")
-            
-            elif client_action == 4:
+                else:      # If no match found, print error message
+                    print("❌ Wrong username or password, please try again")
+                    continue # Go back to the admin login prompt
+
+            print("Welcome to Admin Portal".center(50, "-"))
+
+            while True:
+                print("""\nAdmin Menu:
+                            1. Create Bank Account
+                            2. Close Bank Account
+                            3. Check Account summary
+                            4. Post Batch File (CSV/JSONL)
+                            5. Month-End Interest Run (All Saving Accounts)
+                            6. Reconcile Balances With The Ledger
+                            7. Book-Wide Reports
+                            8. Verify The Ledger Hash Chain
+                            9. Search Accounts (Name, Phone or Nationality)
+                            10. Exit (Logout)""")
+                admin_action = int(input("Select your option : "))
+
+                if admin_action == 1:
+                    # Create the client account using the bank_admin instance
+                    new_client_account = bank_admin.createClientAccount()
+                    if new_client_account:
+                        Insert_Client_Account(new_client_account) 
+                    else:
+                        print("❌ Account creation failed. Please check input details.")
+
+                elif admin_action == 2:
+                    print("Close Client Account".center(50,'='))
+                    dele_clientName = input("Client Name: ").title()
+                    dele_clientAccount = int(input("Account Number: "))
+                    bank_admin.Delete_Client_Account(dele_clientName, dele_clientAccount)
+
+                elif admin_action == 3:
+                    print("Check Account Summary".center(50,'='))
+                    client_name_summary = input("The client name: ").title()
+                    bank_number_summary = int(input("Enter Bank Account Number: "))
+                    bank_admin.checkAccountSummary(client_name_summary, bank_number_summary)
+
+                elif admin_action == 4:
+                    print("Post Batch File".center(50,'='))
+                    batch_path = input("File path (.csv or .jsonl): ").strip()
+                    try:
+                        result = ingest_operations(batch_path)
+                        print(f"✅ {result['applied']} operations posted, {result['rejected']} rejected (see {result['reject_file']})")
+                    except OSError as error:
+                        print(f"❌ Could not read the batch file: {error}")
+
+                elif admin_action == 5:
+                    print("Month-End Interest Run".center(50,'='))
+                    period = input("Period (YYYY-MM, empty for this month): ").strip()
+                    try:
+                        result = run_interest(period or None)
+                    except BankError as error:
+                        print(f"❌ {error}")
+                        continue
+                    if result["status"] == "already applied":
+                        print(f"⚠️ Interest for {result['period']} was already applied to {result['accounts']} accounts.")
+                    else:
+                        print(f"✅ Interest for {result['period']} applied to {result['accounts']} Saving accounts.")
+
+                elif admin_action == 6:
+                    print("Ledger Reconciliation".center(50,'='))
+                    print_reconciliation(reconcile_ledger())
+
+                elif admin_action == 7:
+                    print("Book-Wide Reports".center(50,'='))
+                    store = ColumnStore()
+                    print(f"✅ {store.export()} new ledger rows exported")
+                    print_reports(store)
+
+                elif admin_action == 8:
+                    print("Verify The Ledger".center(50,'='))
+                    print_verification(verify_ledger())
+
+                elif admin_action == 9:
+                    print("Search Accounts".center(50,'='))
+                    search_text = input("Start of a name, phone number or nationality: ")
+                    print_search_results(search_accounts(search_text, limit=50)[0])
+
+                elif admin_action == 10:
+                    print("Logging out from Admin Portal.")
+                    break # Exit admin menu loop
+                else:     # Invalid option
+                    print("Invalid option. Please try again.")
+        # -----------------------------------------------
+        # ---------------- Client portal ----------------
+        elif portal == 2 : 
+            print("Client Login".center(50, "-"))
+
+            login_clientAccountNum = int(input("Account Number : "))
+            login_clientPass = input("Password : ")
+            # Opens a session holding the loaded account only if the credentials match
+            client_session = sessions.login(login_clientAccountNum, login_clientPass)
+
+            if client_session:
+                print(f"Welcome {client_session.account.name}".center(50, "*"))
+            else:
+                print("❌ Wrong Account Number or Password, please try again")
+                continue # Back to the portal choice
+
+
+            while True:
+                print("Client Menu".center(50, "-"))
+                print("""
+                        1. Check Balance
+                        2. Deposit Money
+                        3. Withdraw Money
+                        4. Transfer Money
+                        5. Interest Application (Saving Account Only)
+                        6. Transaction History
+                        7. Exit (Logout)
+                        """)
+
                 try:
-                    transfer_to_accNum = int(input("Enter the account number you want to transfer to: "))
-                    transfer_amount = float(input("Enter amount to transfer: "))
-                    
-                    receiver_account = ClientAccount.load_account_from_db(transfer_to_accNum)  # 
-                    
-                    if receiver_account:
-                        logged_in_client_account.transfer(receiver_account, transfer_amount)
+                    client_action = int(input("Select your option : "))
+                except ValueError:      # Handle non-integer input
+                    print("Invalid input. Please enter a number between 1 and 7.")   # This will catch any non-integer input
+                    continue
+
+                # Every action works on the session's account; an expired session logs the client out
+                logged_in_client_account = sessions.account(client_session.token)
+                if logged_in_client_account is None:
+                    print("⚠️ Your session has expired, please log in again.")
+                    break
+
+                if client_action == 1:
+                    Check_Account_Balance(logged_in_client_account)
+
+                elif client_action == 2:
+                    try:
+                        amount = to_minor(input("Enter amount to deposit: "))
+                        logged_in_client_account.deposit(amount)
+                    except ValueError:  # ValueError: if the input is not a valid amount
+                        print("Invalid amount. Please enter a number.")
+
+                elif client_action == 3:
+                    try:
+                        amount = to_minor(input("Enter amount to withdraw: "))
+                        logged_in_client_account.withdraw(amount)
+                    except ValueError:
+                        print("Invalid amount. Please enter a number.")
+
+                elif client_action == 4:
+                    try:
+                        transfer_to_accNum = int(input("Enter the account number you want to transfer to: "))
+                        transfer_amount = to_minor(input("Enter amount to transfer: "))
+
+                        receiver_account = ClientAccount.load_account_from_db(transfer_to_accNum)  # 
+
+                        if receiver_account:
+                            logged_in_client_account.transfer(receiver_account, transfer_amount)
+                        else:
+                            print("⚠️ The receiver account not found.")
+                    except ValueError:
+                        print("Invalid input. Please enter numbers for account number and amount.")
+
+                # Check if the client action is for interest application
+                elif client_action == 5:
+                    if isinstance(logged_in_client_account, SavingAccount):
+                        logged_in_client_account.apply_interest()
                     else:
-                        print("⚠️ The receiver account not found.")
-                except ValueError:
-                    print("Invalid input. Please enter numbers for account number and amount.")
-            
-            # Check if the client action is for interest application
-            elif client_action == 5:
-                if isinstance(logged_in_client_account, SavingAccount):
-                    logged_in_client_account.apply_interest()
-                else:
-                    print("❌ Interest application is only available for Saving Accounts.")
-            
-            
-            
-            elif client_action == 6:
-                print("Transaction History".center(50, "-"))
-                cr.execute("""SELECT * FROM "Account Transactions" WHERE "Bank Account Number" = ?""", (logged_in_client_account.bank_account_number,))
-                account_transactions = cr.fetchall()
-                
-                if account_transactions:
-                    # Define column names for better readability
-                    transaction_columns = ['Name', 'Bank Account Number', 'Transaction Type', 'Amount', 'Balance After', 'Timestamp']
-                    for transaction_row in account_transactions:
+                        print("❌ Interest application is only available for Saving Accounts.")
+
+
+
+                elif client_action == 6:
+                    print("Transaction History".center(50, "-"))
+                    history_from = input("From date (YYYY-MM-DD, empty for all): ").strip()
+                    history_to = input("To date (YYYY-MM-DD, empty for all): ").strip()
+
+                    # Rows are fetched page by page as they are printed, never all at once
+                    shown = 0
+                    for transaction_row in iter_history(logged_in_client_account.bank_account_number, history_from, history_to, page_size=10):
+                        if shown and shown % 10 == 0 and input("Show more? (y/n): ").strip().lower() != "y":
+                            break
                         print("-" * 30) # Separator for each transaction
-                        for col_name, value in zip(transaction_columns, transaction_row):
-                            print(f"{col_name}: {value}")
+                        for col_name, value in zip(TRANSACTION_COLUMNS, transaction_row):
+                            print(f"{col_name}: {display_value(col_name, value)}")
+                        shown += 1
+
+                    if not shown:
+                        print("No transactions found for this account.")
+
+                elif client_action == 7:
+                    print("Logging out from Client Portal.")
+                    sessions.close(client_session.token)
+                    break # Exit client menu loop
                 else:
-                    print("No transactions found for this account.")
-            
-            elif client_action == 7:
-                print("Logging out from Client Portal.")
-                break # Exit client menu loop
-            else:
-                print("Invalid option. Please try again.")
-    
-    elif portal == 3:
-        print("Closing application. Goodbye!")
-        db.close() # Close database connection before exiting
-        break # Exit main application loop
-    
-    else:
-        print("Invalid portal choice. Please enter 1, 2, or 3.")
\ No newline at end of file
+                    print("Invalid option. Please try again.")
+
+        elif portal == 3:
+            print("Closing application. Goodbye!")
+            pool.close_all() # Commit anything still pending and close the database connections
+            break # Exit main application loop
+
+        else:
+            print("Invalid portal choice. Please enter 1, 2, or 3.")
+
+
+# ------------------------- Command Line --------------------------------
+# One-shot commands for scripts and cron jobs, next to the interactive menu:
+#
+#   python Bank-System-Management.py balance 1234
+#   python Bank-System-Management.py deposit 1234 500.00 --json
+#   python Bank-System-Management.py transfer 1234 5678 250
+#
+# Like reconcile and archive they are operator commands: whoever may write the database
+# file may run them, no client password is asked. The database is opened when the command
+# runs, and its schema is only touched when it is older than this script. bank.py starts
+# them faster still: Python caches the compiled bytecode of a module it imports, but never
+# of the script it runs.
+def _command_parser(name, description):
+    parser = argparse.ArgumentParser(prog=f"Bank-System-Management.py {name}", description=description)
+    parser.add_argument("--db", default=DB_PATH, help="database file")
+    parser.add_argument("--json", action="store_true", help="print the result as JSON")
+    return parser
+
+
+def _amount(value):
+    # argparse type of the amount arguments: pounds, at most two decimals, above zero
+    try:
+        amount = to_minor(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid amount: {value!r}") from None
+    if amount <= 0:
+        raise argparse.ArgumentTypeError("the amount must be positive")
+    return amount
+
+
+def _run_command(options, action):
+    # action() returns (result for --json, message); a BankError ends the command with exit code 1
+    use_database(options.db)
+    try:
+        result, message = action()
+    except BankError as error:
+        print(json.dumps({"error": str(error)}) if options.json else f"❌ {error}")
+        sys.exit(1)
+    print(json.dumps(result) if options.json else message)
+
+
+def run_balance(arguments):
+    parser = _command_parser("balance", "Print the balance of an account")
+    parser.add_argument("account", type=int)
+    options = parser.parse_args(arguments)
+
+    def balance():
+        row = repository.account_balance(options.account)
+        if row is None:
+            raise BankError("Account Number not found.")
+        return ({"account": options.account, "account_type": row[0], "balance": format_money(row[1])},
+                f"{row[0]} Account {options.account}: {format_money(row[1])}")
+    _run_command(options, balance)
+
+
+def run_deposit(arguments):
+    parser = _command_parser("deposit", "Deposit money into an account")
+    parser.add_argument("account", type=int)
+    parser.add_argument("amount", type=_amount, help="pounds, e.g. 500.00")
+    options = parser.parse_args(arguments)
+
+    def deposit():
+        balance = deposit_funds(options.account, options.amount)
+        return {"account": options.account, "balance": format_money(balance)}, f"✅ Deposit successful. New balance: {format_money(balance)}"
+    _run_command(options, deposit)
+
+
+def run_transfer(arguments):
+    parser = _command_parser("transfer", "Move money between two accounts")
+    parser.add_argument("sender", type=int)
+    parser.add_argument("receiver", type=int)
+    parser.add_argument("amount", type=_amount, help="pounds, e.g. 250.00")
+    options = parser.parse_args(arguments)
+
+    def transfer():
+        sender_balance, receiver_balance = transfer_funds(options.sender, options.receiver, options.amount)
+        return ({"sender_balance": format_money(sender_balance), "receiver_balance": format_money(receiver_balance)},
+                f"✅ Transfer of {format_money(options.amount)} successful. New balance: {format_money(sender_balance)}")
+    _run_command(options, transfer)
+
+
+def run_history(arguments):
+    parser = _command_parser("history", "Print the transaction history of an account, oldest first")
+    parser.add_argument("account", type=int)
+    parser.add_argument("--since", help="first date (YYYY-MM-DD or a full timestamp)")
+    parser.add_argument("--until", help="last date (YYYY-MM-DD or a full timestamp)")
+    parser.add_argument("--type", action="append", dest="types", help="transaction type, can be repeated")
+    parser.add_argument("--limit", type=int, default=50, help="rows to print at most")
+    options = parser.parse_args(arguments)
+
+    def history():
+        if repository.account_balance(options.account) is None:
+            raise BankError("Account Number not found.")
+        rows = list(itertools.islice(iter_history(options.account, options.since, options.until, options.types,
+                                                  page_size=min(options.limit, 500)), options.limit))
+        transactions = [{column: display_value(column, value) for column, value in zip(TRANSACTION_COLUMNS, row)} for row in rows]
+        lines = [f"{t['Timestamp']}  {t['Transaction Type']:<17} {t['Amount']:>14}  balance {t['Balance After']}" for t in transactions]
+        return {"account": options.account, "transactions": transactions}, "\n".join(lines) or "No transactions."
+    _run_command(options, history)
+
+
+def run_create_account(arguments):
+    parser = _command_parser("create-account", "Open a Current or Saving account")
+    parser.add_argument("--name", required=True)
+    parser.add_argument("--nationality", required=True)
+    parser.add_argument("--gender", required=True)
+    parser.add_argument("--phone", required=True)
+    parser.add_argument("--document", required=True, help="document submitted")
+    parser.add_argument("--type", required=True, choices=["Current", "Saving"], type=str.capitalize)
+    parser.add_argument("--balance", required=True, type=_amount, help="initial balance in pounds")
+    parser.add_argument("--password", help="the client's password (asked for when left out)")
+    options = parser.parse_args(arguments)
+    if options.password is None:
+        import getpass
+        options.password = getpass.getpass("Password: ")
+
+    def create_account():
+        number = BankAdmin.open_account(options.name, options.nationality, options.gender, options.phone, options.document,
+                                        options.type, options.balance, options.password)
+        return {"account": number}, f"✅ {options.type} Account {number} opened."
+    _run_command(options, create_account)
+
+
+def run_interest_command(arguments):
+    parser = _command_parser("interest-run", "Credit month-end interest to every Saving account")
+    parser.add_argument("--period", help="month (YYYY-MM), default this month")
+    parser.add_argument("--rate", type=float, help=f"interest rate, default {SavingAccount.interest_rate}")
+    options = parser.parse_args(arguments)
+
+    def interest_run():
+        result = run_interest(options.period, options.rate)
+        if result["status"] == "already applied":
+            return result, f"Interest for {result['period']} was already applied to {result['accounts']} accounts."
+        return result, f"✅ Interest for {result['period']} applied to {result['accounts']} Saving accounts."
+    _run_command(options, interest_run)
+
+
+def run_search(arguments):
+    parser = _command_parser("search", "Find open accounts by the start of their name, phone number or nationality")
+    parser.add_argument("text", help='e.g. "ana le", 010123 or egy')
+    parser.add_argument("--field", choices=list(SEARCH_FIELDS), help="search only this field")
+    parser.add_argument("--limit", type=int, default=20, help="accounts to print at most")
+    options = parser.parse_args(arguments)
+
+    def search():
+        rows, _ = search_accounts(options.text, options.field, options.limit)
+        lines = [f"{number:>12}  {name:<28} {phone_number:<15} {nationality:<15} {account_type}"
+                 for number, name, phone_number, nationality, account_type in rows]
+        return {"accounts": [dict(zip(SEARCH_COLUMNS, row)) for row in rows]}, "\n".join(lines) or "No account matches."
+    _run_command(options, search)
+
+
+def run_standing_orders_command(arguments):
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument("--db", default=DB_PATH, help="database file")
+    common.add_argument("--json", action="store_true", help="print the result as JSON")
+    parser = argparse.ArgumentParser(prog="Bank-System-Management.py standing-orders", description="Recurring transfers")
+    actions = parser.add_subparsers(dest="action", required=True)
+    add = actions.add_parser("add", parents=[common], help="set up a standing order")
+    add.add_argument("sender", type=int)
+    add.add_argument("receiver", type=int)
+    add.add_argument("amount", type=_amount, help="pounds, e.g. 2500.00")
+    add.add_argument("--every", required=True, choices=STANDING_ORDER_FREQUENCIES)
+    add.add_argument("--start", help="first payment (YYYY-MM-DD or a full timestamp), default now")
+    add.add_argument("--installments", type=int, help="number of payments, default until cancelled")
+    cancel = actions.add_parser("cancel", parents=[common], help="cancel a standing order")
+    cancel.add_argument("order", type=int)
+    listing = actions.add_parser("list", parents=[common], help="the standing orders paid from an account")
+    listing.add_argument("account", type=int)
+    run = actions.add_parser("run", parents=[common], help="pay every order that is due")
+    run.add_argument("--watch", action="store_true", help="keep running, paying orders as they fall due")
+    options = parser.parse_args(arguments)
+
+    def standing_order_action():
+        if options.action == "add":
+            order = create_standing_order(options.sender, options.receiver, options.amount, options.every,
+                                          options.start, options.installments)
+            return {"order": order}, f"✅ Standing order {order}: {format_money(options.amount)} {options.every} to {options.receiver}."
+        if options.action == "cancel":
+            if not cancel_standing_order(options.order):
+                raise BankError("No active standing order with that Id.")
+            return {"order": options.order, "cancelled": True}, f"✅ Standing order {options.order} cancelled."
+        if options.action == "list":
+            orders = [{column: display_value(column, value) for column, value in zip(STANDING_ORDER_COLUMNS, row)}
+                      for row in standing_orders(options.account)]
+            lines = [f"{o['Id']:>8}  {o['Amount']:>12} {o['Frequency']:<8} to {o['To Account']}  next {o['Next Due']}  {o['Status']}"
+                     + (f" ({o['Last Error']})" if o["Last Error"] else "") for o in orders]
+            return {"account": options.account, "orders": orders}, "\n".join(lines) or "No standing orders."
+        scheduler = StandingOrderScheduler()
+        if options.watch:
+            print("✅ Paying standing orders as they fall due (Ctrl+C stops)")
+            try:
+                scheduler.watch()
+            except KeyboardInterrupt:
+                pass
+        totals = scheduler.run_due()
+        return totals, (f"✅ {totals['paid']} payments made, {totals['retrying']} waiting for a retry, {totals['skipped']} skipped, "
+                        f"{totals['cancelled']} orders cancelled, {totals['finished']} finished.")
+    _run_command(options, standing_order_action)
+
+
+COMMANDS = {
+    "balance": (run_balance, "print the balance of an account"),
+    "deposit": (run_deposit, "deposit money into an account"),
+    "transfer": (run_transfer, "move money between two accounts"),
+    "history": (run_history, "print the transaction history of an account"),
+    "create-account": (run_create_account, "open a Current or Saving account"),
+    "search": (run_search, "find accounts by name, phone number or nationality"),
+    "interest-run": (run_interest_command, "credit month-end interest to every Saving account"),
+    "standing-orders": (run_standing_orders_command, "set up, list, cancel and pay recurring transfers"),
+    "serve": (run_server, "serve the bank over JSON-lines TCP"),
+    "reconcile": (run_reconciliation, "check every balance against the ledger"),
+    "archive": (run_archive, "move closed months of the ledger to read-only files"),
+    "report": (run_reports, "print the book-wide reports"),
+    "verify": (run_verification, "check the ledger's hash chain"),
+}
+
+
+# Runs a command, or the interactive menu when there is none
+def cli(arguments):
+    configure_velocity_limits(DEFAULT_VELOCITY_LIMITS)
+    if not arguments:
+        main()
+        return
+    command = COMMANDS.get(arguments[0])
+    if command is None:
+        print("usage: Bank-System-Management.py [command] [options]   (no command opens the menu)\n\ncommands:")
+        for name, (_, description) in COMMANDS.items():
+            print(f"  {name:<17} {description}")
+        print("\n'<command> --help' describes a command's options.")
+        sys.exit(0 if arguments[0] in ("-h", "--help") else 2)
+    command[0](arguments[1:])
+
+
+if __name__ == "__main__":
+    cli(sys.argv[1:])
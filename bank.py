@@ -0,0 +1,18 @@
+# ------------------------- Fast command line entry point --------------------------------
+# The same commands as "python Bank-System-Management.py ...", started faster. Python never
+# caches the compiled bytecode of the script it runs, only of the modules it imports, so
+# this loads the application as a module: it is compiled once, then read from __pycache__.
+#
+#   python bank.py balance 1234
+#   python bank.py deposit 1234 500.00
+import importlib.util
+import os
+import sys
+
+spec = importlib.util.spec_from_file_location("bank", os.path.join(os.path.dirname(os.path.abspath(__file__)), "Bank-System-Management.py"))
+bank = importlib.util.module_from_spec(spec)
+sys.modules["bank"] = bank          # So the worker pools can pickle its functions by name
+spec.loader.exec_module(bank)
+
+if __name__ == "__main__":
+    bank.cli(sys.argv[1:])
@@ -0,0 +1,65 @@
+# ------------------------- Benchmark helpers --------------------------------
+# The application lives in "Bank-System-Management.py", which is not an importable
+# module name, so the benchmarks load it from its path and point it at their own DB.
+import importlib.util
+import os
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+APP_PATH = os.path.join(ROOT, "Bank-System-Management.py")
+
+
+def load_bank(db_path):
+    # Importing the app has no DB side effects; point its connection pool at our file
+    spec = importlib.util.spec_from_file_location("bank", APP_PATH)
+    bank = importlib.util.module_from_spec(spec)
+    # Registered so its functions pickle by name for the app's process pools (forked workers inherit it)
+    sys.modules["bank"] = bank
+    spec.loader.exec_module(bank)
+    bank.use_database(db_path)
+    return bank
+
+
+def populate_accounts(connection, count, start=1, batch=50_000, account_type=None):
+    # Current and Saving accounts (or only account_type), numbered start .. start + count - 1,
+    # password "pw<number>", balance 10,000.00 pounds (amounts are in piastres)
+    now = time.strftime("%Y-%m-%d %H:%M:%S")
+    for first in range(start, start + count, batch):
+        last = min(first + batch, start + count)
+        connection.executemany(
+            """INSERT INTO 'Client Account' (Name, Nationality, Gender, 'Phone Number', 'Document Submit',
+                   'Account Type', Balance, Password, 'Bank Account Number', Time)
+               VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)""",
+            ((f"Client {n}", "Egyptian", "Male", "010%08d" % n, "Id Card",
+              account_type or ("Saving" if n % 3 == 0 else "Current"), 1_000_000, f"pw{n}", n, now)
+             for n in range(first, last)))
+    connection.commit()
+
+
+def populate_ledger(connection, accounts, rows_per_account, batch=50_000):
+    # A deposit history for accounts 1 .. accounts, spread over consecutive days
+    def rows():
+        for n in range(1, accounts + 1):
+            for day in range(rows_per_account):
+                yield (f"Client {n}", n, "Deposit", 10_000, 1_000_000 + 10_000 * (day + 1),
+                       "2025-%02d-%02d 12:00:00" % (day // 28 % 12 + 1, day % 28 + 1))
+
+    statement = """INSERT INTO 'Account Transactions' (Name, 'Bank Account Number', 'Transaction Type', Amount, Balance, History)
+                   VALUES (?, ?, ?, ?, ?, ?)"""
+    pending = []
+    for row in rows():
+        pending.append(row)
+        if len(pending) >= batch:
+            connection.executemany(statement, pending)
+            pending.clear()
+    connection.executemany(statement, pending)
+    connection.commit()
+
+
+def timed(function, repeat):
+    # Average wall time of one call, in microseconds
+    started = time.perf_counter()
+    for _ in range(repeat):
+        function()
+    return (time.perf_counter() - started) / repeat * 1e6
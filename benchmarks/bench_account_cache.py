@@ -0,0 +1,53 @@
+# ------------------------- Account cache benchmark --------------------------------
+# Transfer receivers in real traffic are skewed: a few merchant accounts receive most
+# payments. This draws receivers from a Zipf distribution and times
+# ClientAccount.load_account_from_db() with the LRU account cache on and off.
+#
+#   python benchmarks/bench_account_cache.py --accounts 100000 --lookups 200000 --skew 1.1
+import argparse
+import itertools
+import os
+import random
+import tempfile
+import time
+
+from _bank import load_bank, populate_accounts
+
+
+def zipf_receivers(accounts, lookups, skew, seed=3):
+    # Account k is picked with probability proportional to 1 / k^skew
+    cumulative = list(itertools.accumulate(1 / rank ** skew for rank in range(1, accounts + 1)))
+    rng = random.Random(seed)
+    return rng.choices(range(1, accounts + 1), cum_weights=cumulative, k=lookups)
+
+
+def run(bank, receivers, capacity):
+    bank.account_cache = bank.AccountCache(capacity)
+    started = time.perf_counter()
+    for number in receivers:
+        bank.ClientAccount.load_account_from_db(number)
+    elapsed = time.perf_counter() - started
+    return len(receivers) / elapsed, bank.account_cache.stats()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Zipfian receiver lookups with and without the account cache")
+    parser.add_argument("--accounts", type=int, default=100_000)
+    parser.add_argument("--lookups", type=int, default=200_000)
+    parser.add_argument("--skew", type=float, default=1.1, help="Zipf exponent")
+    parser.add_argument("--capacity", type=int, default=10_000)
+    args = parser.parse_args()
+
+    bank = load_bank(os.path.join(tempfile.mkdtemp(prefix="bank-cache-"), "bench.db"))
+    populate_accounts(bank.pool.connection(), args.accounts)
+    receivers = zipf_receivers(args.accounts, args.lookups, args.skew)
+
+    without_rate, _ = run(bank, receivers, 0)
+    with_rate, stats = run(bank, receivers, args.capacity)
+    print(f"without cache : {without_rate:>10.0f} lookups/sec")
+    print(f"with cache    : {with_rate:>10.0f} lookups/sec "
+          f"(hit rate {stats['hit_rate']:.1%}, {stats['evictions']} evictions, capacity {stats['capacity']})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+# ------------------------- Account number allocation benchmark --------------------------------
+# Opens --accounts accounts (1M by default) with BankAdmin.bulk_open_accounts(), allocates
+# numbers one by one from several threads at once, and checks that every number is unique
+# and carries a valid check digit. For comparison it counts how many collisions the old
+# random 4-digit scheme produces for the same number of accounts.
+#
+#   python benchmarks/bench_account_numbers.py --accounts 1000000 --threads 8
+import argparse
+import os
+import random
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from _bank import load_bank
+
+
+def account_rows(count, password_hash):
+    # One hash made up front: hashing a million passwords would be the whole benchmark
+    for n in range(count):
+        yield (f"client {n}", "egyptian", "male", "010%08d" % n, "id card",
+               "Saving" if n % 3 == 0 else "Current", 1_000_000, password_hash)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Bulk account opening and concurrent account number allocation")
+    parser.add_argument("--accounts", type=int, default=1_000_000)
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--allocations", type=int, default=100_000, help="single allocations per run")
+    args = parser.parse_args()
+
+    bank = load_bank(os.path.join(tempfile.mkdtemp(prefix="bank-numbers-"), "bench.db"))
+
+    started = time.perf_counter()
+    numbers, rejected = bank.BankAdmin.bulk_open_accounts(account_rows(args.accounts, bank.PasswordHasher.hash("pw")))
+    elapsed = time.perf_counter() - started
+    print(f"bulk open        : {len(numbers) - len(rejected)} accounts in {elapsed:.2f} s ({args.accounts / elapsed:.0f} accounts/sec)")
+
+    per_thread = args.allocations // args.threads
+    with ThreadPoolExecutor(args.threads) as executor:
+        started = time.perf_counter()
+        batches = list(executor.map(lambda _: [bank.new_account_number() for _ in range(per_thread)], range(args.threads)))
+        elapsed = time.perf_counter() - started
+    allocated = [number for batch in batches for number in batch]
+    print(f"allocate()       : {len(allocated) / elapsed:.0f} numbers/sec across {args.threads} threads")
+
+    everything = numbers + allocated
+    assert len(set(everything)) == len(everything), "duplicate account number"
+    assert all(bank.is_valid_account_number(number) for number in everything), "bad check digit"
+    stored = bank.pool.connection().execute('SELECT COUNT(DISTINCT "Bank Account Number") FROM "Client Account"').fetchone()[0]
+    assert stored == args.accounts
+    print("✅ All numbers unique with valid check digits")
+
+    old_numbers = [random.randrange(1000, 9999) for _ in range(args.accounts)]
+    print(f"old random scheme: {len(old_numbers) - len(set(old_numbers))} collisions for the same {args.accounts} accounts")
+
+
+if __name__ == "__main__":
+    main()
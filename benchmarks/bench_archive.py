@@ -0,0 +1,170 @@
+# ------------------------- Ledger archive benchmark --------------------------------
+# Builds a ledger of --rows rows (100M by default) spread over the --months months before
+# this one, then measures ledger insert rate and history latency before and after
+# archive_ledger() moves the closed months out of the hot table:
+#   inserts/sec  - deposits to random accounts (ledger row + balance), 1000 per commit
+#   this month   - first page of an account's history since the 1st of this month
+#   old month    - first page of one closed month (opens one archive file after archiving)
+#   everything   - first page of the whole history
+# Then, on a small separate book, it archives every row (nothing written this month yet),
+# posts again and checks that the new rows are numbered after the archived ones:
+# reconciliation and the column export pick them up, and history pages have no repeats.
+#
+#   python benchmarks/bench_archive.py --rows 100000000 --accounts 1000000 --months 24
+#   python benchmarks/bench_archive.py --check-only
+import argparse
+import datetime
+import os
+import random
+import tempfile
+import time
+
+from _bank import load_bank, populate_accounts, timed
+
+
+def closed_periods(months):
+    year, month = datetime.date.today().year, datetime.date.today().month
+    periods = []
+    for _ in range(months):
+        year, month = (year, month - 1) if month > 1 else (year - 1, 12)
+        periods.append(f"{year:04d}-{month:02d}")
+    return periods[::-1]
+
+
+def build_ledger(connection, bank, accounts, periods, rows_per_month, balances, batch=100_000):
+    # Written month by month, in time order like the application writes it
+    pending = []
+    for period in periods:
+        for k in range(rows_per_month):
+            history = f"{period}-{1 + k * 27 // rows_per_month:02d} 12:00:00"
+            for n in range(1, accounts + 1):
+                balances[n] += 10_000
+                pending.append((f"Client {n}", n, "Deposit", 10_000, balances[n], history))
+                if len(pending) >= batch:
+                    bank.append_ledger(connection, pending)
+                    pending.clear()
+    bank.append_ledger(connection, pending)
+    connection.executemany('UPDATE "Client Account" SET Balance = ? WHERE "Bank Account Number" = ?',
+                           ((balance, n) for n, balance in enumerate(balances) if n))
+    connection.commit()
+
+
+def insert_rate(connection, bank, accounts, balances, inserts, rng):
+    started = time.perf_counter()
+    for _ in range(0, inserts, 1000):
+        history = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        ledger, updates = [], []
+        for n in (rng.randint(1, accounts) for _ in range(1000)):
+            balances[n] += 100
+            ledger.append((f"Client {n}", n, "Deposit", 100, balances[n], history))
+            updates.append((balances[n], n))
+        bank.append_ledger(connection, ledger)
+        connection.executemany('UPDATE "Client Account" SET Balance = ? WHERE "Bank Account Number" = ?', updates)
+        connection.commit()
+    return inserts // 1000 * 1000 / (time.perf_counter() - started)
+
+
+def measure(label, bank, args, balances, old_period):
+    rng = random.Random(label)
+    connection = bank.pool.connection()
+    rate = insert_rate(connection, bank, args.accounts, balances, args.inserts, rng)
+    this_month = datetime.date.today().strftime("%Y-%m-01")
+
+    def page(since=None, until=None):
+        return lambda: bank.repository.transactions_page(rng.randint(1, args.accounts), limit=20, since=since, until=until)
+
+    recent_us = timed(page(this_month), args.queries)
+    old_us = timed(page(f"{old_period}-01", f"{old_period}-28"), args.queries)
+    all_us = timed(page(), args.queries)
+    print(f"{label:>8} {rate:>12.0f} {recent_us:>14.1f} {old_us:>14.1f} {all_us:>14.1f}")
+
+
+def check_full_archive(accounts=100, months=3, deposits=500):
+    work_dir = tempfile.mkdtemp(prefix="bank-archive-all-")
+    bank = load_bank(os.path.join(work_dir, "bench.db"))
+    connection = bank.pool.connection()
+    balances = [0] + [1_000_000] * accounts
+    populate_accounts(connection, accounts)
+    build_ledger(connection, bank, accounts, closed_periods(months), 5, balances)
+    archived_rows = connection.execute('SELECT COUNT(*) FROM "Account Transactions"').fetchone()[0]
+    last_archived = connection.execute('SELECT MAX(rowid) FROM "Account Transactions"').fetchone()[0]
+    store = bank.ColumnStore(os.path.join(work_dir, "columns"))
+    store.export()
+
+    result = bank.archive_ledger()
+    assert not result["mismatches"], result["mismatches"][:5]
+    assert connection.execute('SELECT COUNT(*) FROM "Account Transactions"').fetchone()[0] == 0, "rows left in the hot table"
+
+    rng = random.Random(5)
+    posted = [0] * (accounts + 1)
+    for _ in range(deposits):
+        number = rng.randint(1, accounts)
+        bank.deposit_funds(number, 100)
+        posted[number] += 1
+    first_new = connection.execute('SELECT MIN(rowid) FROM "Account Transactions"').fetchone()[0]
+    assert first_new > last_archived, f"new ledger rows reuse archived rowids ({first_new} <= {last_archived})"
+
+    reconciliation = bank.reconcile_ledger()
+    assert not reconciliation["mismatches"], reconciliation["mismatches"][:5]
+    assert store.export() == deposits, "the column export missed rows posted after archiving"
+    assert store.state["rows"] == archived_rows + deposits
+
+    # Small pages, so cursors cross from the archive files into the hot table
+    number = max(range(1, accounts + 1), key=posted.__getitem__)
+    seen, cursor = 0, None
+    while True:
+        rows, cursor = bank.repository.transactions_page(number, after=cursor, limit=7)
+        seen += len(rows)
+        if cursor is None:
+            break
+    assert seen == months * 5 + posted[number], f"history pages gave {seen} rows, not {months * 5 + posted[number]}"
+    bank.pool.close_all()
+    return archived_rows, deposits
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Ledger insert rate and history latency before and after archiving")
+    parser.add_argument("--rows", type=int, default=100_000_000)
+    parser.add_argument("--accounts", type=int, default=1_000_000)
+    parser.add_argument("--months", type=int, default=24)
+    parser.add_argument("--inserts", type=int, default=100_000)
+    parser.add_argument("--queries", type=int, default=500)
+    parser.add_argument("--compress", action="store_true", help="xz-compress the archive files")
+    parser.add_argument("--check-only", action="store_true", help="only the archive-everything check")
+    args = parser.parse_args()
+    if args.check_only:
+        archived, posted = check_full_archive()
+        print(f"✅ {archived} rows archived, {posted} posted after: numbered after the archive, reconciled and exported")
+        return
+
+    work_dir = tempfile.mkdtemp(prefix="bank-archive-")
+    bank = load_bank(os.path.join(work_dir, "bench.db"))
+    connection = bank.pool.connection()
+    periods = closed_periods(args.months)
+    balances = [0] + [1_000_000] * args.accounts
+    populate_accounts(connection, args.accounts)
+    started = time.perf_counter()
+    build_ledger(connection, bank, args.accounts, periods, max(1, args.rows // (args.accounts * args.months)), balances)
+    total = connection.execute('SELECT COUNT(*) FROM "Account Transactions"').fetchone()[0]
+    print(f"ledger: {total} rows over {args.months} months, built in {time.perf_counter() - started:.0f} s")
+
+    print(f"{'':>8} {'inserts/sec':>12} {'this month us':>14} {'old month us':>14} {'everything us':>14}")
+    measure("before", bank, args, balances, periods[len(periods) // 2])
+
+    started = time.perf_counter()
+    result = bank.archive_ledger(compress=args.compress)
+    elapsed = time.perf_counter() - started
+    assert not result["mismatches"], result["mismatches"][:5]
+    archived = sum(archive["rows"] for archive in result["archived"])
+    size = sum(os.path.getsize(archive["path"]) for archive in result["archived"])
+    print(f"archived {archived} rows into {len(result['archived'])} files ({size / 1e6:.0f} MB) in {elapsed:.0f} s")
+
+    measure("after", bank, args, balances, periods[len(periods) // 2])
+    assert not bank.reconcile_ledger()["mismatches"]
+    print("✅ History and balances intact after archiving")
+    archived, posted = check_full_archive()
+    print(f"✅ {archived} rows archived, {posted} posted after: numbered after the archive, reconciled and exported")
+
+
+if __name__ == "__main__":
+    main()
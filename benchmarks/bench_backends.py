@@ -0,0 +1,84 @@
+# ------------------------- Storage backend benchmark --------------------------------
+# Replays the same synthetic year of traffic (deposits, withdrawals, transfers, history
+# lookups and month-end interest, on a simulated clock) against both storage engines:
+#   sqlite - BankRepository on a temporary database file
+#   memory - MemoryBackend, dicts and an append-only ledger list
+# and reports operations/sec for each. Both must end with the same balances and the same
+# number of ledger rows and rejected operations.
+#
+#   python benchmarks/bench_backends.py --accounts 1000 --ops-per-day 200 --days 365
+import argparse
+import datetime
+import os
+import random
+import tempfile
+import time
+
+from _bank import load_bank
+
+
+def replay(bank, accounts, ops_per_day, days, seed=3):
+    rng = random.Random(seed)
+    day = datetime.datetime(2025, 1, 1, 9, 0, 0)
+    bank.repository.clock = lambda: day.strftime("%Y-%m-%d %H:%M:%S")
+    password_hash = bank.PasswordHasher.hash("pw")
+    numbers, _ = bank.BankAdmin.bulk_open_accounts(
+        (f"client {n}", "egyptian", "male", "010%08d" % n, "id card", "Saving" if n % 3 == 0 else "Current",
+         10_000 * bank.MINOR_UNITS, password_hash) for n in range(accounts))
+    savings = numbers[::3]
+    operations = rejected = 0
+
+    started = time.perf_counter()
+    for _ in range(days):
+        for _ in range(ops_per_day):
+            number = rng.choice(numbers)
+            kind = rng.random()
+            amount = rng.randint(1, 2_000) * bank.MINOR_UNITS
+            try:
+                if kind < 0.4:
+                    bank.deposit_funds(number, amount)
+                elif kind < 0.7:
+                    bank.withdraw_funds(number, amount)
+                elif kind < 0.9:
+                    bank.transfer_funds(number, rng.choice(numbers), amount)
+                else:
+                    bank.repository.transactions_page(number, limit=10)
+            except bank.BankError:
+                rejected += 1
+            operations += 1
+        day += datetime.timedelta(days=1)
+        if day.day == 1:        # Month end
+            for number in savings:
+                bank.credit_interest(number, 0.01)
+                operations += 1
+    elapsed = time.perf_counter() - started
+
+    balances = [row[6] for rows in bank.repository.iter_accounts() for row in rows]
+    ledger_rows = sum(len(bank.repository.transactions_page(number, limit=10 ** 9)[0]) for number in numbers)
+    return operations / elapsed, elapsed, balances, ledger_rows, rejected
+
+
+def main():
+    parser = argparse.ArgumentParser(description="The same year of traffic on the SQLite and in-memory engines")
+    parser.add_argument("--accounts", type=int, default=1_000)
+    parser.add_argument("--ops-per-day", type=int, default=200)
+    parser.add_argument("--days", type=int, default=365)
+    args = parser.parse_args()
+
+    results = {}
+    for engine in ("sqlite", "memory"):
+        bank = load_bank(os.path.join(tempfile.mkdtemp(prefix="bank-backends-"), "bench.db"))
+        bank.configure_password_hashing(scrypt_n=2 ** 4, pbkdf2_iterations=1)     # bench_password.py measures hashing
+        if engine == "memory":
+            bank.use_backend(bank.MemoryBackend())
+        rate, elapsed, *outcome = replay(bank, args.accounts, args.ops_per_day, args.days)
+        results[engine] = outcome
+        print(f"{engine:>7}: {elapsed:7.2f} s for {args.days} days, {rate:>9.0f} operations/sec")
+        bank.pool.close_all()
+
+    assert results["sqlite"] == results["memory"], "the engines disagree on the replayed year"
+    print(f"✅ Same balances, {results['memory'][1]} ledger rows and {results['memory'][2]} rejections on both engines")
+
+
+if __name__ == "__main__":
+    main()
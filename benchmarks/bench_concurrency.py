@@ -0,0 +1,62 @@
+# ------------------------- Mixed concurrency benchmark --------------------------------
+# Threads from a thread pool serve a mix of balance checks (read-only connections) and
+# deposits (read-write connections) through the per-thread connection pool. Reports
+# operations/sec for each thread count and checks that no deposit was lost.
+#
+#   python benchmarks/bench_concurrency.py --threads 1 2 4 8 16 --operations 20000
+import argparse
+import os
+import random
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from _bank import load_bank, populate_accounts
+
+
+def serve(bank, accounts, operations, read_ratio, seed):
+    rng = random.Random(seed)
+    deposited = 0
+    for _ in range(operations):
+        number = rng.randint(1, accounts)
+        if rng.random() < read_ratio:
+            bank.repository.account_balance(number)
+        else:
+            bank.deposit_funds(number, 100)
+            deposited += 100
+    return deposited
+
+
+def run(threads, accounts, operations, read_ratio):
+    bank = load_bank(os.path.join(tempfile.mkdtemp(prefix="bank-threads-"), "bench.db"))
+    populate_accounts(bank.pool.connection(), accounts)
+    total_before = bank.pool.connection().execute('SELECT SUM(Balance) FROM "Client Account"').fetchone()[0]
+
+    per_thread = operations // threads
+    with ThreadPoolExecutor(threads) as executor:
+        started = time.perf_counter()
+        futures = [executor.submit(serve, bank, accounts, per_thread, read_ratio, seed) for seed in range(threads)]
+        deposited = sum(future.result() for future in futures)
+        elapsed = time.perf_counter() - started
+
+    total_after = bank.pool.connection().execute('SELECT SUM(Balance) FROM "Client Account"').fetchone()[0]
+    assert total_after == total_before + deposited, "a deposit was lost"
+    bank.pool.close_all()
+    return per_thread * threads / elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Mixed balance-check / deposit traffic across threads")
+    parser.add_argument("--threads", type=int, nargs="+", default=[1, 2, 4, 8, 16])
+    parser.add_argument("--accounts", type=int, default=10_000)
+    parser.add_argument("--operations", type=int, default=20_000)
+    parser.add_argument("--read-ratio", type=float, default=0.8, help="share of balance checks")
+    args = parser.parse_args()
+
+    print(f"{'threads':>8} {'ops/sec':>10}")
+    for threads in args.threads:
+        print(f"{threads:>8} {run(threads, args.accounts, args.operations, args.read_ratio):>10.0f}")
+
+
+if __name__ == "__main__":
+    main()
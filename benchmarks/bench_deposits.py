@@ -0,0 +1,78 @@
+# ------------------------- Deposit throughput benchmark --------------------------------
+# Compares deposits/sec for:
+#   before       - the old write path: rollback journal, synchronous=FULL, one commit per statement
+#   unit-of-work - CurrentAccount.deposit() with WAL and one commit per operation
+#   group-commit - the same with UnitOfWork group commit enabled (--window seconds)
+#
+#   python benchmarks/bench_deposits.py --deposits 5000 --window 0.01
+import argparse
+import contextlib
+import datetime
+import io
+import os
+import tempfile
+import time
+
+from _bank import load_bank, populate_accounts
+
+
+def fresh_bank(accounts):
+    db_path = os.path.join(tempfile.mkdtemp(prefix="bank-bench-"), "bench.db")
+    bank = load_bank(db_path)
+    populate_accounts(bank.pool.connection(), accounts)
+    return bank
+
+
+def legacy_deposit(bank, account, amount):
+    # What CurrentAccount.deposit() did before the unit of work: commit the ledger row,
+    # then commit the balance update separately
+    connection = bank.pool.connection()
+    new_balance = account.get_balance() + amount
+    account.set_balance(new_balance)
+    connection.execute("""INSERT INTO 'Account Transactions' (Name, 'Bank Account Number', 'Transaction Type', Amount, Balance, History)
+                       VALUES (?, ?, ?, ?, ?, ?)""",
+                       (account.name, account.bank_account_number, "Deposit", amount, new_balance,
+                        datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")))
+    connection.commit()
+    connection.execute('UPDATE "Client Account" SET Balance = ? WHERE "Bank Account Number" = ?', (new_balance, account.bank_account_number))
+    connection.commit()
+
+
+def run(mode, deposits, accounts, window):
+    bank = fresh_bank(accounts)
+    if mode == "before":
+        bank.pool.connection().execute("PRAGMA journal_mode = DELETE")
+        bank.pool.connection().execute("PRAGMA synchronous = FULL")
+    elif mode == "group-commit":
+        bank.enable_group_commit(window)
+
+    loaded = [bank.ClientAccount.load_account_from_db(n) for n in range(1, accounts + 1)]
+    started = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):     # deposit() prints a receipt
+        for i in range(deposits):
+            account = loaded[i % accounts]
+            if mode == "before":
+                legacy_deposit(bank, account, 100)
+            else:
+                account.deposit(100)
+        bank.UnitOfWork.flush()
+    elapsed = time.perf_counter() - started
+    bank.disable_group_commit()
+    bank.pool.close_all()
+    return deposits / elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Deposits/sec before and after the unit of work")
+    parser.add_argument("--deposits", type=int, default=5_000)
+    parser.add_argument("--accounts", type=int, default=1_000)
+    parser.add_argument("--window", type=float, default=0.01, help="group commit window in seconds")
+    args = parser.parse_args()
+
+    for mode in ("before", "unit-of-work", "group-commit"):
+        rate = run(mode, args.deposits, args.accounts, args.window)
+        print(f"{mode:>14}: {rate:>10.0f} deposits/sec")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+# ------------------------- Transaction history benchmark --------------------------------
+# One account with a very long history (10M ledger rows by default). Measures the latency
+# and peak Python memory of the first page from iter_history() / transactions_page(),
+# a page deep into the history, a date-range page, and (with --compare) the old
+# fetch-everything query.
+#
+#   python benchmarks/bench_history.py --rows 10000000 --compare
+import argparse
+import datetime
+import itertools
+import os
+import tempfile
+import time
+import tracemalloc
+
+from _bank import load_bank, populate_accounts
+
+ACCOUNT = 1
+
+
+def populate_history(connection, rows, batch=100_000):
+    start = datetime.datetime(2015, 1, 1)
+    types = itertools.cycle(["Deposit", "Withdraw", "Transfer Sent", "Transfer Received", "Interest"])
+
+    def ledger():
+        for i in range(rows):
+            yield ("Client 1", ACCOUNT, next(types), 100, 10_000 + i,
+                   (start + datetime.timedelta(seconds=30 * i)).strftime("%Y-%m-%d %H:%M:%S"))
+
+    generator = ledger()
+    while True:
+        chunk = list(itertools.islice(generator, batch))
+        if not chunk:
+            break
+        connection.executemany("""INSERT INTO 'Account Transactions' (Name, 'Bank Account Number', 'Transaction Type', Amount, Balance, History)
+                                  VALUES (?, ?, ?, ?, ?, ?)""", chunk)
+    connection.commit()
+
+
+def measure(label, function):
+    tracemalloc.start()
+    started = time.perf_counter()
+    result = function()
+    elapsed = time.perf_counter() - started
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    print(f"{label:<28} {elapsed * 1000:>10.2f} ms {peak / 1e6:>10.2f} MB   ({result} rows)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="First-page latency and memory of the paginated history")
+    parser.add_argument("--rows", type=int, default=10_000_000)
+    parser.add_argument("--page-size", type=int, default=50)
+    parser.add_argument("--compare", action="store_true", help="also time the old fetchall() query")
+    args = parser.parse_args()
+
+    bank = load_bank(os.path.join(tempfile.mkdtemp(prefix="bank-history-"), "bench.db"))
+    populate_accounts(bank.pool.connection(), 1)
+    populate_history(bank.pool.connection(), args.rows)
+
+    print(f"{'query':<28} {'latency':>13} {'peak memory':>13}")
+    measure("first page (generator)", lambda: len(list(itertools.islice(bank.iter_history(ACCOUNT, page_size=args.page_size), args.page_size))))
+
+    # Walk a few thousand pages in, then time the next one
+    _, cursor = bank.repository.transactions_page(ACCOUNT, limit=min(args.rows // 2, 1_000_000))
+    measure("page deep in history", lambda: len(bank.repository.transactions_page(ACCOUNT, cursor, args.page_size)[0]))
+    measure("first page of date range", lambda: len(bank.repository.transactions_page(ACCOUNT, None, args.page_size, "2015-03-01", "2015-03-31")[0]))
+    measure("first page, 'Interest' only", lambda: len(bank.repository.transactions_page(ACCOUNT, None, args.page_size, types=["Interest"])[0]))
+    if args.compare:
+        connection = bank.pool.reader()
+        measure("old: fetchall() everything", lambda: len(connection.execute(
+            """SELECT * FROM "Account Transactions" WHERE "Bank Account Number" = ?""", (ACCOUNT,)).fetchall()))
+
+
+if __name__ == "__main__":
+    main()
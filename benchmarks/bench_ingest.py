@@ -0,0 +1,65 @@
+# ------------------------- Batch ingestion benchmark --------------------------------
+# Writes a synthetic deposit / withdraw / transfer file (CSV or JSONL), posts it with
+# ingest_operations() and reports rows/sec and the peak Python memory of the run,
+# which stays flat as the file grows because the file is streamed in chunks.
+#
+#   python benchmarks/bench_ingest.py --rows 1000000 --format jsonl
+import argparse
+import csv
+import json
+import os
+import random
+import tempfile
+import time
+import tracemalloc
+
+from _bank import load_bank, populate_accounts
+
+
+def write_batch_file(path, rows, accounts, file_format):
+    rng = random.Random(7)
+    with open(path, "w", newline="", encoding="utf-8") as batch_file:
+        writer = csv.writer(batch_file) if file_format == "csv" else None
+        if writer:
+            writer.writerow(["operation", "account", "amount", "to_account"])
+        for _ in range(rows):
+            operation = rng.choices(["deposit", "withdraw", "transfer"], [5, 3, 2])[0]
+            account = rng.randint(1, accounts + 10)     # A few unknown accounts end up in the reject file
+            to_account = rng.randint(1, accounts) if operation == "transfer" else ""
+            amount = rng.randint(1, 4_000)
+            if writer:
+                writer.writerow([operation, account, amount, to_account])
+            else:
+                batch_file.write(json.dumps({"operation": operation, "account": account, "amount": amount, "to_account": to_account}) + "\n")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Rows/sec of the batch ingestion pipeline")
+    parser.add_argument("--rows", type=int, default=200_000)
+    parser.add_argument("--accounts", type=int, default=10_000)
+    parser.add_argument("--chunk-size", type=int, default=10_000)
+    parser.add_argument("--format", choices=["csv", "jsonl"], default="csv")
+    args = parser.parse_args()
+
+    work_dir = tempfile.mkdtemp(prefix="bank-ingest-")
+    bank = load_bank(os.path.join(work_dir, "bench.db"))
+    populate_accounts(bank.pool.connection(), args.accounts)
+    batch_path = os.path.join(work_dir, f"batch.{args.format}")
+    write_batch_file(batch_path, args.rows, args.accounts, args.format)
+
+    tracemalloc.start()
+    started = time.perf_counter()
+    result = bank.ingest_operations(batch_path, chunk_size=args.chunk_size)
+    elapsed = time.perf_counter() - started
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    print(f"rows          : {args.rows}")
+    print(f"applied       : {result['applied']}")
+    print(f"rejected      : {result['rejected']}")
+    print(f"rows/sec      : {args.rows / elapsed:.0f}")
+    print(f"peak memory   : {peak / 1e6:.1f} MB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,45 @@
+# ------------------------- Month-end interest benchmark --------------------------------
+# Times run_interest() over a book of Saving accounts (1M by default), then runs the
+# same period again to show that a finished period is not paid twice.
+#
+#   python benchmarks/bench_interest.py --accounts 1000000
+import argparse
+import os
+import tempfile
+import time
+
+from _bank import load_bank, populate_accounts
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Bulk month-end interest run over all Saving accounts")
+    parser.add_argument("--accounts", type=int, default=1_000_000)
+    parser.add_argument("--chunk-size", type=int, default=50_000)
+    args = parser.parse_args()
+
+    bank = load_bank(os.path.join(tempfile.mkdtemp(prefix="bank-interest-"), "bench.db"))
+    populate_accounts(bank.pool.connection(), args.accounts, account_type="Saving")
+    total_before = bank.pool.connection().execute('SELECT SUM(Balance) FROM "Client Account"').fetchone()[0]
+
+    started = time.perf_counter()
+    result = bank.run_interest("2025-01", chunk_size=args.chunk_size)
+    elapsed = time.perf_counter() - started
+
+    rerun_started = time.perf_counter()
+    rerun = bank.run_interest("2025-01", chunk_size=args.chunk_size)
+    rerun_elapsed = time.perf_counter() - rerun_started
+
+    total_after = bank.pool.connection().execute('SELECT SUM(Balance) FROM "Client Account"').fetchone()[0]
+    ledger_rows, interest_paid = bank.pool.connection().execute("""SELECT COUNT(*), SUM(Amount) FROM "Account Transactions"
+        WHERE "Transaction Type" = 'Interest'""").fetchone()
+    assert ledger_rows == result["accounts"] == args.accounts
+    # Integer piastres: the books move by exactly the interest posted, rounded like interest_minor()
+    assert total_after == total_before + interest_paid == total_before + args.accounts * bank.interest_minor(1_000_000, bank.SavingAccount.interest_rate)
+
+    print(f"accounts          : {result['accounts']}")
+    print(f"run time          : {elapsed:.2f} s ({result['accounts'] / elapsed:.0f} accounts/sec)")
+    print(f"second run        : {rerun['status']} in {rerun_elapsed * 1000:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+# ------------------------- Login / history latency benchmark --------------------------------
+# Builds books of growing size and times ClientAccount.authenticate() and the per-account
+# transaction history query. With the schema-migration indexes both stay flat as the book grows;
+# --no-index drops them again to show the old full-scan behaviour.
+# Password hashing is turned down to a token cost so the numbers show the lookups;
+# bench_password.py measures the hashing itself.
+#
+#   python benchmarks/bench_login_history.py --sizes 10000 100000 1000000
+import argparse
+import os
+import random
+import tempfile
+
+from _bank import load_bank, populate_accounts, populate_ledger, timed
+
+
+def run(size, history_rows, lookups, with_index):
+    db_path = os.path.join(tempfile.mkdtemp(prefix="bank-bench-"), "bench.db")
+    bank = load_bank(db_path)
+    bank.configure_password_hashing(scrypt_n=2 ** 4, pbkdf2_iterations=1)
+    populate_accounts(bank.pool.connection(), size)
+    populate_ledger(bank.pool.connection(), size, history_rows)
+    if not with_index:
+        bank.pool.connection().execute("DROP INDEX idx_client_account_number")
+        bank.pool.connection().execute("DROP INDEX idx_transactions_account_history")
+        bank.pool.connection().commit()
+
+    picks = iter([random.randint(1, size) for _ in range(lookups * 2)])
+
+    def login():
+        number = next(picks)
+        assert bank.ClientAccount.authenticate(number, f"pw{number}") is not None
+
+    def history():
+        rows, _ = bank.repository.transactions_page(next(picks), limit=history_rows)
+        assert len(rows) == history_rows
+
+    login_us = timed(login, lookups)
+    history_us = timed(history, lookups)
+    bank.pool.close_all()
+    os.remove(db_path)
+    return login_us, history_us
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Login and history latency as the book grows")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    parser.add_argument("--history-rows", type=int, default=5, help="ledger rows per account")
+    parser.add_argument("--lookups", type=int, default=200)
+    parser.add_argument("--no-index", action="store_true", help="drop the indexes (old behaviour)")
+    args = parser.parse_args()
+
+    print(f"{'accounts':>10} {'login (us)':>12} {'history (us)':>14}")
+    for size in args.sizes:
+        login_us, history_us = run(size, args.history_rows, args.lookups, not args.no_index)
+        print(f"{size:>10} {login_us:>12.1f} {history_us:>14.1f}")
+
+
+if __name__ == "__main__":
+    main()
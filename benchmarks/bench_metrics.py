@@ -0,0 +1,85 @@
+# ------------------------- Metrics overhead benchmark --------------------------------
+# Cost of the metrics: deposits/sec and balance lookups/sec with
+#   off       - configure_metrics(enabled=False)
+#   on        - the default: every banking operation timed and counted, plain connections
+#   sql       - on, plus every statement and commit timed (sql_timing=True)
+#   slow-log  - sql, plus the sqlite3 trace callback of the slow query log
+# Each mode runs --rounds times on a fresh database and the best round counts. Afterwards
+# the registry must have counted exactly the deposits made, and its Prometheus dump must
+# hold consistent histograms. Last, threads that record and end must not grow the registry.
+#
+#   python benchmarks/bench_metrics.py --operations 20000
+import argparse
+import os
+import tempfile
+import threading
+import time
+
+from _bank import load_bank, populate_accounts
+
+
+def run(mode, operations, accounts):
+    bank = load_bank(os.path.join(tempfile.mkdtemp(prefix="bank-metrics-"), "bench.db"))
+    bank.configure_metrics(enabled=mode != "off", sql_timing=mode in ("sql", "slow-log"),
+                           slow_query_seconds=0.05 if mode == "slow-log" else None)
+    bank.use_database(bank.pool.path)       # Reopen so the connections pick the mode up
+    populate_accounts(bank.pool.connection(), accounts)
+    bank.metrics.reset()
+
+    started = time.perf_counter()
+    for i in range(operations):
+        bank.deposit_funds(i % accounts + 1, 100)
+    deposits = operations / (time.perf_counter() - started)
+
+    started = time.perf_counter()
+    for i in range(operations):
+        bank.repository.account_balance(i % accounts + 1)
+    lookups = operations / (time.perf_counter() - started)
+
+    if mode != "off":
+        counted = {tuple(sorted(entry["labels"].items())): entry["value"] for entry in bank.metrics.to_json()["counters"]}
+        assert counted[(("operation", "deposit"), ("outcome", "ok"))] == operations, "deposits miscounted"
+        text = bank.metrics.to_prometheus()
+        assert f'bank_operation_seconds_count{{operation="deposit"}} {operations}' in text, "histogram count off"
+        assert f'bank_operation_seconds_bucket{{operation="deposit",le="+Inf"}} {operations}' in text, "+Inf bucket off"
+        assert ("bank_sql_seconds" in text) == (mode != "on"), "statements timed in the wrong mode"
+    bank.pool.close_all()
+    return deposits, lookups
+
+
+def check_thread_churn(bank, threads=2_000):
+    bank.configure_metrics(enabled=True, sql_timing=False, slow_query_seconds=None)
+    bank.metrics.reset()
+    for _ in range(threads):
+        thread = threading.Thread(target=bank.metrics.count, args=("bench_churn_total",))
+        thread.start()
+        thread.join()
+    counted = bank.metrics.snapshot()[0][("bench_churn_total", ())]
+    assert counted == threads, f"{counted} of {threads} counts kept"
+    assert len(bank.metrics._shards) <= 2, f"{len(bank.metrics._shards)} shards kept for {threads} ended threads"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Throughput with the metrics registry off and on")
+    parser.add_argument("--operations", type=int, default=20_000)
+    parser.add_argument("--accounts", type=int, default=1_000)
+    parser.add_argument("--rounds", type=int, default=3)
+    args = parser.parse_args()
+
+    best = {}
+    for _ in range(args.rounds):
+        for mode in ("off", "on", "sql", "slow-log"):
+            deposits, lookups = run(mode, args.operations, args.accounts)
+            previous = best.get(mode, (0, 0))
+            best[mode] = (max(previous[0], deposits), max(previous[1], lookups))
+
+    print(f"{'mode':>9} {'deposits/sec':>13} {'overhead':>9} {'lookups/sec':>12} {'overhead':>9}")
+    for mode, (deposits, lookups) in best.items():
+        print(f"{mode:>9} {deposits:>13.0f} {1 - deposits / best['off'][0]:>9.1%} {lookups:>12.0f} {1 - lookups / best['off'][1]:>9.1%}")
+    bank = load_bank(os.path.join(tempfile.mkdtemp(prefix="bank-metrics-"), "bench.db"))
+    check_thread_churn(bank)
+    print("✅ Every deposit counted, Prometheus histograms consistent, ended threads' shards folded away")
+
+
+if __name__ == "__main__":
+    main()
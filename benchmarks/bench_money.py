@@ -0,0 +1,166 @@
+# ------------------------- Money representation benchmark --------------------------------
+# Balances are int piastres. This script
+#   1. replays --operations random deposits / withdrawals / interest postings on int piastres
+#      and on an exact Decimal reference, and checks that both agree to the piastre after
+#      every step (a float running total is kept alongside to show the drift it picks up),
+#   2. posts random deposits / withdrawals / transfers through the engine and checks that
+#      SUM(Balance) and the ledger still add up exactly,
+#   3. times summing --values amounts as an int64 array, as ints, as Decimals and as floats,
+#   4. checks that the schema migration turns an old float / pound database into piastres.
+# It is also the money exactness check: the exit code is 1 when any check fails (checked
+# explicitly, so they still run under python -O), and --check runs them at a size quick
+# enough for every change, without the timings.
+#
+#   python benchmarks/bench_money.py --operations 5000000 --values 5000000
+#   python benchmarks/bench_money.py --check
+import argparse
+import array
+import os
+import random
+import sqlite3 as sql
+import sys
+import tempfile
+import time
+from decimal import Decimal, ROUND_HALF_UP
+
+from _bank import load_bank, populate_accounts
+
+try:
+    import numpy
+except ImportError:     # numpy is optional; the stdlib int64 array is used without it
+    numpy = None
+
+failures = []
+
+
+def check(condition, message):
+    if not condition:
+        failures.append(message)
+        print(f"❌ {message}")
+    return condition
+
+
+def property_check(bank, operations, seed):
+    rng = random.Random(seed)
+    rate = bank.SavingAccount.interest_rate
+    minor, reference, floating = 1_000_000, Decimal("10000.00"), 10_000.0
+    for step in range(operations):
+        kind = rng.random()
+        if kind < 0.00001:     # Interest compounds, so keep it rare enough to stay readable
+            interest = bank.interest_minor(minor, rate)
+            minor += interest
+            reference += (reference * Decimal(str(rate))).quantize(Decimal("0.01"), rounding=ROUND_HALF_UP)
+            floating += floating * rate
+        else:
+            amount = rng.randint(1, 99_999)
+            if kind < 0.5 or minor - amount < 0:
+                minor += amount
+                reference += Decimal(amount) / 100
+                floating += amount / 100
+            else:
+                minor -= amount
+                reference -= Decimal(amount) / 100
+                floating -= amount / 100
+        if not check(Decimal(minor) / 100 == reference, f"piastre total drifted at step {step}"):
+            break
+    return minor, reference, floating
+
+
+def engine_check(bank, accounts, operations, seed):
+    rng = random.Random(seed)
+    connection = bank.pool.connection()
+    populate_accounts(connection, accounts)
+    total_before = connection.execute('SELECT SUM(Balance) FROM "Client Account"').fetchone()[0]
+    expected = total_before
+    for _ in range(operations):
+        number = rng.randint(1, accounts)
+        amount = rng.randint(1, 500_000)
+        try:
+            kind = rng.random()
+            if kind < 0.4:
+                bank.deposit_funds(number, amount)
+                expected += amount
+            elif kind < 0.7:
+                bank.withdraw_funds(number, amount)
+                expected -= amount
+            else:
+                bank.transfer_funds(number, number % accounts + 1, amount)
+        except bank.BankError:
+            pass
+    total, types = connection.execute("""SELECT SUM(Balance), (SELECT COUNT(*) FROM "Client Account" WHERE typeof(Balance) != 'integer')
+        FROM "Client Account" """).fetchone()
+    ledger = connection.execute("""SELECT SUM(CASE WHEN "Transaction Type" IN ('Deposit', 'Transfer Received') THEN Amount ELSE -Amount END)
+        FROM "Account Transactions" """).fetchone()[0]
+    check(types == 0, "non-integer balance stored")
+    check(total == expected == total_before + ledger, f"books do not add up: {total} balances, {expected} expected, "
+                                                      f"{total_before + ledger} from the ledger")
+    return total
+
+
+def aggregation_timings(values):
+    rng = random.Random(3)
+    amounts = array.array("q", (rng.randint(1, 10_000_000) for _ in range(values)))
+    # (label, column, how to sum it, the result in piastres)
+    candidates = [("int64 array", amounts, sum, int), ("python ints", list(amounts), sum, int),
+                  ("Decimal", [Decimal(value) / 100 for value in amounts], sum, lambda total: total * 100),
+                  ("float", [value / 100 for value in amounts], sum, lambda total: total * 100)]
+    if numpy is not None:
+        candidates.insert(0, ("numpy int64", numpy.frombuffer(amounts, dtype=numpy.int64), lambda column: column.sum(), int))
+    exact = sum(amounts)
+    for label, column, total, to_piastres in candidates:
+        started = time.perf_counter()
+        result = total(column)
+        elapsed = time.perf_counter() - started
+        print(f"  {label:<12}: {elapsed * 1000:9.1f} ms  {'exact' if to_piastres(result) == exact else 'off by %r piastres' % (to_piastres(result) - exact)}")
+
+
+def migration_check(work_dir, bank):
+    db_path = os.path.join(work_dir, "old.db")
+    connection = sql.connect(db_path)
+    bank.create_schema(connection)
+    connection.execute("PRAGMA user_version = 4")     # A database from before the piastre migration
+    connection.execute("""INSERT INTO 'Client Account' (Name, 'Account Type', Balance, 'Bank Account Number') VALUES ('Old', 'Saving', 3360.12, 7)""")
+    connection.execute("""INSERT INTO 'Account Transactions' (Name, 'Bank Account Number', 'Transaction Type', Amount, Balance, History)
+        VALUES ('Old', 7, 'Interest', 360.0000000001, 3360.12, '2024-01-01 00:00:00')""")
+    connection.commit()
+    connection.close()
+    bank.use_database(db_path)
+    balance = bank.pool.connection().execute('SELECT Balance FROM "Client Account"').fetchone()[0]
+    amount = bank.pool.connection().execute('SELECT Amount FROM "Account Transactions"').fetchone()[0]
+    check((balance, amount) == (336_012, 36_000), f"migrated to {(balance, amount)}, not (336012, 36000) piastres")
+    bank.pool.close_all()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Exactness and speed of integer piastre money")
+    parser.add_argument("--operations", type=int, default=2_000_000, help="in-memory operations for the exactness check")
+    parser.add_argument("--engine-operations", type=int, default=20_000, help="operations posted through the engine")
+    parser.add_argument("--accounts", type=int, default=1_000)
+    parser.add_argument("--values", type=int, default=2_000_000, help="amounts summed by the aggregation timing")
+    parser.add_argument("--check", action="store_true", help="only the exactness checks, at a quick size")
+    args = parser.parse_args()
+    if args.check:
+        args.operations, args.engine_operations, args.accounts = 1_000_000, 5_000, 200
+
+    work_dir = tempfile.mkdtemp(prefix="bank-money-")
+    bank = load_bank(os.path.join(work_dir, "bench.db"))
+
+    minor, reference, floating = property_check(bank, args.operations, seed=1)
+    print(f"{args.operations} operations: piastres {bank.format_money(minor)}, Decimal {reference}, float {floating!r}")
+    total = engine_check(bank, args.accounts, args.engine_operations, seed=2)
+    print(f"{args.engine_operations} engine operations: books balance exactly at {bank.format_money(total)}")
+    bank.pool.close_all()
+
+    if not args.check:
+        print(f"sum of {args.values} amounts:")
+        aggregation_timings(args.values)
+    migration_check(work_dir, bank)
+    if failures:
+        print(f"❌ {len(failures)} money check(s) failed")
+        return 1
+    print("✅ Sums exact, old float balances migrated to piastres")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
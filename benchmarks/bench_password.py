@@ -0,0 +1,73 @@
+# ------------------------- Password hashing benchmark --------------------------------
+# Logins/sec of ClientAccount.authenticate() for several scrypt costs and PBKDF2 iteration
+# counts, verifying inline and in a process pool, plus the rate when the positive cache
+# answers. Also checks that plaintext passwords are migrated to hashes on first login and
+# that wrong passwords are refused.
+#
+#   python benchmarks/bench_password.py --logins 200 --workers 4
+import argparse
+import os
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from _bank import load_bank, populate_accounts
+
+SETTINGS = [("scrypt", {"scrypt_n": 2 ** 12}), ("scrypt", {"scrypt_n": 2 ** 14}), ("scrypt", {"scrypt_n": 2 ** 15}),
+            ("pbkdf2_sha256", {"pbkdf2_iterations": 100_000}), ("pbkdf2_sha256", {"pbkdf2_iterations": 600_000})]
+
+
+def fresh_bank(accounts):
+    bank = load_bank(os.path.join(tempfile.mkdtemp(prefix="bank-password-"), "bench.db"))
+    populate_accounts(bank.pool.connection(), accounts)
+    return bank
+
+
+def login_rate(bank, logins, accounts, threads):
+    def login(n):
+        number = n % accounts + 1
+        assert bank.ClientAccount.authenticate(number, f"pw{number}") is not None
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(threads) as executor:
+        list(executor.map(login, range(logins)))
+    return logins / (time.perf_counter() - started)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Password hashing cost: logins/sec")
+    parser.add_argument("--logins", type=int, default=100)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="processes in the pool run")
+    args = parser.parse_args()
+    accounts = args.logins
+
+    bank = fresh_bank(accounts)
+    bank.configure_password_hashing(scheme="scrypt", scrypt_n=2 ** 10, workers=0)
+    login_rate(bank, accounts, accounts, 1)     # First login re-hashes every plaintext row
+    stored = bank.pool.connection().execute('SELECT Password FROM "Client Account"').fetchall()
+    assert all(bank.PasswordHasher.is_hash(row[0]) for row in stored), "plaintext password left behind"
+    assert bank.ClientAccount.authenticate(1, "wrong") is None, "wrong password accepted"
+    assert bank.ClientAccount.authenticate(1, "pw1") is not None
+    print("✅ Plaintext passwords migrated, wrong passwords refused")
+    bank.pool.close_all()
+
+    print(f"{'scheme':>14} {'cost':>9} {'inline/s':>10} {'pool/s':>10} {'cached/s':>10}")
+    for scheme, cost in SETTINGS:
+        rates = []
+        for workers in (0, args.workers):
+            bank = fresh_bank(accounts)
+            bank.configure_password_hashing(scheme=scheme, workers=0, cache_seconds=0, **cost)
+            login_rate(bank, accounts, accounts, 1)     # Hash every account at this cost first
+            bank.configure_password_hashing(workers=workers, cache_seconds=0)
+            rates.append(login_rate(bank, args.logins, accounts, max(1, workers)))
+            if workers:
+                bank.configure_password_hashing(cache_seconds=300)
+                login_rate(bank, accounts, accounts, 1)     # Fill the cache
+                rates.append(login_rate(bank, args.logins, accounts, 1))
+                bank.configure_password_hashing(workers=0)
+            bank.pool.close_all()
+        print(f"{scheme:>14} {list(cost.values())[0]:>9} {rates[0]:>10.1f} {rates[1]:>10.1f} {rates[2]:>10.0f}")
+
+
+if __name__ == "__main__":
+    main()
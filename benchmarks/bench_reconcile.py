@@ -0,0 +1,71 @@
+# ------------------------- Ledger reconciliation benchmark --------------------------------
+# Builds a ledger of --rows rows (50M by default) whose running balances agree with the
+# accounts, then times reconcile_ledger():
+#   full        - the first run, which has no checkpoints and replays the whole ledger
+#   incremental - a run after --recent new operations, replaying only those rows
+# Finally it breaks one account balance and one ledger row and checks that exactly those
+# two are reported.
+#
+#   python benchmarks/bench_reconcile.py --rows 50000000 --accounts 500000 --shards 4
+import argparse
+import os
+import random
+import tempfile
+import time
+
+from _bank import load_bank, populate_accounts, populate_ledger
+
+
+def timed_run(bank, shards):
+    started = time.perf_counter()
+    result = bank.reconcile_ledger(shards)
+    return result, time.perf_counter() - started
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Full vs. incremental ledger reconciliation")
+    parser.add_argument("--rows", type=int, default=50_000_000)
+    parser.add_argument("--accounts", type=int, default=500_000)
+    parser.add_argument("--recent", type=int, default=10_000, help="operations posted between the two runs")
+    parser.add_argument("--shards", type=int, default=4)
+    args = parser.parse_args()
+
+    bank = load_bank(os.path.join(tempfile.mkdtemp(prefix="bank-reconcile-"), "bench.db"))
+    connection = bank.pool.connection()
+    rows_per_account = args.rows // args.accounts
+    populate_accounts(connection, args.accounts)
+    populate_ledger(connection, args.accounts, rows_per_account)
+    # populate_ledger() deposits 100.00 per row on top of the opening balance
+    connection.execute('UPDATE "Client Account" SET Balance = Balance + ?', (10_000 * rows_per_account,))
+    connection.commit()
+
+    result, elapsed = timed_run(bank, args.shards)
+    assert not result["mismatches"], result["mismatches"][:5]
+    print(f"full        : {result['accounts']} accounts, {args.accounts * rows_per_account} ledger rows in {elapsed:.2f} s")
+
+    rng = random.Random(5)
+    for _ in range(args.recent):
+        number = rng.randint(1, args.accounts)
+        if rng.random() < 0.5:
+            bank.deposit_funds(number, rng.randint(1, 100_000))
+        else:
+            bank.transfer_funds(number, number % args.accounts + 1, rng.randint(1, 100_000))
+    result, elapsed = timed_run(bank, args.shards)
+    assert not result["mismatches"], result["mismatches"][:5]
+    print(f"incremental : {args.recent} new operations in {elapsed:.2f} s")
+
+    connection.execute('UPDATE "Client Account" SET Balance = Balance + 1 WHERE "Bank Account Number" = 7')
+    bank.deposit_funds(11, 500)
+    connection.execute("DROP TRIGGER ledger_no_update")     # Ledger rows are append-only; break one behind the app's back
+    connection.execute("""UPDATE "Account Transactions" SET Balance = Balance - 1
+        WHERE rowid = (SELECT MAX(rowid) FROM "Account Transactions" WHERE "Bank Account Number" = 11)""")
+    connection.commit()
+    result, elapsed = timed_run(bank, args.shards)
+    found = sorted((number, what) for number, what, *_ in result["mismatches"])
+    assert found == [(7, "account balance"), (11, "ledger running balance")], found
+    print(f"broken      : found {len(result['mismatches'])} mismatches in {elapsed:.2f} s")
+    print("✅ Reconciliation reports exactly the broken accounts")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+# ------------------------- Account / ledger record benchmark --------------------------------
+# Loads --accounts accounts (1M by default) and as many ledger rows into memory and
+# reports load time and memory held:
+#   before - dict-backed account and transaction classes (what the app had), built from fetchall()
+#   after  - the slotted records, accounts via ClientAccount.load_many() streaming cursor rows
+# Checks that both hold the same values.
+#
+#   python benchmarks/bench_records.py --accounts 1000000
+import argparse
+import gc
+import os
+import tempfile
+import time
+import tracemalloc
+
+from _bank import load_bank, populate_accounts, populate_ledger
+
+
+# The dict-backed classes as they were, minus the methods that do not matter here
+class LegacyAccount:
+    def __init__(self, name, nationality, gender, phone_number, document_submit, account_type, balance, password, bank_account_number):
+        self.name = name
+        self.nationality = nationality
+        self.gender = gender
+        self.phone_number = phone_number
+        self._document_submit = document_submit
+        self.account_type = account_type
+        self.__balance = balance
+        self.__password = password
+        self.bank_account_number = bank_account_number
+
+    def get_balance(self):
+        return self.__balance
+
+
+class LegacySavingAccount(LegacyAccount):
+    def __init__(self, *row):
+        super().__init__(*row)
+        self.interest = 0.12
+
+
+class LegacyTransaction:
+    def __init__(self, name, bank_account_number, trans_type, amount, balance, history):
+        self.name = name
+        self.bank_account_number = bank_account_number
+        self.trans_type = trans_type
+        self.amount = amount
+        self.balance = balance
+        self.history = history
+
+
+def measure(load):
+    # Timed on its own first: tracemalloc slows every allocation down
+    gc.collect()
+    started = time.perf_counter()
+    records = load()
+    elapsed = time.perf_counter() - started
+    del records
+    gc.collect()
+    tracemalloc.start()
+    records = load()
+    held = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return records, elapsed, held
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Memory and load time of account and ledger records")
+    parser.add_argument("--accounts", type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    bank = load_bank(os.path.join(tempfile.mkdtemp(prefix="bank-records-"), "bench.db"))
+    populate_accounts(bank.pool.connection(), args.accounts)
+    populate_ledger(bank.pool.connection(), args.accounts, 1)
+    reader = bank.pool.reader()
+    ledger_sql = """SELECT Name, "Bank Account Number", "Transaction Type", Amount, Balance, History FROM "Account Transactions" """
+
+    def legacy_accounts():
+        rows = reader.execute("""SELECT Name, Nationality, Gender, "Phone Number", "Document Submit", "Account Type", Balance, Password,
+            "Bank Account Number" FROM "Client Account" ORDER BY "Bank Account Number" """).fetchall()
+        return [(LegacySavingAccount if row[5] == "Saving" else LegacyAccount)(*row) for row in rows]
+
+    results = {}
+    for label, load_accounts, load_ledger in [
+            ("before", legacy_accounts, lambda: [LegacyTransaction(*row) for row in reader.execute(ledger_sql).fetchall()]),
+            ("after", lambda: list(bank.ClientAccount.load_many()), lambda: [bank.Transaction(*row) for row in reader.execute(ledger_sql)])]:
+        accounts, account_seconds, account_bytes = measure(load_accounts)
+        ledger, ledger_seconds, ledger_bytes = measure(load_ledger)
+        results[label] = ([(a.bank_account_number, a.get_balance(), a.name) for a in accounts[:1000]],
+                          [(t.bank_account_number, t.amount, t.history) for t in ledger[:1000]])
+        print(f"{label:>7} accounts: {account_seconds:6.2f} s {account_bytes / len(accounts):7.0f} bytes each   "
+              f"ledger: {ledger_seconds:6.2f} s {ledger_bytes / len(ledger):7.0f} bytes each")
+        del accounts, ledger
+
+    assert results["before"] == results["after"], "slotted records differ from the dict-backed ones"
+    print("✅ Same values in both record layouts")
+    bank.pool.close_all()
+
+
+if __name__ == "__main__":
+    main()
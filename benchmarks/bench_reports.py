@@ -0,0 +1,99 @@
+# ------------------------- Admin reports benchmark --------------------------------
+# Builds a ledger of --rows rows (100M by default) inside SQLite, exports it with
+# ColumnStore.export() (then again after --new more rows, to time an incremental export)
+# and times every admin report over the column files against the same report written as
+# a SQL GROUP BY. The two must give the same numbers. Run it with numpy installed for the
+# vectorized engine; without numpy the reports fall back to the array module.
+#
+#   python benchmarks/bench_reports.py --rows 100000000 --accounts 1000000
+import argparse
+import datetime
+import os
+import tempfile
+import time
+
+from _bank import load_bank, populate_accounts
+
+GENERATE_LEDGER_SQL = """
+    WITH RECURSIVE n(i) AS (SELECT ? UNION ALL SELECT i + 1 FROM n WHERE i + 1 < ?)
+    INSERT INTO "Account Transactions" (Name, "Bank Account Number", "Transaction Type", Amount, Balance, History)
+    SELECT 'Client', (i * 7919) % ? + 1,
+           CASE i % 10 WHEN 4 THEN 'Withdraw' WHEN 5 THEN 'Withdraw' WHEN 6 THEN 'Transfer Sent'
+                       WHEN 7 THEN 'Transfer Received' WHEN 8 THEN 'Interest' ELSE 'Deposit' END,
+           (i * 104729) % 500000 + 1, 0, datetime('2025-01-01', '+' || (i * ? / ?) || ' days', '+' || (i % 86400) || ' seconds')
+    FROM n
+"""
+
+
+def sql_reports(connection, bank, days):
+    cases = " ".join(f"WHEN Balance >= {bucket * bank.MINOR_UNITS} THEN {index}" for index, bucket in reversed(list(enumerate(bank.BALANCE_BUCKETS))))
+    last_day = connection.execute('SELECT MAX(date(History)) FROM "Account Transactions"').fetchone()[0]
+    first_day = (datetime.date.fromisoformat(last_day) - datetime.timedelta(days=days - 1)).isoformat()
+    return {
+        "deposits by account type": lambda: {account_type: (count, total) for account_type, count, total in connection.execute("""
+            SELECT a."Account Type", COUNT(*), SUM(t.Amount) FROM "Account Transactions" t
+            JOIN "Client Account" a ON a."Bank Account Number" = t."Bank Account Number"
+            WHERE t."Transaction Type" = 'Deposit' GROUP BY 1""")},
+        "balance distribution": lambda: {bucket: (count, total) for bucket, count, total in connection.execute(f"""
+            SELECT CASE {cases} END, COUNT(*), SUM(Balance) FROM "Client Account" GROUP BY 1""")},
+        "daily volume": lambda: {(day, kind): (count, total) for day, kind, count, total in connection.execute("""
+            SELECT date(History), "Transaction Type", COUNT(*), SUM(Amount) FROM "Account Transactions"
+            WHERE History >= ? GROUP BY 1, 2""", (first_day,))},
+        "top accounts by flow": lambda: [total for _, _, total in connection.execute("""
+            SELECT t."Bank Account Number", COUNT(*), SUM(t.Amount) FROM "Account Transactions" t
+            JOIN "Client Account" a ON a."Bank Account Number" = t."Bank Account Number"
+            GROUP BY 1 ORDER BY 3 DESC LIMIT 10""")],
+    }
+
+
+def column_reports(store, bank, days):
+    return {
+        "deposits by account type": lambda: bank.report_deposits_by_account_type(store),
+        "balance distribution": lambda: {index: (count, total) for index, (_, _, count, total) in enumerate(bank.report_balance_distribution(store)) if count},
+        "daily volume": lambda: bank.report_daily_volume(store, days),
+        "top accounts by flow": lambda: [total for _, _, total in bank.report_top_accounts(store, 10)],
+    }
+
+
+def timed_once(function):
+    started = time.perf_counter()
+    result = function()
+    return result, time.perf_counter() - started
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Columnar admin reports vs. SQL GROUP BY")
+    parser.add_argument("--rows", type=int, default=100_000_000)
+    parser.add_argument("--new", type=int, default=1_000_000, help="rows added before the incremental export")
+    parser.add_argument("--accounts", type=int, default=1_000_000)
+    parser.add_argument("--days", type=int, default=365, help="days the ledger covers")
+    args = parser.parse_args()
+
+    work_dir = tempfile.mkdtemp(prefix="bank-reports-")
+    bank = load_bank(os.path.join(work_dir, "bench.db"))
+    connection = bank.pool.connection()
+    populate_accounts(connection, args.accounts)
+    connection.execute(GENERATE_LEDGER_SQL, (0, args.rows, args.accounts, args.days, args.rows + args.new))
+    connection.commit()
+
+    store = bank.ColumnStore()
+    exported, elapsed = timed_once(store.export)
+    print(f"export       : {exported} rows in {elapsed:.1f} s ({exported / elapsed:.0f} rows/sec)")
+    connection.execute(GENERATE_LEDGER_SQL, (args.rows, args.rows + args.new, args.accounts, args.days, args.rows + args.new))
+    connection.commit()
+    exported, elapsed = timed_once(store.export)
+    print(f"incremental  : {exported} rows in {elapsed:.1f} s")
+
+    print(f"engine: {'numpy' if bank._numpy() else 'array'}")
+    print(f"{'report':<26} {'columns (s)':>12} {'SQL (s)':>10}")
+    expected = sql_reports(connection, bank, 14)
+    for name, report in column_reports(store, bank, 14).items():
+        result, column_seconds = timed_once(report)
+        sql_result, sql_seconds = timed_once(expected[name])
+        assert result == sql_result, f"{name}: {result} != {sql_result}"
+        print(f"{name:<26} {column_seconds:>12.2f} {sql_seconds:>10.2f}")
+    print("✅ Column reports match SQL")
+
+
+if __name__ == "__main__":
+    main()
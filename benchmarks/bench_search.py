@@ -0,0 +1,140 @@
+# ------------------------- Account search benchmark --------------------------------
+# Opens 5M accounts (by default) with varied names, phone numbers and nationalities through
+# BankRepository.insert_accounts(), which fills the search index as it goes, and reports:
+#   - accounts opened/sec with the index, and without it (the same rows inserted directly),
+#   - first-page latency (p50 / p99, 20 accounts) of prefix searches by kind: short and long
+#     name prefixes, first name plus last-name prefix, phone prefixes, nationality,
+#   - the same phone lookup done the old way, a LIKE scan of 'Client Account'.
+# Then it checks a sample of searches against a plain SQL reference, and that deposits
+# commit while a search snapshot is held open on the read-only connection.
+#
+#   python benchmarks/bench_search.py --accounts 5000000
+import argparse
+import os
+import random
+import tempfile
+import time
+
+from _bank import load_bank
+
+FIRST = ["Mohamed", "Ahmed", "Mahmoud", "Mostafa", "Omar", "Ali", "Youssef", "Hassan", "Hussein", "Ibrahim", "Khaled", "Tarek",
+         "Amr", "Karim", "Sherif", "Walid", "Hany", "Sameh", "Ayman", "Adel", "Fatma", "Mariam", "Nour", "Salma", "Sara",
+         "Aya", "Yasmin", "Hana", "Dina", "Mona", "Heba", "Rana", "Reem", "Laila", "Nada", "Mai", "Amira", "Shaimaa",
+         "Doaa", "Eman", "John", "Maria", "Anna", "Peter", "George", "Mina", "Marina", "Beshoy", "Kirollos", "Verena"]
+LAST = ["Abdelrahman", "Abdallah", "Mansour", "Gamal", "Farouk", "Saleh", "Soliman", "Zaki", "Nassar", "Fouad", "Ghanem",
+        "Hegazy", "Shawky", "Salem", "Morsi", "Rizk", "Ezzat", "Naguib", "Tawfik", "Badawi", "Hamdy", "Fathy", "Lotfy",
+        "Samir", "Adly", "Wahba", "Girgis", "Boutros", "Hanna", "Shenouda", "Eldib", "Elsayed", "Elmasry", "Kamel",
+        "Ragab", "Sabry", "Selim", "Taha", "Yehia", "Zidan"]
+NATIONALITIES = ["Egyptian"] * 12 + ["Sudanese", "Saudi", "Jordanian", "Lebanese", "Syrian", "Palestinian", "Libyan",
+                                     "Moroccan", "Tunisian", "Emirati", "Kuwaiti", "American", "British", "German", "Italian"]
+
+
+def account_rows(first_number, count, rng, now):
+    for number in range(first_number, first_number + count):
+        name = f"{rng.choice(FIRST)} {rng.choice(FIRST)} {rng.choice(LAST)}"
+        yield (name, rng.choice(NATIONALITIES), "Male", "01%d%08d" % (rng.randint(0, 2), rng.randrange(10 ** 8)),
+               "Id Card", "Current", 1_000_000, "pw", number, now)
+
+
+def open_accounts(bank, accounts, seed, indexed=True, batch=100_000):
+    rng = random.Random(seed)
+    now = time.strftime("%Y-%m-%d %H:%M:%S")
+    connection = bank.pool.connection()
+    started = time.perf_counter()
+    for first in range(1, accounts + 1, batch):
+        rows = account_rows(first, min(batch, accounts + 1 - first), rng, now)
+        if indexed:
+            bank.repository.insert_accounts(rows)
+            continue
+        connection.executemany("""INSERT INTO 'Client Account' (Name, Nationality, Gender, 'Phone Number', 'Document Submit',
+                'Account Type', Balance, Password, 'Bank Account Number', Time) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)""", rows)
+        connection.commit()
+    return accounts / (time.perf_counter() - started)
+
+
+def searches(rng, count):
+    # (kind, text, field) samples of what an admin types
+    kinds = {
+        "name, 2 letters": lambda: (rng.choice(FIRST)[:2], "name"),
+        "name, 4 letters": lambda: (rng.choice(LAST)[:4], "name"),
+        "first + last prefix": lambda: (f"{rng.choice(FIRST)} {rng.choice(LAST)[:3]}", "name"),
+        "phone, 6 digits": lambda: ("01%d%03d" % (rng.randint(0, 2), rng.randrange(1000)), "phone"),
+        "phone, 11 digits": lambda: ("01%d%08d" % (rng.randint(0, 2), rng.randrange(10 ** 8)), "phone"),
+        "nationality": lambda: (rng.choice(NATIONALITIES)[:3], "nationality"),
+        "any field": lambda: (rng.choice(FIRST + LAST + NATIONALITIES)[:3], None),
+    }
+    return {kind: [make() for _ in range(count)] for kind, make in kinds.items()}
+
+
+def percentile(sorted_values, fraction):
+    return sorted_values[min(len(sorted_values) - 1, int(len(sorted_values) * fraction))]
+
+
+def reference(connection, text, field, limit=20):
+    # Every word must start some word of the field(s), tested with LIKE on the stored text
+    columns = {"name": ["Name"], "phone": ['"Phone Number"'], "nationality": ["Nationality"]}.get(field, ["Name", '"Phone Number"', "Nationality"])
+    conditions, parameters = [], []
+    for word in text.lower().split():
+        conditions.append("(" + " OR ".join(f"(' ' || lower({column})) LIKE ?" for column in columns) + ")")
+        parameters += [f"% {word}%"] * len(columns)
+    return [row[0] for row in connection.execute(f"""SELECT "Bank Account Number" FROM "Client Account"
+        WHERE {" AND ".join(conditions)} ORDER BY "Bank Account Number" LIMIT ?""", parameters + [limit])]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Prefix search latency over the account search index")
+    parser.add_argument("--accounts", type=int, default=5_000_000)
+    parser.add_argument("--queries", type=int, default=200, help="searches per kind")
+    parser.add_argument("--checks", type=int, default=3, help="searches per kind compared with the SQL reference")
+    args = parser.parse_args()
+
+    # Opening rate without the index, on a smaller separate book
+    plain = load_bank(os.path.join(tempfile.mkdtemp(prefix="bank-search-"), "bench.db"))
+    sample = min(args.accounts, 500_000)
+    rate_without = open_accounts(plain, sample, seed=1, indexed=False)
+    plain.pool.close_all()
+
+    bank = load_bank(os.path.join(tempfile.mkdtemp(prefix="bank-search-"), "bench.db"))
+    connection = bank.pool.connection()
+    rate_with = open_accounts(bank, args.accounts, seed=1)
+    print(f"accounts opened   : {args.accounts}, {rate_with:.0f}/sec with the search index "
+          f"({rate_without:.0f}/sec without, measured on {sample})")
+
+    rng = random.Random(4)
+    print(f"\n{'search':>20} {'p50 ms':>8} {'p99 ms':>8} {'avg hits':>9}")
+    for kind, samples in searches(rng, args.queries).items():
+        latencies, hits = [], 0
+        for text, field in samples:
+            started = time.perf_counter()
+            rows, _ = bank.search_accounts(text, field)
+            latencies.append(time.perf_counter() - started)
+            hits += len(rows)
+        latencies.sort()
+        print(f"{kind:>20} {percentile(latencies, 0.5) * 1000:>8.3f} {percentile(latencies, 0.99) * 1000:>8.3f} {hits / len(samples):>9.1f}")
+
+    phone = bank.search_accounts("01", "phone", limit=1)[0][0][2]
+    started = time.perf_counter()
+    scanned = connection.execute("""SELECT "Bank Account Number" FROM "Client Account" WHERE "Phone Number" LIKE ? LIMIT 20""",
+                                 (phone + "%",)).fetchall()
+    print(f"{'LIKE scan, 11 digits':>20} {(time.perf_counter() - started) * 1000:>8.1f} ms (the lookup without the index)")
+    assert [row[0] for row in scanned][:1] == [row[0] for row in bank.search_accounts(phone, "phone")[0]][:1]
+
+    for kind, samples in searches(random.Random(8), args.checks).items():
+        for text, field in samples:
+            found = [row[0] for row in bank.search_accounts(text, field)[0]]
+            assert found == reference(connection, text, field), f"{kind} {text!r}: the index and the table disagree"
+
+    # Posting goes on while a search snapshot is held open on the read-only connection
+    reader = bank.pool.reader()
+    reader.execute("BEGIN")
+    reader.execute("""SELECT rowid FROM "Account Search" WHERE "Account Search" MATCH '"mo"*' LIMIT 1000""").fetchall()
+    started = time.perf_counter()
+    for number in range(1, 1_001):
+        bank.deposit_funds(number, 100)
+    deposits = 1_000 / (time.perf_counter() - started)
+    reader.execute("COMMIT")
+    print(f"\n✅ Searches match the SQL reference; {deposits:.0f} deposits/sec committed while a search snapshot was open")
+
+
+if __name__ == "__main__":
+    main()
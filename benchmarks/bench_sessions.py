@@ -0,0 +1,102 @@
+# ------------------------- Client session benchmark --------------------------------
+# Opens --sessions client sessions (10k by default) and replays random menu actions
+# (mostly balance checks, some deposits) across them, the way the client portal does:
+#   per-login - the old path: check the password and load the account for every action
+#   sessions  - resolve the account through SessionManager by token
+# A separate process posts deposits meanwhile, so sessions must notice outside writes
+# (PRAGMA data_version) and refresh their balance. Afterwards every session balance must
+# equal the database, and idle / expired sessions must be refused.
+#
+#   python benchmarks/bench_sessions.py --sessions 10000 --actions 100000
+import argparse
+import contextlib
+import io
+import multiprocessing
+import os
+import random
+import tempfile
+import time
+
+from _bank import load_bank, populate_accounts
+
+
+def outside_writer(db_path, accounts, deposits, stop):
+    # Another process depositing into random accounts until told to stop
+    bank = load_bank(db_path)
+    rng = random.Random(99)
+    with contextlib.redirect_stdout(io.StringIO()):
+        while not stop.is_set() and deposits > 0:
+            bank.ClientAccount.load_account_from_db(rng.randint(1, accounts)).deposit(100)
+            deposits -= 1
+            time.sleep(0.005)
+    bank.pool.close_all()
+
+
+def replay(bank, actions, lookup, seed):
+    rng = random.Random(seed)
+    started = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):     # deposit() prints a receipt
+        for _ in range(actions):
+            account = lookup(rng)
+            if rng.random() < 0.1:
+                account.deposit(100)
+            else:
+                account.get_balance()
+    return actions / (time.perf_counter() - started)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Client actions/sec with and without sessions")
+    parser.add_argument("--sessions", type=int, default=10_000)
+    parser.add_argument("--actions", type=int, default=100_000)
+    parser.add_argument("--outside-deposits", type=int, default=2_000)
+    args = parser.parse_args()
+
+    db_path = os.path.join(tempfile.mkdtemp(prefix="bank-sessions-"), "bench.db")
+    bank = load_bank(db_path)
+    bank.configure_password_hashing(scrypt_n=2 ** 4, pbkdf2_iterations=1)     # bench_password.py measures hashing
+    populate_accounts(bank.pool.connection(), args.sessions)
+
+    started = time.perf_counter()
+    tokens = [bank.sessions.login(n, f"pw{n}").token for n in range(1, args.sessions + 1)]
+    print(f"open sessions    : {args.sessions / (time.perf_counter() - started):.0f} logins/sec")
+
+    def per_login(rng):
+        number = rng.randint(1, args.sessions)
+        return bank.ClientAccount.authenticate(number, f"pw{number}")
+
+    def by_session(rng):
+        return bank.sessions.account(tokens[rng.randrange(args.sessions)])
+
+    context = multiprocessing.get_context("spawn")
+    stop = context.Event()
+    writer = context.Process(target=outside_writer, args=(db_path, args.sessions, args.outside_deposits, stop))
+    writer.start()
+    try:
+        print(f"per-login        : {replay(bank, args.actions, per_login, 1):.0f} actions/sec")
+        bank.sessions.refreshes = 0
+        print(f"sessions         : {replay(bank, args.actions, by_session, 2):.0f} actions/sec "
+              f"({bank.sessions.refreshes} balance refreshes)")
+    finally:
+        stop.set()
+        writer.join()
+
+    # Every live session must show what the database holds, outside deposits included
+    bank.UnitOfWork.flush()
+    balances = dict(bank.pool.reader().execute('SELECT "Bank Account Number", Balance FROM "Client Account"'))
+    stale = sum(bank.sessions.account(token).get_balance() != balances[n + 1] for n, token in enumerate(tokens))
+    assert stale == 0, f"{stale} sessions show a stale balance"
+
+    bank.sessions.idle_timeout = 0.05
+    idle = bank.sessions.open(bank.ClientAccount.load_account_from_db(1))
+    time.sleep(0.1)
+    assert bank.sessions.get(idle.token) is None, "idle session still accepted"
+    bank.sessions.sweep()
+    assert len(bank.sessions) == 0, "sweep left dead sessions behind"
+    assert bank.sessions.login(1, "wrong") is None, "wrong password opened a session"
+    print("✅ Session balances match the database, idle and bad logins refused")
+    bank.pool.close_all()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+# ------------------------- Standing orders benchmark --------------------------------
+# Pays 1M due standing orders (by default) between 100k accounts and reports orders/sec.
+# The orders fell due over the last day, and the senders of 1% of them hold only their
+# account type's minimum. The run is interrupted after --stop-after transactions and picked
+# up again by a fresh scheduler, the way a restarted process would. Then:
+#   - every order with money was paid exactly once: two ledger rows each, money conserved,
+#     and a third run pays nothing,
+#   - the others wait for their retries, and after the last retry that month is skipped.
+#
+#   python benchmarks/bench_standing_orders.py --orders 1000000 --accounts 100000
+import argparse
+import datetime
+import os
+import random
+import tempfile
+import time
+
+from _bank import load_bank, populate_accounts
+
+NOW = datetime.datetime(2025, 3, 1, 12, 0, 0)
+
+
+def stamp(moment):
+    return moment.strftime("%Y-%m-%d %H:%M:%S")
+
+
+def populate_orders(connection, orders, accounts, poor, seed=9):
+    # Monthly orders of 1.00 to 5.00 pounds; senders 1..poor only hold the minimum balance,
+    # receivers are never among them, so whether an order can be paid does not depend on order
+    rng = random.Random(seed)
+    batch = []
+    for order in range(orders):
+        sender = rng.randint(1, poor) if order % 100 == 0 else rng.randint(poor + 1, accounts)
+        receiver = rng.randint(poor + 1, accounts)
+        while receiver == sender:
+            receiver = rng.randint(poor + 1, accounts)
+        start = stamp(NOW - datetime.timedelta(seconds=rng.randint(0, 24 * 60 * 60)))
+        batch.append((sender, receiver, rng.randint(1, 5) * 100, "monthly", start, start, start))
+        if len(batch) == 50_000 or order == orders - 1:
+            connection.executemany("""INSERT INTO 'Standing Orders' ("From Account", "To Account", Amount, Frequency, Start,
+                "Next Due", "Run At") VALUES (?, ?, ?, ?, ?, ?, ?)""", batch)
+            batch.clear()
+    connection.execute("""UPDATE "Client Account" SET Balance = CASE "Account Type" WHEN 'Saving' THEN ? ELSE ? END
+        WHERE "Bank Account Number" <= ?""", (300_000, 250_000, poor))
+    connection.commit()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Pay a large book of due standing orders")
+    parser.add_argument("--orders", type=int, default=1_000_000)
+    parser.add_argument("--accounts", type=int, default=100_000)
+    parser.add_argument("--stop-after", type=int, default=10, help="transactions before the simulated restart")
+    args = parser.parse_args()
+
+    bank = load_bank(os.path.join(tempfile.mkdtemp(prefix="bank-standing-"), "bench.db"))
+    connection = bank.pool.connection()
+    poor = max(args.accounts // 100, 1)
+    populate_accounts(connection, args.accounts)
+    populate_orders(connection, args.orders, args.accounts, poor)
+    total_before = connection.execute('SELECT SUM(Balance) FROM "Client Account"').fetchone()[0]
+    payable = connection.execute("""SELECT COUNT(*) FROM 'Standing Orders' WHERE "From Account" > ?""", (poor,)).fetchone()[0]
+
+    started = time.perf_counter()
+    first = bank.StandingOrderScheduler().run_due(stamp(NOW), max_batches=args.stop_after)
+    second = bank.StandingOrderScheduler().run_due(stamp(NOW))      # The restarted process
+    elapsed = time.perf_counter() - started
+    third = bank.StandingOrderScheduler().run_due(stamp(NOW))
+
+    paid = first["paid"] + second["paid"]
+    sent = connection.execute("""SELECT COUNT(*) FROM "Account Transactions" WHERE "Transaction Type" = 'Transfer Sent'""").fetchone()[0]
+    received = connection.execute("""SELECT COUNT(*) FROM "Account Transactions" WHERE "Transaction Type" = 'Transfer Received'""").fetchone()[0]
+    assert paid == payable == sent == received, (paid, payable, sent, received)
+    assert third["paid"] == 0, "a rerun paid orders again"
+    assert connection.execute('SELECT SUM(Balance) FROM "Client Account"').fetchone()[0] == total_before, "money was created or lost"
+    assert first["retrying"] + second["retrying"] == args.orders - payable
+    next_due = connection.execute("""SELECT COUNT(*) FROM 'Standing Orders' WHERE "From Account" > ? AND Occurrence = 1
+        AND "Next Due" = "Run At" AND "Run At" > ?""", (poor, stamp(NOW))).fetchone()[0]
+    assert next_due == payable, "paid orders were not moved to next month"
+
+    # The unpaid ones: retried after 1 h, 6 h and 24 h, then that month is skipped
+    later = NOW
+    for delay in bank.StandingOrderScheduler.retry_after:
+        later += datetime.timedelta(seconds=delay)
+        totals = bank.StandingOrderScheduler().run_due(stamp(later))
+        assert totals["paid"] == 0
+    assert totals["skipped"] == args.orders - payable, totals
+    skipped = connection.execute("""SELECT COUNT(*) FROM 'Standing Orders' WHERE "From Account" <= ? AND Occurrence = 1
+        AND Attempts = 0 AND "Last Error" = 'insufficient balance'""", (poor,)).fetchone()[0]
+    assert skipped == args.orders - payable
+
+    print(f"orders            : {args.orders} ({args.orders - payable} without the money)")
+    print(f"run time          : {elapsed:.2f} s ({args.orders / elapsed:.0f} orders/sec), restarted after {args.stop_after} transactions")
+    print(f"third run         : {third['paid']} payments")
+    print("✅ Every payable order paid once, money conserved, unpaid ones retried 3 times then skipped")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+# ------------------------- Start-up time benchmark --------------------------------
+# Wall time of one process, start to exit, for the interactive menu (opened and closed
+# straight away) and for each one-shot command, through both entry points:
+#   script  - python Bank-System-Management.py <command> (compiled on every run)
+#   bank.py - python bank.py <command> (the application imported, its bytecode cached)
+# against a bare "python -c pass". Each is run --runs times on a database of --accounts
+# accounts; the median and the best run count. "first run" is a command on a brand new
+# database file, which also creates the schema.
+#
+#   python benchmarks/bench_startup.py --runs 20
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+from _bank import APP_PATH, ROOT, load_bank, populate_accounts
+
+LAUNCHER_PATH = os.path.join(ROOT, "bank.py")
+
+
+# bank.py relies on the bytecode cache, so keep it on even where the environment turns it off
+ENVIRONMENT = {name: value for name, value in os.environ.items() if name != "PYTHONDONTWRITEBYTECODE"}
+
+
+def timed_run(command, stdin=None, cwd=None):
+    started = time.perf_counter()
+    completed = subprocess.run(command, input=stdin, capture_output=True, text=True, cwd=cwd, env=ENVIRONMENT)
+    elapsed = time.perf_counter() - started
+    assert completed.returncode == 0, (command, completed.stdout[-500:], completed.stderr[-500:])
+    return elapsed, completed.stdout
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Process start-up time of the menu and the one-shot commands")
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("--accounts", type=int, default=10_000)
+    args = parser.parse_args()
+
+    db_path = os.path.join(tempfile.mkdtemp(prefix="bank-startup-"), "bench.db")
+    bank = load_bank(db_path)
+    populate_accounts(bank.pool.connection(), args.accounts)
+    for number in range(1, 101):
+        bank.deposit_funds(number, 10_000)
+    bank.BankAdmin()
+    bank.pool.close_all()
+    db = ["--db", db_path]
+
+    periods = iter(range(1, 10 ** 6))
+
+    def next_period():
+        # A month not paid yet, so every interest run does the work
+        month = next(periods)
+        return f"{2000 + month // 12}-{month % 12 + 1:02d}"
+
+    commands = {
+        "menu": (lambda: [], "3\n"),
+        "balance": (lambda: ["balance", "7", *db], None),
+        "deposit": (lambda: ["deposit", "7", "10.00", *db], None),
+        "transfer": (lambda: ["transfer", "7", "8", "1.00", *db], None),
+        "history": (lambda: ["history", "7", "--limit", "20", *db], None),
+        "create-account": (lambda: ["create-account", "--name", "New Client", "--nationality", "Egyptian", "--gender", "Female",
+                                    "--phone", "01012345678", "--document", "Id Card", "--type", "Current", "--balance", "5000",
+                                    "--password", "pw", *db], None),
+        "interest-run": (lambda: ["interest-run", "--period", next_period(), *db], None),
+    }
+
+    baseline = min(timed_run([sys.executable, "-c", "pass"])[0] for _ in range(args.runs))
+    print(f"python -c pass: {baseline * 1000:.1f} ms")
+    print(f"{'command':>15} {'script median':>14} {'best':>7} {'bank.py median':>15} {'best':>7}")
+    for name, (arguments, stdin) in commands.items():
+        cells = []
+        for entry in (APP_PATH, LAUNCHER_PATH):
+            # The menu always uses the default file, so it runs in the database's folder
+            times = [timed_run([sys.executable, entry, *arguments()], stdin, os.path.dirname(db_path))[0] for _ in range(args.runs)]
+            cells += [statistics.median(times) * 1000, min(times) * 1000]
+        print(f"{name:>15} {cells[0]:>11.1f} ms {cells[1]:>7.1f} {cells[2]:>12.1f} ms {cells[3]:>7.1f}")
+
+    fresh = ["--db", os.path.join(tempfile.mkdtemp(prefix="bank-startup-"), "new.db")]
+    started = time.perf_counter()
+    completed = subprocess.run([sys.executable, LAUNCHER_PATH, "balance", "1", *fresh], capture_output=True, text=True, env=ENVIRONMENT)
+    print(f"{'first run':>15} {'':>14} {'':>7} {(time.perf_counter() - started) * 1000:>12.1f} ms   (new database, schema created)")
+    assert completed.returncode == 1 and "not found" in completed.stdout, completed.stdout
+
+    # The commands did what they say
+    _, output = timed_run([sys.executable, LAUNCHER_PATH, "balance", "7", "--json", *db])
+    runs = 2 * args.runs        # Per command, through both entry points
+    expected = 10_000 + 100 + runs * 10 - runs * 1      # Pounds: opening balance, the deposit above, 10.00 in and 1.00 out per run
+    assert json.loads(output)["balance"] == f"{expected:.2f}", (output, expected)
+    print("✅ Every command ran and the balances add up")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+# ------------------------- Velocity limits benchmark --------------------------------
+# Cost of the per-account velocity checks on transfer throughput, transfers/sec with
+#   off      - no limits, as the module starts
+#   lazy     - limits on, each account's windows loaded from its ledger when first seen
+#   rebuilt  - limits on after velocity.rebuild(), one pass over the ledger's last day
+# The limits are set high enough never to refuse, so only the bookkeeping is measured.
+# Each mode runs --rounds times on a fresh database and the best round counts. Then:
+#   - with tight limits on a simulated clock, exactly the debits over a limit are refused,
+#     and a window lets debits through again once it has slid past them,
+#   - the windows kept up by the transfers match the windows rebuilt from the ledger.
+#
+#   python benchmarks/bench_velocity.py --transfers 20000 --accounts 1000
+import argparse
+import datetime
+import os
+import random
+import tempfile
+import time
+
+from _bank import load_bank, populate_accounts
+
+NEVER_REFUSE = {60: (10 ** 9, 10 ** 15), 60 * 60: (10 ** 9, 10 ** 15), 24 * 60 * 60: (10 ** 9, 10 ** 15)}
+
+
+def fresh_bank(accounts):
+    bank = load_bank(os.path.join(tempfile.mkdtemp(prefix="bank-velocity-"), "bench.db"))
+    populate_accounts(bank.pool.connection(), accounts)
+    return bank
+
+
+def run(mode, transfers, accounts, seed=7):
+    bank = fresh_bank(accounts)
+    rng = random.Random(seed)
+    pairs = [(rng.randint(1, accounts), rng.randint(1, accounts)) for _ in range(transfers)]
+    for sender, receiver in pairs[:accounts]:       # Some history of the last day to load or rebuild
+        if sender != receiver:
+            bank.transfer_funds(sender, receiver, 100)
+    if mode != "off":
+        bank.configure_velocity_limits(NEVER_REFUSE)
+    if mode == "rebuilt":
+        bank.velocity.rebuild()
+
+    started = time.perf_counter()
+    for sender, receiver in pairs:
+        if sender != receiver:
+            bank.transfer_funds(sender, receiver, 100)
+    rate = transfers / (time.perf_counter() - started)
+
+    if mode != "off":
+        kept = {number: (state.counts[-1], state.sums[-1]) for number, state in bank.velocity._accounts.items()}
+        bank.velocity.rebuild()
+        rebuilt = {number: (state.counts[-1], state.sums[-1]) for number, state in bank.velocity._accounts.items() if number in kept}
+        assert kept == rebuilt, "the windows kept up by the transfers differ from the ledger's"
+    bank.pool.close_all()
+    return rate
+
+
+def check_limits(minute_debits=5, hour_money=3_000):
+    # A simulated clock, one debit of 100.00 pounds every 10 seconds from one account
+    bank = fresh_bank(2)
+    moment = datetime.datetime(2025, 1, 1, 9, 0, 0)
+    bank.repository.clock = lambda: moment.strftime("%Y-%m-%d %H:%M:%S")
+    bank.configure_velocity_limits({60: (minute_debits, 10 ** 15), 60 * 60: (10 ** 9, hour_money * bank.MINOR_UNITS)})
+    accepted, expected, sent = [], [], []
+    for step in range(120):
+        now = step * 10
+        in_minute = [when for when in sent if when > now - 60]
+        in_hour = [when for when in sent if when > now - 3600]
+        allowed = len(in_minute) < minute_debits and (len(in_hour) + 1) * 100 <= hour_money
+        try:
+            if step % 2:
+                bank.withdraw_funds(1, 100 * bank.MINOR_UNITS)
+            else:
+                bank.transfer_funds(1, 2, 100 * bank.MINOR_UNITS)
+            accepted.append(True)
+        except bank.BankError:
+            accepted.append(False)
+        expected.append(allowed)
+        if allowed:
+            sent.append(now)
+        moment += datetime.timedelta(seconds=10)
+    assert accepted == expected, "refused a different set of debits than the limits allow"
+    assert bank.velocity.refused == expected.count(False)
+    bank.pool.close_all()
+    return expected.count(True), expected.count(False)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Transfer throughput with the velocity checks off and on")
+    parser.add_argument("--transfers", type=int, default=20_000)
+    parser.add_argument("--accounts", type=int, default=1_000)
+    parser.add_argument("--rounds", type=int, default=3)
+    args = parser.parse_args()
+
+    best = {}
+    for _ in range(args.rounds):
+        for mode in ("off", "lazy", "rebuilt"):
+            best[mode] = max(best.get(mode, 0), run(mode, args.transfers, args.accounts))
+
+    print(f"{'mode':>8} {'transfers/sec':>14} {'overhead':>9}")
+    for mode, rate in best.items():
+        print(f"{mode:>8} {rate:>14.0f} {1 - rate / best['off']:>9.1%}")
+    accepted, refused = check_limits()
+    print(f"✅ Windows match the ledger; tight limits let {accepted} debits through and refused exactly {refused}")
+
+
+if __name__ == "__main__":
+    main()
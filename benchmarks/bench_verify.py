@@ -0,0 +1,76 @@
+# ------------------------- Ledger chain verification benchmark --------------------------------
+# Builds a hash-chained ledger of --rows rows and measures verify_ledger():
+#   full         - the whole chain, once per worker count (rows/sec against the worker processes)
+#   incremental  - after --recent more deposits, resuming from the last clean run's checkpoint
+#   tampered     - one row changed and one deleted behind the app's back (its triggers dropped):
+#                  a full run must report exactly those two rows
+#
+#   python benchmarks/bench_verify.py --rows 10000000 --workers 1 2 4 8
+import argparse
+import os
+import tempfile
+import time
+
+from _bank import load_bank, populate_accounts
+
+
+def build_ledger(connection, bank, rows, accounts, batch=100_000):
+    balances = [0] + [1_000_000] * accounts
+    for first in range(0, rows, batch):
+        pending = []
+        for i in range(first, min(first + batch, rows)):
+            number = i % accounts + 1
+            balances[number] += 10_000
+            pending.append((f"Client {number}", number, "Deposit", 10_000, balances[number], "2025-01-%02d 12:00:00" % (i * 28 // rows + 1)))
+        bank.append_ledger(connection, pending)
+        connection.commit()
+
+
+def timed_verify(bank, **options):
+    started = time.perf_counter()
+    result = bank.verify_ledger(**options)
+    return result, time.perf_counter() - started
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Hash chain verification throughput per worker count")
+    parser.add_argument("--rows", type=int, default=2_000_000)
+    parser.add_argument("--accounts", type=int, default=10_000)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--recent", type=int, default=10_000, help="deposits posted before the incremental run")
+    args = parser.parse_args()
+
+    bank = load_bank(os.path.join(tempfile.mkdtemp(prefix="bank-verify-"), "bench.db"))
+    connection = bank.pool.connection()
+    populate_accounts(connection, args.accounts)
+    started = time.perf_counter()
+    build_ledger(connection, bank, args.rows, args.accounts)
+    print(f"ledger: {args.rows} chained rows written in {time.perf_counter() - started:.1f} s")
+
+    print(f"{'workers':>8} {'seconds':>9} {'rows/sec':>12}")
+    for workers in args.workers:
+        result, elapsed = timed_verify(bank, workers=workers, full=True)
+        assert not result["problems"] and result["rows"] == args.rows, result["problems"][:5]
+        print(f"{workers:>8} {elapsed:>9.2f} {result['rows'] / elapsed:>12.0f}")
+
+    for i in range(args.recent):
+        bank.deposit_funds(i % args.accounts + 1, 100)
+    result, elapsed = timed_verify(bank, workers=max(args.workers))
+    assert not result["problems"] and result["rows"] == args.recent + 1, (result["rows"], result["problems"][:5])
+    print(f"incremental: {result['rows']} rows since the checkpoint in {elapsed:.2f} s")
+
+    connection.execute("DROP TRIGGER ledger_no_update")
+    connection.execute("DROP TRIGGER ledger_no_delete")
+    connection.execute('UPDATE "Account Transactions" SET Amount = Amount + 1 WHERE Seq = ?', (args.rows // 3,))
+    connection.execute('DELETE FROM "Account Transactions" WHERE Seq = ?', (args.rows // 2,))
+    connection.commit()
+    result, elapsed = timed_verify(bank, workers=max(args.workers), full=True)
+    found = [seq for seq, _ in result["problems"]]
+    assert found == [args.rows // 3, args.rows // 2], result["problems"]
+    print(f"tampered   : found {len(found)} broken rows in {elapsed:.2f} s")
+    print("✅ Verification reports exactly the changed and the missing row")
+    bank.pool.close_all()
+
+
+if __name__ == "__main__":
+    main()
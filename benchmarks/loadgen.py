@@ -0,0 +1,112 @@
+# ------------------------- Network service load generator --------------------------------
+# Opens many concurrent client connections to the JSON-lines bank service and sends a
+# mix of balance / deposit / transfer / history requests. Reports requests/sec and
+# p50 / p99 latency. By default it starts its own server on a fresh temporary database;
+# use --host/--port to hit a server that is already running (its accounts must then be
+# numbered 1..--accounts with password "pw<number>", like populate_accounts() makes them).
+# The server it starts hashes passwords at a token cost, so the numbers show the request
+# path; bench_password.py measures the hashing itself. Its velocity limits are off: a load
+# generator's accounts transfer far faster than any customer.
+#
+#   python benchmarks/loadgen.py --clients 64 --requests 200
+import argparse
+import asyncio
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+
+from _bank import APP_PATH, load_bank, populate_accounts
+
+MIX = [("balance", 6), ("deposit", 2), ("transfer", 1), ("history", 1)]
+
+
+def start_server(accounts, port):
+    db_path = os.path.join(tempfile.mkdtemp(prefix="bank-loadgen-"), "bench.db")
+    bank = load_bank(db_path)
+    populate_accounts(bank.pool.connection(), accounts)
+    bank.pool.close_all()
+    server = subprocess.Popen([sys.executable, APP_PATH, "serve", "--port", str(port), "--db", db_path,
+                               "--scrypt-n", "16", "--hash-workers", "0", "--no-velocity-limits"],
+                              stdout=subprocess.DEVNULL)
+    for _ in range(100):      # Wait until it accepts connections
+        try:
+            socket.create_connection(("127.0.0.1", port), timeout=0.1).close()
+            return server
+        except OSError:
+            time.sleep(0.05)
+    server.kill()
+    raise RuntimeError("the bank service did not start")
+
+
+def make_request(rng, accounts, request_id):
+    operation = rng.choices([name for name, _ in MIX], [weight for _, weight in MIX])[0]
+    number = rng.randint(1, accounts)
+    request = {"id": request_id, "op": operation, "account": number, "password": f"pw{number}"}
+    if operation in ("deposit", "transfer"):
+        request["amount"] = rng.randint(1, 100)
+    if operation == "transfer":
+        request["to_account"] = number % accounts + 1
+    return request
+
+
+async def client(host, port, accounts, requests, seed, latencies, errors):
+    rng = random.Random(seed)
+    reader, writer = await asyncio.open_connection(host, port)
+    for request_id in range(requests):
+        started = time.perf_counter()
+        writer.write(json.dumps(make_request(rng, accounts, request_id)).encode() + b"\n")
+        await writer.drain()
+        response = json.loads(await reader.readline())
+        latencies.append(time.perf_counter() - started)
+        if not response["ok"]:
+            errors.append(response["error"])
+    writer.close()
+    await writer.wait_closed()
+
+
+async def run(host, port, accounts, clients, requests):
+    latencies, errors = [], []
+    started = time.perf_counter()
+    await asyncio.gather(*(client(host, port, accounts, requests, seed, latencies, errors) for seed in range(clients)))
+    return latencies, errors, time.perf_counter() - started
+
+
+def percentile(sorted_values, fraction):
+    return sorted_values[min(len(sorted_values) - 1, int(len(sorted_values) * fraction))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load generator for the JSON-lines bank service")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=None, help="use an already running server")
+    parser.add_argument("--accounts", type=int, default=10_000)
+    parser.add_argument("--clients", type=int, default=32, help="concurrent connections")
+    parser.add_argument("--requests", type=int, default=200, help="requests per connection")
+    args = parser.parse_args()
+
+    server = None
+    port = args.port
+    if port is None:
+        port = 18765
+        server = start_server(args.accounts, port)
+    try:
+        latencies, errors, elapsed = asyncio.run(run(args.host, port, args.accounts, args.clients, args.requests))
+    finally:
+        if server:
+            server.terminate()
+            server.wait()
+
+    latencies.sort()
+    print(f"requests      : {len(latencies)} ({len(errors)} rejected by the bank)")
+    print(f"requests/sec  : {len(latencies) / elapsed:.0f}")
+    print(f"p50 latency   : {percentile(latencies, 0.50) * 1000:.2f} ms")
+    print(f"p99 latency   : {percentile(latencies, 0.99) * 1000:.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
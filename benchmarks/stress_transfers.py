@@ -0,0 +1,84 @@
+# ------------------------- Concurrent transfer stress test --------------------------------
+# Several processes hammer random transfers at the same database through transfer_funds().
+# Afterwards the total money in the bank must be exactly what it was before, every account
+# must still be above its minimum, and every "Transfer Sent" row must have its "Transfer Received".
+# Reports transfers/sec for each worker count.
+#
+#   python benchmarks/stress_transfers.py --workers 1 2 4 8 --transfers 2000
+import argparse
+import multiprocessing
+import os
+import random
+import sqlite3 as sql
+import tempfile
+import time
+
+from _bank import load_bank, populate_accounts
+
+
+def worker(db_path, accounts, transfers, seed):
+    bank = load_bank(db_path)
+    rng = random.Random(seed)
+    done = rejected = 0
+    for _ in range(transfers):
+        sender, receiver = rng.sample(range(1, accounts + 1), 2)
+        try:
+            bank.transfer_funds(sender, receiver, rng.randint(1, 5_000) * bank.MINOR_UNITS)
+            done += 1
+        except bank.BankError:
+            rejected += 1
+    bank.pool.close_all()
+    return done, rejected
+
+
+def check_books(db_path, expected_total, current_minimum, saving_minimum):
+    connection = sql.connect(db_path)
+    total = connection.execute('SELECT SUM(Balance) FROM "Client Account"').fetchone()[0]
+    assert total == expected_total, f"money not conserved: {total} != {expected_total}"
+    below = connection.execute("""SELECT COUNT(*) FROM "Client Account"
+        WHERE Balance < CASE "Account Type" WHEN 'Saving' THEN ? ELSE ? END""", (saving_minimum, current_minimum)).fetchone()[0]
+    assert below == 0, f"{below} accounts fell below their minimum"
+    sent, received = connection.execute("""SELECT
+        SUM(CASE "Transaction Type" WHEN 'Transfer Sent' THEN Amount END),
+        SUM(CASE "Transaction Type" WHEN 'Transfer Received' THEN Amount END)
+        FROM "Account Transactions" """).fetchone()
+    assert sent == received, f"ledger out of balance: sent {sent}, received {received}"
+    connection.close()
+
+
+def run(workers, accounts, transfers):
+    db_path = os.path.join(tempfile.mkdtemp(prefix="bank-stress-"), "stress.db")
+    bank = load_bank(db_path)
+    populate_accounts(bank.pool.connection(), accounts)
+    expected_total = bank.pool.connection().execute('SELECT SUM(Balance) FROM "Client Account"').fetchone()[0]
+    minimums = bank.CurrentAccount.mini_amount, bank.SavingAccount.mini_amount
+    bank.pool.close_all()
+
+    context = multiprocessing.get_context("spawn")
+    with context.Pool(workers) as pool:
+        started = time.perf_counter()
+        results = pool.starmap(worker, [(db_path, accounts, transfers, seed) for seed in range(workers)])
+        elapsed = time.perf_counter() - started
+
+    check_books(db_path, expected_total, *minimums)
+    done = sum(result[0] for result in results)
+    rejected = sum(result[1] for result in results)
+    return done, rejected, elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Concurrent transfers: money conservation and throughput")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--accounts", type=int, default=200)
+    parser.add_argument("--transfers", type=int, default=2_000, help="transfers per worker")
+    args = parser.parse_args()
+
+    print(f"{'workers':>8} {'done':>8} {'rejected':>9} {'transfers/sec':>14}")
+    for workers in args.workers:
+        done, rejected, elapsed = run(workers, args.accounts, args.transfers)
+        print(f"{workers:>8} {done:>8} {rejected:>9} {(done + rejected) / elapsed:>14.0f}")
+    print("✅ Money conserved in every run")
+
+
+if __name__ == "__main__":
+    main()
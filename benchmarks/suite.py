@@ -0,0 +1,134 @@
+# ------------------------- Benchmark suite --------------------------------
+# Runs generated workloads (see workload.py) against a fresh bank and reports, for each
+# scenario: operations/sec, p50 / p99 latency overall and per operation kind, the share
+# the bank refused, database size and peak RSS (of the process so far, scenarios run in
+# order). Results can be written as JSON and compared with a saved baseline; the run
+# fails (exit code 1) when a scenario got slower than the baseline by more than --tolerance.
+#
+#   python benchmarks/suite.py --accounts 100000 --operations 50000 --output results.json
+#   python benchmarks/suite.py --save-baseline baseline.json
+#   python benchmarks/suite.py --baseline baseline.json --tolerance 0.15
+import argparse
+import json
+import os
+import platform
+import resource
+import sqlite3
+import sys
+import tempfile
+import time
+
+from _bank import load_bank
+from workload import DEFAULT_MIX, generate_operations, make_population, run_operation
+
+SCENARIOS = {
+    "mixed": DEFAULT_MIX,
+    "read-heavy": {"deposit": 5, "withdraw": 3, "transfer": 2, "interest": 0, "balance": 70, "history": 20},
+    "write-heavy": {"deposit": 45, "withdraw": 25, "transfer": 30, "interest": 0, "balance": 0, "history": 0},
+    "month-end": {"deposit": 10, "withdraw": 5, "transfer": 5, "interest": 80, "balance": 0, "history": 0},
+}
+
+
+def percentile(sorted_values, fraction):
+    return sorted_values[min(len(sorted_values) - 1, int(len(sorted_values) * fraction))] if sorted_values else 0.0
+
+
+def latency_summary(latencies):
+    latencies = sorted(latencies)
+    return {"count": len(latencies), "p50_ms": percentile(latencies, 0.50) * 1000, "p99_ms": percentile(latencies, 0.99) * 1000}
+
+
+def database_size(db_path):
+    return sum(os.path.getsize(path) for path in (db_path, db_path + "-wal") if os.path.exists(path))
+
+
+def peak_rss_mb():
+    # ru_maxrss is in kilobytes on Linux, bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def run_scenario(name, mix, args):
+    db_path = os.path.join(tempfile.mkdtemp(prefix="bank-suite-"), "bench.db")
+    bank = load_bank(db_path)
+    bank.configure_password_hashing(scrypt_n=2 ** 4, pbkdf2_iterations=1)     # bench_password.py measures hashing
+    if args.backend == "memory":
+        bank.use_backend(bank.MemoryBackend())
+    population = make_population(bank, args.accounts, args.saving_share, args.skew)
+
+    by_kind, refused = {}, 0
+    started = time.perf_counter()
+    for operation in generate_operations(population, args.operations, mix):
+        began = time.perf_counter()
+        accepted = run_operation(bank, operation)
+        by_kind.setdefault(operation[0], []).append(time.perf_counter() - began)
+        refused += not accepted
+    elapsed = time.perf_counter() - started
+    if args.backend == "sqlite":
+        bank.UnitOfWork.flush()
+
+    result = {"ops_per_sec": args.operations / elapsed, "refused_share": refused / args.operations,
+              **latency_summary([value for values in by_kind.values() for value in values]),
+              "by_kind": {kind: latency_summary(values) for kind, values in sorted(by_kind.items())},
+              "db_bytes": database_size(db_path) if args.backend == "sqlite" else 0,
+              "peak_rss_mb": peak_rss_mb()}
+    bank.pool.close_all()
+    return result
+
+
+def compare(results, baseline, tolerance):
+    # Prints each scenario against the baseline; returns the scenarios that regressed
+    regressed = []
+    print(f"\n{'scenario':>12} {'ops/sec':>10} {'baseline':>10} {'change':>8} {'p99 ms':>8} {'baseline':>9}")
+    for name, result in results["scenarios"].items():
+        before = baseline.get("scenarios", {}).get(name)
+        if before is None:
+            print(f"{name:>12} {result['ops_per_sec']:>10.0f} {'-':>10}")
+            continue
+        change = result["ops_per_sec"] / before["ops_per_sec"] - 1
+        print(f"{name:>12} {result['ops_per_sec']:>10.0f} {before['ops_per_sec']:>10.0f} {change:>+8.1%} "
+              f"{result['p99_ms']:>8.2f} {before['p99_ms']:>9.2f}")
+        if change < -tolerance:
+            regressed.append(name)
+    return regressed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark suite for the banking core")
+    parser.add_argument("--accounts", type=int, default=20_000)
+    parser.add_argument("--operations", type=int, default=20_000, help="operations per scenario")
+    parser.add_argument("--saving-share", type=float, default=0.3)
+    parser.add_argument("--skew", type=float, default=1.1, help="Zipf exponent of account activity")
+    parser.add_argument("--scenarios", nargs="+", choices=list(SCENARIOS), default=list(SCENARIOS))
+    parser.add_argument("--backend", choices=["sqlite", "memory"], default="sqlite")
+    parser.add_argument("--output", help="write the results as JSON")
+    parser.add_argument("--save-baseline", help="write the results as the new baseline")
+    parser.add_argument("--baseline", help="compare against a saved baseline")
+    parser.add_argument("--tolerance", type=float, default=0.10, help="allowed ops/sec drop before failing")
+    args = parser.parse_args()
+
+    settings = {key: getattr(args, key) for key in ("accounts", "operations", "saving_share", "skew", "backend")}
+    results = {"created": time.strftime("%Y-%m-%d %H:%M:%S"), "python": platform.python_version(),
+               "sqlite": sqlite3.sqlite_version, "settings": settings, "scenarios": {}}
+    print(f"{'scenario':>12} {'ops/sec':>10} {'p50 ms':>8} {'p99 ms':>8} {'refused':>8} {'db MB':>8} {'rss MB':>8}")
+    for name in args.scenarios:
+        result = run_scenario(name, SCENARIOS[name], args)
+        results["scenarios"][name] = result
+        print(f"{name:>12} {result['ops_per_sec']:>10.0f} {result['p50_ms']:>8.3f} {result['p99_ms']:>8.3f} "
+              f"{result['refused_share']:>8.1%} {result['db_bytes'] / 1e6:>8.1f} {result['peak_rss_mb']:>8.0f}")
+
+    for path in (args.output, args.save_baseline):
+        if path:
+            with open(path, "w", encoding="utf-8") as results_file:
+                json.dump(results, results_file, indent=2)
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as baseline_file:
+            regressed = compare(results, json.load(baseline_file), args.tolerance)
+        if regressed:
+            print(f"❌ Slower than the baseline: {', '.join(regressed)}")
+            sys.exit(1)
+        print("✅ No scenario slower than the baseline")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+# ------------------------- Synthetic workload generator --------------------------------
+# Realistic populations and operation streams for the benchmark suite (suite.py):
+#   - a Current / Saving mix whose opening balances sit above each type's mini_amount,
+#     log-normally spread like real balances,
+#   - skewed activity: a Zipf-like weight per account, so a few accounts (merchants,
+#     payroll) see most of the traffic,
+#   - an operation mix of deposit / withdraw / transfer / interest / balance / history.
+# Operations run through the same programmatic API the menus use: accounts come from
+# ClientAccount.load_account_from_db() and money moves through Transaction.deposit(),
+# withdraw() and transfer().
+import bisect
+import contextlib
+import io
+import itertools
+import random
+
+# Relative weights of each operation kind
+DEFAULT_MIX = {"deposit": 30, "withdraw": 20, "transfer": 20, "interest": 0.5, "balance": 20, "history": 9.5}
+
+
+class Population:
+    def __init__(self, numbers, account_types, weights, seed):
+        self.numbers = numbers
+        self.account_types = account_types
+        self.cumulative = list(itertools.accumulate(weights))
+        self.savings = [number for number, account_type in zip(numbers, account_types) if account_type == "Saving"]
+        self.rng = random.Random(seed)
+
+    def pick(self):
+        # An account drawn by activity weight
+        index = bisect.bisect(self.cumulative, self.rng.random() * self.cumulative[-1])
+        return self.numbers[min(index, len(self.numbers) - 1)]
+
+
+def make_population(bank, accounts, saving_share=0.3, skew=1.1, seed=11):
+    # Opens the accounts with BankAdmin.bulk_open_accounts() and returns their Population.
+    # Every account gets the password "pw" (hashed once, up front).
+    rng = random.Random(seed)
+    password_hash = bank.PasswordHasher.hash("pw")
+    account_types = ["Saving" if rng.random() < saving_share else "Current" for _ in range(accounts)]
+    minimum = {"Current": bank.CurrentAccount.mini_amount, "Saving": bank.SavingAccount.mini_amount}
+
+    def rows():
+        for n, account_type in enumerate(account_types):
+            # Median about 8,000 pounds above the minimum, long tail of richer accounts
+            balance = minimum[account_type] + int(rng.lognormvariate(9, 1.2) * bank.MINOR_UNITS)
+            yield (f"client {n}", "egyptian", rng.choice(["male", "female"]), "010%08d" % n, "id card",
+                   account_type, balance, password_hash)
+
+    numbers, rejected = bank.BankAdmin.bulk_open_accounts(rows())
+    assert not rejected, rejected[:3]
+    weights = [1 / (rank + 1) ** skew for rank in range(accounts)]
+    rng.shuffle(weights)        # Hot accounts scattered over the number range
+    return Population(numbers, account_types, weights, seed)
+
+
+def generate_operations(population, count, mix=None, seed=5):
+    # (kind, account, amount, other account) tuples; amounts in piastres
+    mix = mix or DEFAULT_MIX
+    rng = random.Random(seed)
+    kinds, weights = list(mix), list(mix.values())
+    for _ in range(count):
+        kind = rng.choices(kinds, weights)[0]
+        if kind == "interest":
+            number = rng.choice(population.savings) if population.savings else population.pick()
+        else:
+            number = population.pick()
+        amount = int(rng.lognormvariate(6, 1.0)) * 100 + rng.randint(0, 99)     # A few hundred pounds, some cents
+        other = None
+        if kind == "transfer":
+            other = population.pick()
+            while other == number and len(population.numbers) > 1:
+                other = population.pick()
+        yield kind, number, max(amount, 1), other
+
+
+def run_operation(bank, operation):
+    # Runs one generated operation; returns False when the bank refused it
+    kind, number, amount, other = operation
+    account = bank.ClientAccount.load_account_from_db(number)
+    if kind == "balance":
+        return account.get_balance() is not None
+    if kind == "history":
+        return bank.repository.transactions_page(number, limit=20) is not None
+    with contextlib.redirect_stdout(io.StringIO()):         # The account methods print receipts
+        if kind == "deposit":
+            return bank.Transaction.deposit(account, amount) is not None
+        if kind == "withdraw":
+            # Saving accounts refuse direct withdrawals (the storage backend refuses them too)
+            return account.account_type != "Saving" and bank.Transaction.withdraw(account, amount) is not None
+        if kind == "transfer":
+            return bank.Transaction.transfer(account, bank.ClientAccount.load_account_from_db(other), amount) is not None
+        if kind == "interest":
+            try:
+                bank.credit_interest(number, 0.01)
+                return True
+            except bank.BankError:
+                return False
+    raise ValueError(f"unknown operation kind: {kind}")